@@ -0,0 +1,101 @@
+"""
+Precomputed aggregate cube over Region x economic_class x cluster.
+
+Every grouping set of the three dimensions (including the grand total) is
+aggregated once when a Dataset is built, so the dashboard sections read their
+rollups with a dict lookup instead of re-running groupby/value_counts per rerun.
+Quantiles are computed per grouping set because they cannot be rolled up from
+finer cells.
+"""
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+
+DIMENSIONS = ("Region", "economic_class", "cluster")
+
+MEASURES = [
+    "gdp_total_usd_billion_cleaned",
+    "GDP_per_capita_ppp_cleaned",
+    "GDP_growth_rate_cleaned",
+    "Inflation_rate_cleaned",
+    "Unemployment_rate_cleaned",
+    "Gov_Debt_Percent_GDP_Cleaned",
+    "Exports_Cleaned_Billion",
+    "Imports_Cleaned_Billion",
+    "Trade Balance",
+    "Total Trade",
+    "Trade_Openness",
+    "trade_surplus",
+    "trade_deficit",
+]
+
+STATS = ["sum", "mean", "count", "min", "q25", "median", "q75", "max"]
+QUANTILES = {"q25": 0.25, "median": 0.5, "q75": 0.75}
+
+
+def _measure_frame(df, dimensions, measures):
+    values = pd.DataFrame(index=df.index)
+    for dim in dimensions:
+        values[dim] = df[dim]
+    # Indicator columns, so surplus/deficit country counts are plain sums
+    values["trade_surplus"] = (df["Trade Balance"] > 0).astype("float64")
+    values["trade_deficit"] = (df["Trade Balance"] < 0).astype("float64")
+    for col in measures:
+        if col not in values:
+            values[col] = df[col].to_numpy(dtype="float64", na_value=np.nan)
+    return values
+
+
+def _aggregate(values, group, measures):
+    if group:
+        grouped = values.groupby(list(group), observed=True, sort=False)[measures]
+        table = grouped.agg(["sum", "mean", "count", "min", "max"])
+        quantiles = grouped.quantile(list(QUANTILES.values())).unstack(level=-1)
+        rows = grouped.size()
+    else:
+        table = values[measures].agg(["sum", "mean", "count", "min", "max"]).unstack().to_frame().T
+        quantiles = values[measures].quantile(list(QUANTILES.values())).unstack().to_frame().T
+        rows = pd.Series([len(values)])
+
+    quantiles.columns = pd.MultiIndex.from_tuples(
+        [(measure, name) for measure, q in quantiles.columns for name, value in QUANTILES.items() if value == q]
+    )
+    table = pd.concat([table, quantiles], axis=1)
+    table = table.reindex(columns=pd.MultiIndex.from_product([measures, STATS]))
+    table["rows"] = rows.to_numpy()
+    return table
+
+
+class AggregateCube:
+    """Sums, means, counts and quantiles for every grouping set of the dimensions."""
+
+    def __init__(self, df, dimensions=DIMENSIONS, measures=MEASURES):
+        self.dimensions = tuple(dimensions)
+        self.measures = list(measures)
+        values = _measure_frame(df, self.dimensions, self.measures)
+
+        self.tables = {}
+        for size in range(len(self.dimensions) + 1):
+            for group in combinations(self.dimensions, size):
+                self.tables[group] = _aggregate(values, group, self.measures)
+
+    def rollup(self, *dimensions):
+        """Aggregates grouped by the given dimensions (any order), indexed by them."""
+        key = tuple(dim for dim in self.dimensions if dim in dimensions)
+        if len(key) != len(dimensions):
+            raise KeyError(f"Unknown cube dimensions: {dimensions}")
+        return self.tables[key]
+
+    def total(self, measure, stat):
+        """Grand total of one measure/stat over the whole dataset."""
+        return self.tables[()][(measure, stat)].iloc[0]
+
+    def rows(self):
+        return int(self.tables[()]["rows"].iloc[0])
+
+    def value(self, measure, stat, **coords):
+        """One cell of the cube, e.g. value("Total Trade", "sum", Region="Asia")."""
+        table = self.rollup(*coords)
+        key = tuple(coords[dim] for dim in table.index.names)
+        return table.loc[key[0] if len(key) == 1 else key, (measure, stat)]
@@ -1,9 +1,25 @@
+import html
+import os
+import sys
+import time
+
 import streamlit as st
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 import numpy as np
 from plotly.subplots import make_subplots
+
+import data_store
+import metrics
+from clustering import DEFAULT_FEATURES, EXPLORER_FEATURES, ClusterEngine
+from exports import FORMATS, ExportCache
+from figure_cache import FigureCache
+from model_registry import ModelRegistry
+from model_serving import ModelServer
+from panel_store import PanelStore
+from rendering import adaptive_box, adaptive_scatter
+from scenarios import SCENARIO_INDICATORS, GridSpec, ScenarioEngine, base_key
  
  
 # Page Setup
@@ -45,6 +61,15 @@ st.markdown("""
         margin: 0;
     }
    
+    .metric-delta {
+        font-size: 0.7rem;
+        margin: 0.3rem 0 0 0;
+        color: #a0aec0;
+    }
+    .metric-delta.up { color: #00d4aa; }
+    .metric-delta.down { color: #ff6b6b; }
+    .metric-delta.flat { color: #718096; }
+   
     .metric-body {
         font-size: 1.25rem;
         margin: 0;
@@ -63,9 +88,18 @@ st.markdown("""
         text-transform: uppercase;
     }
    
-    .metric-delta {
-        font-size: 0.7rem;
-        margin-top: 0.3rem;
+    .search-hit {
+        margin-bottom: 0.75rem;
+        color: #e2e8f0;
+    }
+    .search-hit .score {
+        color: #a0aec0;
+        font-size: 0.8rem;
+    }
+    .search-hit mark {
+        background-color: rgba(0, 212, 170, 0.3);
+        color: #FFFFFF;
+        padding: 0 0.1rem;
     }
    
     .section-header {
@@ -99,32 +133,139 @@ st.markdown("""
 """, unsafe_allow_html=True)
  
  
+# Instrumentation: spans, cache collectors and one structured record per rerun
+perf = metrics.REGISTRY
+run = perf.start_run("startup")
+
+
+@st.cache_resource
+def configure_metrics():
+    # EID_LOG_FORMAT=json: run records and app logs as JSON lines on stderr
+    if os.environ.get("EID_LOG_FORMAT", "").lower() == "json":
+        metrics.configure_json_logging()
+    # EID_METRICS_PORT: Prometheus text format on http://127.0.0.1:<port>/metrics
+    port = os.environ.get("EID_METRICS_PORT")
+    if not port:
+        return None
+    try:
+        return metrics.start_http_server(int(port))
+    except (OSError, ValueError) as e:
+        metrics.logger.warning("Metrics endpoint not started on port %s: %s", port, e)
+        return None
+
+
+metrics_server = configure_metrics()
+
+
+def plotly_chart(fig, **kwargs):
+    with perf.span("plotly_chart", section=run.section):
+        st.plotly_chart(fig, **kwargs)
+
+
+def show_dataframe(frame, **kwargs):
+    # In-memory size of the frame as an estimate of what is sent to the browser
+    perf.add_payload(int(frame.memory_usage(deep=True).sum()), section=run.section)
+    with perf.span("dataframe", section=run.section):
+        st.dataframe(frame, **kwargs)
+
+
 # Load Data
  
-@st.cache_data
-def load_data():
-    df = pd.read_csv(r"Final_output.csv")
-   
-    region_map = {
-        "North America": ["United States", "Canada", "Mexico"],
-        "South America": ["Brazil", "Argentina", "Chile", "Colombia", "Peru", "Ecuador", "Uruguay", "Paraguay", "Venezuela"],
-        "Europe": ["Germany", "France", "Italy", "United Kingdom", "Spain", "Netherlands", "Sweden", "Norway", "Poland", "Belgium", "Greece", "Portugal", "Finland", "Switzerland", "Ireland", "Denmark", "Hungary", "Austria", "Czech Republic", "Slovakia", "Ukraine", "Romania", "Bulgaria", "Serbia", "Croatia", "Slovenia", "Lithuania", "Latvia", "Estonia", "Iceland"],
-        "Asia": ["China", "India", "Japan", "South Korea", "Indonesia", "Vietnam", "Thailand", "Philippines", "Pakistan", "Bangladesh", "Saudi Arabia", "Iran", "Iraq", "Malaysia", "Singapore", "Sri Lanka", "Nepal", "Kazakhstan", "Uzbekistan", "Israel"],
-        "Africa": ["South Africa", "Nigeria", "Egypt", "Kenya", "Ethiopia", "Ghana", "Tanzania", "Uganda", "Morocco", "Algeria", "Tunisia", "Angola", "Zambia"],
-        "Oceania": ["Australia", "New Zealand", "Fiji", "Papua New Guinea"]
-    }
-   
-    def map_region(country):
-        for region, countries in region_map.items():
-            if country in countries:
-                return region
-        return "Other"
-   
-    df["Region"] = df["Country"].apply(map_region)
-    df['Trade Balance'] = df['Exports_Cleaned_Billion'] - df['Imports_Cleaned_Billion']
-    return df
+# One read-only dataset per process, shared by every session (never mutate df in a view).
+# A background watcher swaps in a new version when Final_output.csv changes,
+# and every version is appended to the year-partitioned panel for the trends.
+@st.cache_resource
+def load_data_store():
+    store = data_store.DatasetStore(panel=PanelStore()).start_watcher(interval=30)
+    perf.register_collector("dataset_store", lambda: {"dataset_reloads": store.reloads})
+    return store
+ 
  
-df = load_data()
+@st.cache_data(max_entries=1000)
+def load_country_summary(_dataset, version, country):
+    return _dataset.summary(country)
+ 
+ 
+# Serialized figures shared by all sessions, keyed on section/chart/dataset version
+@st.cache_resource
+def load_figure_cache():
+    cache = FigureCache(max_entries=64)
+    perf.register_collector("figure_cache", cache.stats)
+    return cache
+ 
+
+# Per-version resources below keep the current and the previous version only
+
+# Export files written once per dataset version and selection, cached on disk
+@st.cache_resource(max_entries=2)
+def load_export_cache(_dataset, version):
+    return ExportCache(_dataset.full_frame)
+
+
+# Models loaded once per process: the newest validated registry model, else the shipped ones.
+# refresh() each run swaps in a newly promoted registry model; models.key() keys what depends on it
+@st.cache_resource(max_entries=2)
+def load_model_server(_dataset, version):
+    server = ModelServer(_dataset.frame, registry=ModelRegistry())
+    perf.register_collector("model_server", server.stats)
+    return server
+
+
+# What-if sweeps over the served models, with results cached per country and grid
+@st.cache_resource(max_entries=2, on_release=lambda engine: engine.close())
+def load_scenario_engine(_models, version, model_key):
+    return ScenarioEngine(_models)
+
+
+# Re-clustering for the explorer; fits and PCA projections cached per dataset version
+@st.cache_resource(max_entries=2)
+def load_cluster_engine(_dataset, version):
+    return ClusterEngine(_dataset.frame, version)
+
+# Read the dataset once per run so the whole page renders from one version
+with perf.span("load_data"):
+    store = load_data_store()
+    dataset = store.current()
+df = dataset.frame
+cube = dataset.cube
+panel = store.panel
+with perf.span("load_resources"):
+    figures = load_figure_cache()
+    models = load_model_server(dataset, dataset.version)
+    models.refresh()
+    scenario_engine = load_scenario_engine(models, dataset.version, models.key())
+    clusters = load_cluster_engine(dataset, dataset.version)
+    export_cache = load_export_cache(dataset, dataset.version)
+
+
+def year_selector(key):
+    """Year slider over the panel's years; just the dataset's year while there is no history."""
+    years = sorted(set(panel.years()) | {dataset.year})
+    if len(years) < 2:
+        return dataset.year
+    return st.select_slider("Year", options=years, value=dataset.year, key=key)
+
+
+def yoy_delta(changes, previous_year, col, fmt):
+    """Card markup for a precomputed year-over-year change, or nothing without one."""
+    value = changes.get(col) if changes else None
+    if value is None or pd.isna(value):
+        return ""
+    arrow, direction = ("▲", "up") if value > 0 else ("▼", "down") if value < 0 else ("■", "flat")
+    return f"<div class='metric-delta {direction}'>{arrow} {fmt.format(value)} vs {previous_year}</div>"
+
+
+TREND_INDICATORS = {
+    "GDP (Billion USD)": 'gdp_total_usd_billion_cleaned',
+    "GDP per Capita (PPP)": 'GDP_per_capita_ppp_cleaned',
+    "GDP Growth Rate (%)": 'GDP_growth_rate_cleaned',
+    "Inflation Rate (%)": 'Inflation_rate_cleaned',
+    "Unemployment Rate (%)": 'Unemployment_rate_cleaned',
+    "Gov. Debt (% of GDP)": 'Gov_Debt_Percent_GDP_Cleaned',
+    "Exports (Bn)": 'Exports_Cleaned_Billion',
+    "Imports (Bn)": 'Imports_Cleaned_Billion',
+    "Trade Openness (%)": 'Trade_Openness',
+}
  
  
 # Header
@@ -134,13 +275,21 @@ st.markdown('<div class="main-header">Economic Intelligence Platform</div>', uns
 # Sidebar Navigation
  
 st.sidebar.title("Navigation")
-section = st.sidebar.selectbox("Select Dashboard:", [
+sections = [
     "Country Analysis",
     "Global Overview",
     "Regional Insights",
     "Trade Analysis",
+    "Cluster Explorer",
+    "Model Insights",
     "Download Data"
-])
+]
+# Hidden unless the page is opened with ?perf=1 or EID_SHOW_PERF=1
+if st.query_params.get("perf") == "1" or os.environ.get("EID_SHOW_PERF") == "1":
+    sections.append("Performance")
+section = st.sidebar.selectbox("Select Dashboard:", sections)
+run.section = section
+section_started = time.perf_counter()
  
  
 # Global Overview Dashboard
@@ -148,20 +297,55 @@ section = st.sidebar.selectbox("Select Dashboard:", [
 if section == "Country Analysis":
     st.markdown("<div class='section-title'>Country Profile</div>", unsafe_allow_html=True)
  
+    # Narrative search over the prebuilt full-text index of this dataset version
+    with st.expander("Search Country Narratives", expanded=bool(st.session_state.get("narrative_query"))):
+        query = st.text_input("Search", key="narrative_query", placeholder="e.g. oil exports, tourism, remittances")
+        col1, col2 = st.columns(2)
+        with col1:
+            search_regions = st.multiselect("Region", list(dataset.explorer.categories["Region"]), key="narrative_regions")
+        with col2:
+            search_classes = st.multiselect("Economic Class", list(dataset.explorer.categories["economic_class"]),
+                                            key="narrative_classes")
+        if query.strip():
+            with perf.span("narrative_search"):
+                hits = dataset.search(query, search_regions, search_classes, limit=10)
+            if not hits:
+                st.caption("No narratives match this search.")
+            for hit in hits:
+                col1, col2 = st.columns([6, 1])
+                with col1:
+                    st.markdown(f"<div class='search-hit'><b>{html.escape(hit.country)}</b> "
+                                f"<span class='score'>{hit.score:.2f}</span><br>{hit.snippet}</div>",
+                                unsafe_allow_html=True)
+                with col2:
+                    st.button("Open", key=f"narrative_open_{hit.position}", on_click=st.session_state.update,
+                              kwargs={"country_select": hit.country})
+
     # Country Selector
     st.markdown("<p style='color: #a0aec0; margin-bottom: 0.5rem;'>Select a Country</p>", unsafe_allow_html=True)
     country_list = sorted(df["Country"].dropna().unique())
     selected_country = st.selectbox("", country_list, key="country_select", label_visibility="collapsed")
  
+    year = year_selector("country_year")
+ 
     if selected_country:
-        country_df = df[df["Country"] == selected_country].iloc[0]
+        country_df = dataset.row(selected_country)
+        if year != dataset.year:
+            # Only this year's partition is read, and only the selected country's row
+            year_row = panel.row(year, selected_country, columns=None)
+            if year_row is None:
+                st.info(f"No {year} figures for {selected_country}; showing {dataset.year}.")
+                year = dataset.year
+            else:
+                country_df = pd.Series(year_row)
+        changes, previous_year = panel.deltas(year, selected_country)
  
                 # 📘 Add Country Summary Block
  
         st.markdown(f"""
         <div class='metric-container'>
             <div class='metric-heading'>Country Summary</div>
-            <div class='metric-body'>{country_df['summary']}</div>
+            <div class='metric-body'>{load_country_summary(dataset, dataset.version, selected_country)}</div>
         </div>
         """, unsafe_allow_html=True)
  
@@ -180,6 +364,7 @@ if section == "Country Analysis":
             <div class='metric-container'>
                 <div class='metric-title'>GDP Growth Rate (%)</div>
                 <div class='metric-value'>{country_df['GDP_growth_rate_cleaned']:.1f}</div>
+                {yoy_delta(changes, previous_year, 'GDP_growth_rate_cleaned', '{:+.1f}')}
             </div>
             """, unsafe_allow_html=True)
  
@@ -188,6 +373,7 @@ if section == "Country Analysis":
             <div class='metric-container'>
                 <div class='metric-title'>Inflation Rate (%)</div>
                 <div class='metric-value'>{country_df['Inflation_rate_cleaned']:.1f}</div>
+                {yoy_delta(changes, previous_year, 'Inflation_rate_cleaned', '{:+.1f}')}
             </div>
             """, unsafe_allow_html=True)
                
@@ -195,6 +381,7 @@ if section == "Country Analysis":
             <div class='metric-container'>
                 <div class='metric-title'>Gov. Debt (% of GDP)</div>
                 <div class='metric-value'>{country_df['Gov_Debt_Percent_GDP_Cleaned']:.1f}</div>
+                {yoy_delta(changes, previous_year, 'Gov_Debt_Percent_GDP_Cleaned', '{:+.1f}')}
             </div>
             """, unsafe_allow_html=True)
  
@@ -203,6 +390,7 @@ if section == "Country Analysis":
             <div class='metric-container'>
                 <div class='metric-title'>Exports (Bn)</div>
                 <div class='metric-value'>{country_df['Exports_Cleaned_Billion']:.2f}</div>
+                {yoy_delta(changes, previous_year, 'Exports_Cleaned_Billion', '{:+.2f}')}
             </div>
             """, unsafe_allow_html=True)
                
@@ -210,6 +398,7 @@ if section == "Country Analysis":
             <div class='metric-container'>
                 <div class='metric-title'>Imports (Bn)</div>
                 <div class='metric-value'>{country_df['Imports_Cleaned_Billion']:.2f}</div>
+                {yoy_delta(changes, previous_year, 'Imports_Cleaned_Billion', '{:+.2f}')}
             </div>
             """, unsafe_allow_html=True)
  
@@ -220,6 +409,7 @@ if section == "Country Analysis":
             <div class='metric-container'>
                 <div class='metric-title'>GDP per Capita (PPP)</div>
                 <div class='metric-value'>${country_df['GDP_per_capita_ppp_cleaned']:,.0f}</div>
+                {yoy_delta(changes, previous_year, 'GDP_per_capita_ppp_cleaned', '{:+,.0f}')}
             </div>
             """, unsafe_allow_html=True)
  
@@ -228,8 +418,128 @@ if section == "Country Analysis":
             <div class='metric-container'>
                 <div class='metric-title'>Trade Openness (%)</div>
                 <div class='metric-value'>{country_df['Trade_Openness']:.2f}</div>
+                {yoy_delta(changes, previous_year, 'Trade_Openness', '{:+.2f}')}
             </div>
             """, unsafe_allow_html=True)
+
+        # History of the country across the panel's year partitions
+        st.markdown('<div class="section-header">Trend</div>', unsafe_allow_html=True)
+        history = panel.history(selected_country)
+        if len(history) < 2:
+            st.caption(f"Trends appear once the panel holds a second year for {selected_country} "
+                       f"(available: {', '.join(map(str, history)) or dataset.year}).")
+        else:
+            trend_label = st.selectbox("Indicator", list(TREND_INDICATORS), key="trend_indicator")
+            def build_country_trend():
+                trend = pd.DataFrame({
+                    "Year": list(history),
+                    trend_label: [row.get(TREND_INDICATORS[trend_label]) for row in history.values()],
+                })
+                fig_trend = px.line(trend, x="Year", y=trend_label, markers=True)
+                fig_trend.update_layout(
+                    height=280,
+                    margin=dict(l=0, r=0, t=10, b=0),
+                    paper_bgcolor="rgba(0,0,0,0)",
+                    plot_bgcolor="rgba(0,0,0,0)",
+                    xaxis=dict(tickmode="array", tickvals=list(history))
+                )
+                return fig_trend
+            fig_trend = figures.get_or_build("Country Analysis", "country_trend", panel.key(), build_country_trend,
+                                             country=selected_country, indicator=trend_label)
+            plotly_chart(fig_trend, use_container_width=True)
+
+        # Peer economies from the dataset's nearest-neighbour index
+        st.markdown('<div class="section-header">Peer Economies</div>', unsafe_allow_html=True)
+        peer_count = st.slider("Number of peers", 3, 15, 5, key="peer_count")
+        peers = dataset.peer_frame(selected_country, peer_count)
+        show_dataframe(
+            peers[["Country", "Distance", "Region", "economic_class", "GDP_per_capita_ppp_cleaned",
+                   "GDP_growth_rate_cleaned", "Inflation_rate_cleaned", "Gov_Debt_Percent_GDP_Cleaned",
+                   "Trade_Openness"]].rename(columns={
+                "economic_class": "Economic Class",
+                "GDP_per_capita_ppp_cleaned": "GDP per Capita (PPP)",
+                "GDP_growth_rate_cleaned": "GDP Growth (%)",
+                "Inflation_rate_cleaned": "Inflation (%)",
+                "Gov_Debt_Percent_GDP_Cleaned": "Gov. Debt (% of GDP)",
+                "Trade_Openness": "Trade Openness (%)",
+            }),
+            use_container_width=True,
+            hide_index=True,
+            column_config={
+                "Distance": st.column_config.NumberColumn(format="%.2f"),
+                "GDP per Capita (PPP)": st.column_config.NumberColumn(format="$%,.0f"),
+            }
+        )
+
+        # What-if scenarios: vary one or two indicators and re-score both models
+        st.markdown('<div class="section-header">What-if Scenarios</div>', unsafe_allow_html=True)
+        indicator_names = list(SCENARIO_INDICATORS)
+        col_x, col_y, col_steps = st.columns(3)
+        with col_x:
+            x_indicator = st.selectbox("Vary", indicator_names, format_func=SCENARIO_INDICATORS.get, key="scenario_x")
+        with col_y:
+            y_indicator = st.selectbox("Against", [None] + [name for name in indicator_names if name != x_indicator],
+                                       format_func=lambda name: "Nothing (sensitivity curve)" if name is None else SCENARIO_INDICATORS[name],
+                                       key="scenario_y")
+        with col_steps:
+            steps = st.slider("Steps per indicator", 10, 200, 50, step=10, key="scenario_steps")
+
+        axes = [(name, cube.total(name, 'min'), cube.total(name, 'max'), steps)
+                for name in (x_indicator, y_indicator) if name is not None]
+        spec = GridSpec(*axes)
+        sweep = scenario_engine.sweep(selected_country, country_df, spec)
+
+        def build_scenario_curve():
+            fig_curve = px.line(
+                sweep,
+                x=x_indicator,
+                y='Predicted PPP',
+                labels={x_indicator: SCENARIO_INDICATORS[x_indicator], 'Predicted PPP': 'Predicted GDP per Capita (PPP)'}
+            )
+            fig_curve.add_trace(go.Scatter(
+                x=sweep[x_indicator], y=sweep['Predicted PPP'], mode='markers', name='Predicted cluster',
+                marker=dict(color=sweep['Predicted Cluster'], colorscale='Viridis', size=6),
+                hovertext=[f"Cluster {cluster}" for cluster in sweep['Predicted Cluster']]
+            ))
+            fig_curve.add_vline(x=country_df[x_indicator], line_dash='dash', line_color='#888')
+            fig_curve.update_layout(
+                height=320,
+                margin=dict(l=0, r=0, t=0, b=0),
+                paper_bgcolor="rgba(0,0,0,0)",
+                plot_bgcolor="rgba(0,0,0,0)"
+            )
+            return fig_curve
+
+        def build_scenario_heatmap():
+            grid = sweep.pivot(index=y_indicator, columns=x_indicator, values='Predicted PPP')
+            fig_heatmap = px.imshow(
+                grid,
+                origin='lower',
+                aspect='auto',
+                color_continuous_scale='Viridis',
+                labels={'x': SCENARIO_INDICATORS[x_indicator], 'y': SCENARIO_INDICATORS[y_indicator], 'color': 'Predicted PPP'}
+            )
+            fig_heatmap.add_trace(go.Scatter(
+                x=[country_df[x_indicator]], y=[country_df[y_indicator]], mode='markers', name=selected_country,
+                marker=dict(color='white', size=10, symbol='x')
+            ))
+            fig_heatmap.update_layout(
+                height=380,
+                margin=dict(l=0, r=0, t=0, b=0),
+                paper_bgcolor="rgba(0,0,0,0)"
+            )
+            return fig_heatmap
+
+        if y_indicator is None:
+            fig_scenario = figures.get_or_build("Country Analysis", "scenario_curve", dataset.version, build_scenario_curve,
+                                                country=selected_country, base=base_key(country_df), grid=spec.key(),
+                                                models=scenario_engine.model_key)
+        else:
+            fig_scenario = figures.get_or_build("Country Analysis", "scenario_heatmap", dataset.version, build_scenario_heatmap,
+                                                country=selected_country, base=base_key(country_df), grid=spec.key(),
+                                                models=scenario_engine.model_key)
+        plotly_chart(fig_scenario, use_container_width=True)
+        st.caption(f"{spec.size():,} scenarios scored. The dashed line / cross marks {selected_country}'s current values.")
        
  
  
@@ -237,26 +547,46 @@ if section == "Country Analysis":
 # Country Analysis Dashboard
  
 elif section == "Global Overview":
+    year = year_selector("overview_year")
+    if year == dataset.year:
+        year_df, year_cube, year_version = df, cube, dataset.version
+    else:
+        # Loads only the selected year's partition
+        view = panel.view(year)
+        year_df, year_cube, year_version = view.frame, view.cube, view.version
    
     # Key Metrics Row
     col1, col2, col3, col4, col5 = st.columns(5)
    
-    total_gdp = df['gdp_total_usd_billion_cleaned'].sum()
-    avg_growth = df['GDP_growth_rate_cleaned'].mean()
-    total_trade = (df['Exports_Cleaned_Billion'].sum() + df['Imports_Cleaned_Billion'].sum())
-    avg_inflation = df['Inflation_rate_cleaned'].mean()
-    total_countries = len(df)
+    total_gdp = year_cube.total('gdp_total_usd_billion_cleaned', 'sum')
+    avg_growth = year_cube.total('GDP_growth_rate_cleaned', 'mean')
+    total_trade = (year_cube.total('Exports_Cleaned_Billion', 'sum') + year_cube.total('Imports_Cleaned_Billion', 'sum'))
+    avg_inflation = year_cube.total('Inflation_rate_cleaned', 'mean')
+    total_countries = year_cube.rows()
+
+    # Year-over-year changes from the summaries stored with each partition
+    gdp_delta = panel.summary_delta(year, 'gdp_total_usd_billion_cleaned:sum')
+    growth_delta = panel.summary_delta(year, 'GDP_growth_rate_cleaned:mean')
+    exports_delta = panel.summary_delta(year, 'Exports_Cleaned_Billion:sum')
+    imports_delta = panel.summary_delta(year, 'Imports_Cleaned_Billion:sum')
+    inflation_delta = panel.summary_delta(year, 'Inflation_rate_cleaned:mean')
+    countries_delta = panel.summary_delta(year, 'rows')
    
     with col1:
-        st.metric("Global GDP", f"${total_gdp:,.0f}T", delta=None)
+        st.metric("Global GDP", f"${total_gdp / 1000:,.1f}T",
+                  delta=f"{gdp_delta / 1000:+,.2f}T" if gdp_delta is not None else None)
     with col2:
-        st.metric("Avg Growth Rate", f"{avg_growth:.1f}%", delta=None)
+        st.metric("Avg Growth Rate", f"{avg_growth:.1f}%",
+                  delta=f"{growth_delta:+.1f} pp" if growth_delta is not None else None)
     with col3:
-        st.metric("Total Trade", f"${total_trade:,.0f}B", delta=None)
+        st.metric("Total Trade", f"${total_trade:,.0f}B",
+                  delta=f"{exports_delta + imports_delta:+,.0f}B" if exports_delta is not None and imports_delta is not None else None)
     with col4:
-        st.metric("Avg Inflation", f"{avg_inflation:.1f}%", delta=None)
+        st.metric("Avg Inflation", f"{avg_inflation:.1f}%",
+                  delta=f"{inflation_delta:+.1f} pp" if inflation_delta is not None else None, delta_color="inverse")
     with col5:
-        st.metric("Countries", f"{total_countries}", delta=None)
+        st.metric("Countries", f"{total_countries}",
+                  delta=f"{countries_delta:+,.0f}" if countries_delta is not None else None)
  
    
     # Main visualizations
@@ -264,82 +594,126 @@ elif section == "Global Overview":
    
     with col1:
         st.markdown('<div class="section-header">World Economic Map</div>', unsafe_allow_html=True)
-        fig_map = px.choropleth(
-            df,
-            locations="Country",
-            locationmode="country names",
-            color="gdp_total_usd_billion_cleaned",
-            hover_name="Country",
-            hover_data={"GDP_growth_rate_cleaned": ":.1f", "GDP_per_capita_ppp_cleaned": ":,.0f"},
-            color_continuous_scale="Viridis",
-            labels={"gdp_total_usd_billion_cleaned": "GDP (Billion USD)"}
-        )
-        fig_map.update_layout(
-            height=280,
-            margin=dict(l=0, r=0, t=0, b=0),
-            geo=dict(bgcolor="rgba(0,0,0,0)", showframe=False),
-            paper_bgcolor="rgba(0,0,0,0)",
-            plot_bgcolor="rgba(0,0,0,0)"
-        )
-        st.plotly_chart(fig_map, use_container_width=True)
+        def build_world_map():
+            fig_map = px.choropleth(
+                year_df,
+                locations="ISO3",
+                locationmode="ISO-3",
+                color="gdp_total_usd_billion_cleaned",
+                hover_name="Country",
+                hover_data={"GDP_growth_rate_cleaned": ":.1f", "GDP_per_capita_ppp_cleaned": ":,.0f"},
+                color_continuous_scale="Viridis",
+                labels={"gdp_total_usd_billion_cleaned": "GDP (Billion USD)"}
+            )
+            fig_map.update_layout(
+                height=280,
+                margin=dict(l=0, r=0, t=0, b=0),
+                geo=dict(bgcolor="rgba(0,0,0,0)", showframe=False),
+                paper_bgcolor="rgba(0,0,0,0)",
+                plot_bgcolor="rgba(0,0,0,0)"
+            )
+            return fig_map
+        fig_map = figures.get_or_build("Global Overview", "world_map", year_version, build_world_map)
+        plotly_chart(fig_map, use_container_width=True)
    
     with col2:
         st.markdown('<div class="section-header">Regional GDP Share</div>', unsafe_allow_html=True)
-        region_gdp = df.groupby('Region')['gdp_total_usd_billion_cleaned'].sum().reset_index()
-        fig_donut = px.pie(
-            region_gdp,
-            values='gdp_total_usd_billion_cleaned',
-            names='Region',
-            hole=0.4,
-            color_discrete_sequence=px.colors.qualitative.Pastel
-        )
-        fig_donut.update_layout(
-            height=220,
-            margin=dict(l=0, r=0, t=0, b=0),
-            paper_bgcolor="rgba(0,0,0,0)"
-        )
-        st.plotly_chart(fig_donut, use_container_width=True)
+        def build_regional_gdp_share():
+            region_gdp = year_cube.rollup('Region')[('gdp_total_usd_billion_cleaned', 'sum')].rename('gdp_total_usd_billion_cleaned').reset_index()
+            fig_donut = px.pie(
+                region_gdp,
+                values='gdp_total_usd_billion_cleaned',
+                names='Region',
+                hole=0.4,
+                color_discrete_sequence=px.colors.qualitative.Pastel
+            )
+            fig_donut.update_layout(
+                height=220,
+                margin=dict(l=0, r=0, t=0, b=0),
+                paper_bgcolor="rgba(0,0,0,0)"
+            )
+            return fig_donut
+        fig_donut = figures.get_or_build("Global Overview", "regional_gdp_share", year_version, build_regional_gdp_share)
+        plotly_chart(fig_donut, use_container_width=True)
    
     # Bottom row
     col3, col4 = st.columns(2)
    
     with col3:
         st.markdown('<div class="section-header">Economic Classes</div>', unsafe_allow_html=True)
-        class_counts = df['economic_class'].value_counts()
-        fig_pie = px.pie(
-            values=class_counts.values,
-            names=class_counts.index,
-            color_discrete_sequence=px.colors.qualitative.Set3
-        )
-        fig_pie.update_layout(
-            height=220,
-            margin=dict(l=0, r=0, t=0, b=0),
-            paper_bgcolor="rgba(0,0,0,0)",
-            showlegend=True
-        )
-        st.plotly_chart(fig_pie, use_container_width=True)
+        def build_economic_classes():
+            class_counts = year_cube.rollup('economic_class')['rows'].sort_values(ascending=False)
+            fig_pie = px.pie(
+                values=class_counts.values,
+                names=class_counts.index,
+                color_discrete_sequence=px.colors.qualitative.Set3
+            )
+            fig_pie.update_layout(
+                height=220,
+                margin=dict(l=0, r=0, t=0, b=0),
+                paper_bgcolor="rgba(0,0,0,0)",
+                showlegend=True
+            )
+            return fig_pie
+        fig_pie = figures.get_or_build("Global Overview", "economic_classes", year_version, build_economic_classes)
+        plotly_chart(fig_pie, use_container_width=True)
    
     with col4:
         st.markdown('<div class="section-header">Top 05 Economies</div>', unsafe_allow_html=True)
-        top_10 = df.nlargest(5, 'gdp_total_usd_billion_cleaned')
-        fig_bar = px.bar(
-            top_10,
-            y='Country',
-            x='gdp_total_usd_billion_cleaned',
-            orientation='h',
-            color='gdp_total_usd_billion_cleaned',
-            color_continuous_scale="Blues"
-        )
-        fig_bar.update_layout(
-            height=280,
-            margin=dict(l=0, r=0, t=0, b=10),
-            showlegend=False,
-            paper_bgcolor="rgba(0,0,0,0)",
-            plot_bgcolor="rgba(0,0,0,0)",
-            xaxis_title="GDP (Billion USD)",
-            yaxis_title=""
-        )
-        st.plotly_chart(fig_bar, use_container_width=True)
+        def build_top_economies():
+            top_10 = year_df.nlargest(5, 'gdp_total_usd_billion_cleaned')
+            fig_bar = px.bar(
+                top_10,
+                y='Country',
+                x='gdp_total_usd_billion_cleaned',
+                orientation='h',
+                color='gdp_total_usd_billion_cleaned',
+                color_continuous_scale="Blues"
+            )
+            fig_bar.update_layout(
+                height=280,
+                margin=dict(l=0, r=0, t=0, b=10),
+                showlegend=False,
+                paper_bgcolor="rgba(0,0,0,0)",
+                plot_bgcolor="rgba(0,0,0,0)",
+                xaxis_title="GDP (Billion USD)",
+                yaxis_title=""
+            )
+            return fig_bar
+        fig_bar = figures.get_or_build("Global Overview", "top_economies", year_version, build_top_economies)
+        plotly_chart(fig_bar, use_container_width=True)
+
+    # Global trends straight from the per-year summaries; no partition is opened
+    st.markdown('<div class="section-header">Global Trends</div>', unsafe_allow_html=True)
+    trends = panel.trends()
+    if len(trends) < 2:
+        st.caption(f"Trends appear once the panel holds a second year (available: "
+                   f"{', '.join(map(str, trends)) or dataset.year}).")
+    else:
+        def build_global_trends():
+            trend_years = list(trends)
+            fig_trends = make_subplots(rows=1, cols=4, subplot_titles=(
+                "Global GDP (Bn)", "Avg Growth Rate (%)", "Total Trade (Bn)", "Avg Inflation (%)"
+            ))
+            series = [
+                [t['gdp_total_usd_billion_cleaned:sum'] for t in trends.values()],
+                [t['GDP_growth_rate_cleaned:mean'] for t in trends.values()],
+                [t['Exports_Cleaned_Billion:sum'] + t['Imports_Cleaned_Billion:sum'] for t in trends.values()],
+                [t['Inflation_rate_cleaned:mean'] for t in trends.values()],
+            ]
+            for i, values in enumerate(series, start=1):
+                fig_trends.add_trace(go.Scatter(x=trend_years, y=values, mode="lines+markers", showlegend=False),
+                                     row=1, col=i)
+            fig_trends.update_xaxes(tickmode="array", tickvals=trend_years)
+            fig_trends.update_layout(
+                height=260,
+                margin=dict(l=0, r=0, t=30, b=0),
+                paper_bgcolor="rgba(0,0,0,0)",
+                plot_bgcolor="rgba(0,0,0,0)"
+            )
+            return fig_trends
+        fig_trends = figures.get_or_build("Global Overview", "global_trends", panel.key(), build_global_trends)
+        plotly_chart(fig_trends, use_container_width=True)
  
  
 # Regional Insights Dashboard
@@ -347,26 +721,21 @@ elif section == "Global Overview":
 elif section == "Regional Insights":
    
     # Regional summary metrics
-    regions = df['Region'].unique()
-    region_metrics = []
-   
-    for region in regions:
-        region_df = df[df['Region'] == region]
-        region_metrics.append({
-            'Region': region,
-            'Countries': len(region_df),
-            'Total GDP': region_df['gdp_total_usd_billion_cleaned'].sum(),
-            'Avg Growth': region_df['GDP_growth_rate_cleaned'].mean(),
-            'Total Trade': (region_df['Exports_Cleaned_Billion'].sum() + region_df['Imports_Cleaned_Billion'].sum())
-        })
-   
-    region_summary = pd.DataFrame(region_metrics)
+    region_rollup = cube.rollup('Region')
+    regions = region_rollup.index
+    region_summary = pd.DataFrame({
+        'Region': regions,
+        'Countries': region_rollup['rows'].to_numpy(),
+        'Total GDP': region_rollup[('gdp_total_usd_billion_cleaned', 'sum')].to_numpy(),
+        'Avg Growth': region_rollup[('GDP_growth_rate_cleaned', 'mean')].to_numpy(),
+        'Total Trade': (region_rollup[('Exports_Cleaned_Billion', 'sum')] + region_rollup[('Imports_Cleaned_Billion', 'sum')]).to_numpy()
+    })
    
     # Display regional metrics
     cols = st.columns(len(regions))
     for i, region in enumerate(regions):
         with cols[i]:
-            region_data = region_summary[region_summary['Region'] == region].iloc[0]
+            region_data = region_summary.iloc[i]
             st.metric(
                 f"{region}",
                 f"${region_data['Total GDP']:,.0f}B",
@@ -378,42 +747,48 @@ elif section == "Regional Insights":
    
     with col1:
         st.markdown('<div class="section-header">Regional Economic Performance</div>', unsafe_allow_html=True)
-        fig_region_perf = px.scatter(
-            region_summary,
-            x='Total GDP',
-            y='Avg Growth',
-            size='Countries',
-            color='Region',
-            hover_name='Region',
-            size_max=60,
-            color_discrete_sequence=px.colors.qualitative.Set2
-        )
-        fig_region_perf.update_layout(
-            height=250,
-            margin=dict(l=0, r=0, t=0, b=10),
-            paper_bgcolor="rgba(0,0,0,0)",
-            plot_bgcolor="rgba(0,0,0,0)",
-            xaxis_title="Total GDP (Billion USD)",
-            yaxis_title="Average Growth Rate (%)"
-        )
-        st.plotly_chart(fig_region_perf, use_container_width=True)
+        def build_regional_performance():
+            fig_region_perf = px.scatter(
+                region_summary,
+                x='Total GDP',
+                y='Avg Growth',
+                size='Countries',
+                color='Region',
+                hover_name='Region',
+                size_max=60,
+                color_discrete_sequence=px.colors.qualitative.Set2
+            )
+            fig_region_perf.update_layout(
+                height=250,
+                margin=dict(l=0, r=0, t=0, b=10),
+                paper_bgcolor="rgba(0,0,0,0)",
+                plot_bgcolor="rgba(0,0,0,0)",
+                xaxis_title="Total GDP (Billion USD)",
+                yaxis_title="Average Growth Rate (%)"
+            )
+            return fig_region_perf
+        fig_region_perf = figures.get_or_build("Regional Insights", "regional_performance", dataset.version, build_regional_performance)
+        plotly_chart(fig_region_perf, use_container_width=True)
    
     with col2:
         st.markdown('<div class="section-header">Regional GDP Share</div>', unsafe_allow_html=True)
-        region_gdp = df.groupby('Region')['gdp_total_usd_billion_cleaned'].sum().reset_index()
-        fig_donut = px.pie(
-            region_gdp,
-            values='gdp_total_usd_billion_cleaned',
-            names='Region',
-            hole=0.4,
-            color_discrete_sequence=px.colors.qualitative.Pastel
-        )
-        fig_donut.update_layout(
-            height=250,
-            margin=dict(l=0, r=0, t=0, b=0),
-            paper_bgcolor="rgba(0,0,0,0)"
-        )
-        st.plotly_chart(fig_donut, use_container_width=True)
+        def build_regional_gdp_share():
+            region_gdp = cube.rollup('Region')[('gdp_total_usd_billion_cleaned', 'sum')].rename('gdp_total_usd_billion_cleaned').reset_index()
+            fig_donut = px.pie(
+                region_gdp,
+                values='gdp_total_usd_billion_cleaned',
+                names='Region',
+                hole=0.4,
+                color_discrete_sequence=px.colors.qualitative.Pastel
+            )
+            fig_donut.update_layout(
+                height=250,
+                margin=dict(l=0, r=0, t=0, b=0),
+                paper_bgcolor="rgba(0,0,0,0)"
+            )
+            return fig_donut
+        fig_donut = figures.get_or_build("Regional Insights", "regional_gdp_share", dataset.version, build_regional_gdp_share)
+        plotly_chart(fig_donut, use_container_width=True)
  
    
     # Bottom row
@@ -421,45 +796,55 @@ elif section == "Regional Insights":
    
     with col3:
         st.markdown('<div class="section-header">Trade Balance by Region</div>', unsafe_allow_html=True)
-        region_trade = df.groupby('Region')[['Exports_Cleaned_Billion', 'Imports_Cleaned_Billion']].sum().reset_index()
-        region_trade['Trade Balance'] = region_trade['Exports_Cleaned_Billion'] - region_trade['Imports_Cleaned_Billion']
+        def build_trade_balance_by_region():
+            region_trade = pd.DataFrame({
+                'Region': region_rollup.index,
+                'Exports_Cleaned_Billion': region_rollup[('Exports_Cleaned_Billion', 'sum')].to_numpy(),
+                'Imports_Cleaned_Billion': region_rollup[('Imports_Cleaned_Billion', 'sum')].to_numpy()
+            })
+            region_trade['Trade Balance'] = region_trade['Exports_Cleaned_Billion'] - region_trade['Imports_Cleaned_Billion']
        
-        fig_trade_balance = px.bar(
-            region_trade,
-            x='Region',
-            y='Trade Balance',
-            color='Trade Balance',
-            color_continuous_scale='RdYlGn'
-        )
-        fig_trade_balance.update_layout(
-            height=200,
-            margin=dict(l=0, r=0, t=0, b=30),
-            paper_bgcolor="rgba(0,0,0,0)",
-            plot_bgcolor="rgba(0,0,0,0)",
-            yaxis_title="Trade Balance (Billion USD)"
-        )
-        fig_trade_balance.update_xaxes(tickangle=45)
-        st.plotly_chart(fig_trade_balance, use_container_width=True)
+            fig_trade_balance = px.bar(
+                region_trade,
+                x='Region',
+                y='Trade Balance',
+                color='Trade Balance',
+                color_continuous_scale='RdYlGn'
+            )
+            fig_trade_balance.update_layout(
+                height=200,
+                margin=dict(l=0, r=0, t=0, b=30),
+                paper_bgcolor="rgba(0,0,0,0)",
+                plot_bgcolor="rgba(0,0,0,0)",
+                yaxis_title="Trade Balance (Billion USD)"
+            )
+            fig_trade_balance.update_xaxes(tickangle=45)
+            return fig_trade_balance
+        fig_trade_balance = figures.get_or_build("Regional Insights", "trade_balance_by_region", dataset.version, build_trade_balance_by_region)
+        plotly_chart(fig_trade_balance, use_container_width=True)
    
     with col4:
         st.markdown('<div class="section-header">GDP Distribution by Region</div>', unsafe_allow_html=True)
-        fig_box = px.box(
-            df,
-            x='Region',
-            y='gdp_total_usd_billion_cleaned',
-            color='Region',
-            color_discrete_sequence=px.colors.qualitative.Set2
-        )
-        fig_box.update_layout(
-            height=200,
-            margin=dict(l=0, r=0, t=0, b=30),
-            showlegend=False,
-            paper_bgcolor="rgba(0,0,0,0)",
-            plot_bgcolor="rgba(0,0,0,0)",
-            yaxis_title="GDP (Billion USD)"
-        )
-        fig_box.update_xaxes(tickangle=45)
-        st.plotly_chart(fig_box, use_container_width=True)
+        def build_gdp_distribution():
+            fig_box = adaptive_box(
+                df,
+                cube,
+                x='Region',
+                y='gdp_total_usd_billion_cleaned',
+                color_discrete_sequence=px.colors.qualitative.Set2
+            )
+            fig_box.update_layout(
+                height=200,
+                margin=dict(l=0, r=0, t=0, b=30),
+                showlegend=False,
+                paper_bgcolor="rgba(0,0,0,0)",
+                plot_bgcolor="rgba(0,0,0,0)",
+                yaxis_title="GDP (Billion USD)"
+            )
+            fig_box.update_xaxes(tickangle=45)
+            return fig_box
+        fig_box = figures.get_or_build("Regional Insights", "gdp_distribution", dataset.version, build_gdp_distribution)
+        plotly_chart(fig_box, use_container_width=True)
  
  
 # Trade Analysis Dashboard
@@ -467,11 +852,11 @@ elif section == "Regional Insights":
 elif section == "Trade Analysis":
    
     # Trade metrics
-    total_exports = df['Exports_Cleaned_Billion'].sum()
-    total_imports = df['Imports_Cleaned_Billion'].sum()
-    trade_surplus_countries = len(df[df['Trade Balance'] > 0])
-    trade_deficit_countries = len(df[df['Trade Balance'] < 0])
-    avg_trade_openness = df['Trade_Openness'].mean()
+    total_exports = cube.total('Exports_Cleaned_Billion', 'sum')
+    total_imports = cube.total('Imports_Cleaned_Billion', 'sum')
+    trade_surplus_countries = int(cube.total('trade_surplus', 'sum'))
+    trade_deficit_countries = int(cube.total('trade_deficit', 'sum'))
+    avg_trade_openness = cube.total('Trade_Openness', 'mean')
    
     col1, col2, col3, col4, col5 = st.columns(5)
    
@@ -491,123 +876,354 @@ elif section == "Trade Analysis":
    
     with col1:
         st.markdown('<div class="section-header">Global Trade Balance</div>', unsafe_allow_html=True)
-        top_traders = df.nlargest(15, 'gdp_total_usd_billion_cleaned')
+        def build_global_trade_balance():
+            top_traders = df.nlargest(15, 'gdp_total_usd_billion_cleaned')
        
-        fig_trade_bal = go.Figure()
-        fig_trade_bal.add_trace(go.Bar(
-            name='Exports',
-            x=top_traders['Country'],
-            y=top_traders['Exports_Cleaned_Billion'],
-            marker_color='#00d4aa'
-        ))
-        fig_trade_bal.add_trace(go.Bar(
-            name='Imports',
-            x=top_traders['Country'],
-            y=-top_traders['Imports_Cleaned_Billion'],
-            marker_color='#ff6b6b'
-        ))
+            fig_trade_bal = go.Figure()
+            fig_trade_bal.add_trace(go.Bar(
+                name='Exports',
+                x=top_traders['Country'],
+                y=top_traders['Exports_Cleaned_Billion'],
+                marker_color='#00d4aa'
+            ))
+            fig_trade_bal.add_trace(go.Bar(
+                name='Imports',
+                x=top_traders['Country'],
+                y=-top_traders['Imports_Cleaned_Billion'],
+                marker_color='#ff6b6b'
+            ))
        
-        fig_trade_bal.update_layout(
-            barmode='relative',
-            height=280,
-            margin=dict(l=0, r=0, t=0, b=30),
-            paper_bgcolor="rgba(0,0,0,0)",
-            plot_bgcolor="rgba(0,0,0,0)",
-            yaxis_title="Trade Value (Billion USD)",
-            xaxis_title=""
-        )
-        fig_trade_bal.update_xaxes(tickangle=45)
-        st.plotly_chart(fig_trade_bal, use_container_width=True)
+            fig_trade_bal.update_layout(
+                barmode='relative',
+                height=280,
+                margin=dict(l=0, r=0, t=0, b=30),
+                paper_bgcolor="rgba(0,0,0,0)",
+                plot_bgcolor="rgba(0,0,0,0)",
+                yaxis_title="Trade Value (Billion USD)",
+                xaxis_title=""
+            )
+            fig_trade_bal.update_xaxes(tickangle=45)
+            return fig_trade_bal
+        fig_trade_bal = figures.get_or_build("Trade Analysis", "global_trade_balance", dataset.version, build_global_trade_balance)
+        plotly_chart(fig_trade_bal, use_container_width=True)
    
     with col2:
         st.markdown('<div class="section-header">Top Trade Partners</div>', unsafe_allow_html=True)
-        df['Total Trade'] = df['Exports_Cleaned_Billion'] + df['Imports_Cleaned_Billion']
-        top_trade = df.nlargest(10, 'Total Trade')
+        def build_top_trade_partners():
+            top_trade = df.nlargest(10, 'Total Trade')
        
-        fig_top_trade = px.bar(
-            top_trade,
-            y='Country',
-            x='Total Trade',
-            orientation='h',
-            color='Total Trade',
-            color_continuous_scale='Blues'
-        )
-        fig_top_trade.update_layout(
-            height=280,
-            margin=dict(l=0, r=0, t=0, b=10),
-            showlegend=False,
-            paper_bgcolor="rgba(0,0,0,0)",
-            plot_bgcolor="rgba(0,0,0,0)",
-            xaxis_title="Total Trade (Billion USD)",
-            yaxis_title=""
-        )
-        st.plotly_chart(fig_top_trade, use_container_width=True)
+            fig_top_trade = px.bar(
+                top_trade,
+                y='Country',
+                x='Total Trade',
+                orientation='h',
+                color='Total Trade',
+                color_continuous_scale='Blues'
+            )
+            fig_top_trade.update_layout(
+                height=280,
+                margin=dict(l=0, r=0, t=0, b=10),
+                showlegend=False,
+                paper_bgcolor="rgba(0,0,0,0)",
+                plot_bgcolor="rgba(0,0,0,0)",
+                xaxis_title="Total Trade (Billion USD)",
+                yaxis_title=""
+            )
+            return fig_top_trade
+        fig_top_trade = figures.get_or_build("Trade Analysis", "top_trade_partners", dataset.version, build_top_trade_partners)
+        plotly_chart(fig_top_trade, use_container_width=True)
    
     # Bottom visualizations
     col3, col4 = st.columns(2)
    
     with col3:
         st.markdown('<div class="section-header">Trade Openness vs GDP</div>', unsafe_allow_html=True)
-        fig_openness = px.scatter(
-            df,
-            x='GDP_per_capita_ppp_cleaned',
-            y='Trade_Openness',
-            size='gdp_total_usd_billion_cleaned',
-            color='Region',
-            hover_name='Country',
-            color_discrete_sequence=px.colors.qualitative.Set2
-        )
-        fig_openness.update_layout(
-            height=220,
-            margin=dict(l=0, r=0, t=0, b=10),
-            paper_bgcolor="rgba(0,0,0,0)",
-            plot_bgcolor="rgba(0,0,0,0)",
-            xaxis_title="GDP per Capita (PPP)",
-            yaxis_title="Trade Openness (%)"
-        )
-        st.plotly_chart(fig_openness, use_container_width=True)
+        def build_openness_vs_gdp():
+            fig_openness = adaptive_scatter(
+                df,
+                x='GDP_per_capita_ppp_cleaned',
+                y='Trade_Openness',
+                size='gdp_total_usd_billion_cleaned',
+                color='Region',
+                hover_name='Country',
+                color_discrete_sequence=px.colors.qualitative.Set2
+            )
+            fig_openness.update_layout(
+                height=220,
+                margin=dict(l=0, r=0, t=0, b=10),
+                paper_bgcolor="rgba(0,0,0,0)",
+                plot_bgcolor="rgba(0,0,0,0)",
+                xaxis_title="GDP per Capita (PPP)",
+                yaxis_title="Trade Openness (%)"
+            )
+            return fig_openness
+        fig_openness = figures.get_or_build("Trade Analysis", "openness_vs_gdp", dataset.version, build_openness_vs_gdp)
+        plotly_chart(fig_openness, use_container_width=True)
    
     with col4:
         st.markdown('<div class="section-header">Regional Trade Shares</div>', unsafe_allow_html=True)
-        region_exports = df.groupby('Region')['Exports_Cleaned_Billion'].sum().reset_index()
-        fig_regional_trade = px.pie(
-            region_exports,
-            values='Exports_Cleaned_Billion',
-            names='Region',
-            color_discrete_sequence=px.colors.qualitative.Pastel
-        )
-        fig_regional_trade.update_layout(
-            height=220,
-            margin=dict(l=0, r=0, t=0, b=0),
-            paper_bgcolor="rgba(0,0,0,0)"
-        )
-        st.plotly_chart(fig_regional_trade, use_container_width=True)
+        def build_regional_trade_shares():
+            region_exports = cube.rollup('Region')[('Exports_Cleaned_Billion', 'sum')].rename('Exports_Cleaned_Billion').reset_index()
+            fig_regional_trade = px.pie(
+                region_exports,
+                values='Exports_Cleaned_Billion',
+                names='Region',
+                color_discrete_sequence=px.colors.qualitative.Pastel
+            )
+            fig_regional_trade.update_layout(
+                height=220,
+                margin=dict(l=0, r=0, t=0, b=0),
+                paper_bgcolor="rgba(0,0,0,0)"
+            )
+            return fig_regional_trade
+        fig_regional_trade = figures.get_or_build("Trade Analysis", "regional_trade_shares", dataset.version, build_regional_trade_shares)
+        plotly_chart(fig_regional_trade, use_container_width=True)
  
  
  
+# Cluster Explorer
+
+elif section == "Cluster Explorer":
+    st.markdown("<div class='section-title'>Cluster Explorer</div>", unsafe_allow_html=True)
+
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        cluster_features = st.multiselect("Features", EXPLORER_FEATURES, default=DEFAULT_FEATURES, key="cluster_features")
+    with col2:
+        k = st.slider("Clusters (k)", 2, 10, 4, key="cluster_k")
+
+    if not cluster_features:
+        st.info("Choose at least one feature to cluster on.")
+    else:
+        result = clusters.fit(cluster_features, k)
+        valid = result.labels >= 0
+
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Countries Clustered", f"{valid.sum()}")
+        with col2:
+            st.metric("Inertia", f"{result.inertia:,.1f}")
+        with col3:
+            st.metric("Variance Shown (PC1 + PC2)", f"{result.explained.sum():.0%}")
+
+        st.markdown('<div class="section-header">PCA Projection</div>', unsafe_allow_html=True)
+        def build_cluster_projection():
+            projected = pd.DataFrame({
+                'PC1': result.projection[:, 0],
+                'PC2': result.projection[:, 1],
+                'Cluster': result.labels[valid].astype(str),
+                'Country': df['Country'].to_numpy(dtype=object)[valid],
+                'Region': df['Region'].to_numpy(dtype=object)[valid],
+            })
+            fig_projection = px.scatter(
+                projected,
+                x='PC1',
+                y='PC2',
+                color='Cluster',
+                hover_name='Country',
+                hover_data={'Region': True},
+                category_orders={'Cluster': [str(i) for i in range(k)]},
+                color_discrete_sequence=px.colors.qualitative.Set2
+            )
+            fig_projection.update_layout(
+                height=420,
+                margin=dict(l=0, r=0, t=0, b=0),
+                paper_bgcolor="rgba(0,0,0,0)",
+                plot_bgcolor="rgba(0,0,0,0)"
+            )
+            return fig_projection
+        fig_projection = figures.get_or_build("Cluster Explorer", "pca_projection", dataset.version, build_cluster_projection,
+                                              features=tuple(cluster_features), k=k)
+        plotly_chart(fig_projection, use_container_width=True)
+
+        st.markdown('<div class="section-header">Cluster Profiles</div>', unsafe_allow_html=True)
+        profile = df.loc[valid, list(cluster_features)].astype('float64')
+        profile['Cluster'] = result.labels[valid]
+        profile = profile.groupby('Cluster').mean().reindex(range(k))
+        profile.insert(0, 'Countries', result.sizes())
+        show_dataframe(profile, use_container_width=True)
+
+
+# Model Insights
+
+elif section == "Model Insights":
+    st.markdown("<div class='section-title'>Model Insights</div>", unsafe_allow_html=True)
+    insights = models.insights(df)
+    st.caption(f"GDP model: {models.sources['gdp_ppp']}")
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Mean Abs. Error (PPP)", f"${insights['Residual'].abs().mean():,.0f}")
+    with col2:
+        st.metric("Correlation", f"{insights['Actual PPP'].corr(insights['Predicted PPP']):.3f}")
+    with col3:
+        st.metric("Cluster Agreement", f"{(insights['Cluster'] == insights['Predicted Cluster']).mean():.0%}")
+
+    st.markdown('<div class="section-header">Predicted vs Actual GDP per Capita (PPP)</div>', unsafe_allow_html=True)
+    def build_predicted_vs_actual():
+        fig_predicted = px.scatter(
+            insights,
+            x='Actual PPP',
+            y='Predicted PPP',
+            color='Region',
+            hover_name='Country',
+            hover_data={'Residual': ':,.0f', 'Predicted Cluster': True}
+        )
+        upper = max(insights['Actual PPP'].max(), insights['Predicted PPP'].max())
+        fig_predicted.add_trace(go.Scatter(
+            x=[0, upper], y=[0, upper], mode='lines', name='Perfect fit',
+            line=dict(color='#888', dash='dash')
+        ))
+        fig_predicted.update_layout(
+            height=380,
+            margin=dict(l=0, r=0, t=0, b=0),
+            paper_bgcolor="rgba(0,0,0,0)",
+            plot_bgcolor="rgba(0,0,0,0)"
+        )
+        return fig_predicted
+    fig_predicted = figures.get_or_build("Model Insights", "predicted_vs_actual", dataset.version, build_predicted_vs_actual,
+                                          models=models.key())
+    plotly_chart(fig_predicted, use_container_width=True)
+
+    st.markdown('<div class="section-header">Predictions by Country</div>', unsafe_allow_html=True)
+    show_dataframe(
+        insights.sort_values('Residual', key=abs, ascending=False),
+        use_container_width=True,
+        height=400,
+        hide_index=True
+    )
+
+
 # Download Data
  
 elif section == "Download Data":
         st.markdown("<div class='section-title'>Download Cleaned Dataset</div>", unsafe_allow_html=True)
        
-        # Download button
-        csv_data = df.to_csv(index=False).encode('utf-8')
-        st.download_button(
-            "⬇ Download CSV",
-            data=csv_data,
-            file_name="economic_intelligence_dataset.csv",
-            mime="text/csv"
-        )
-       
-        # Display data table
+        # Data explorer: filtering, sorting and paging run here, only the visible page is sent
         st.markdown("<div style='margin-top: 2rem;'></div>", unsafe_allow_html=True)
-        st.dataframe(
-            df.head(100),
+        st.markdown('<div class="section-header">Data Explorer</div>', unsafe_allow_html=True)
+        explorer = dataset.explorer
+
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            search = st.text_input("Country contains", key="explorer_search")
+        with col2:
+            regions = st.multiselect("Region", list(explorer.categories["Region"]), key="explorer_region")
+        with col3:
+            classes = st.multiselect("Economic Class", list(explorer.categories["economic_class"]), key="explorer_class")
+        with col4:
+            cluster_ids = st.multiselect("Cluster", list(explorer.categories["cluster"]), key="explorer_cluster")
+
+        col1, col2, col3 = st.columns([2, 2, 1])
+        with col1:
+            range_column = st.selectbox("Range filter", [None] + explorer.numeric_columns,
+                                        format_func=lambda col: "None" if col is None else col, key="explorer_range_column")
+            ranges = {}
+            if range_column is not None:
+                low, high = explorer.bounds(range_column)
+                if low < high:
+                    ranges[range_column] = st.slider(range_column, low, high, (low, high), key=f"explorer_range_{range_column}")
+        with col2:
+            sort_by = st.selectbox("Sort by", [None] + list(df.columns),
+                                   format_func=lambda col: "Dataset order" if col is None else col, key="explorer_sort")
+        with col3:
+            ascending = st.radio("Order", ["Ascending", "Descending"], key="explorer_order") == "Ascending"
+
+        visible_columns = st.multiselect("Columns", list(df.columns), default=list(df.columns[:12]), key="explorer_columns")
+        col1, col2 = st.columns([1, 3])
+        with col1:
+            page_size = st.selectbox("Rows per page", [25, 50, 100, 250], index=1, key="explorer_page_size")
+        with col2:
+            page_number = st.number_input("Page", min_value=1, value=1, step=1, key="explorer_page")
+
+        filters = dict(
+            categories={"Region": regions, "economic_class": classes, "cluster": cluster_ids},
+            ranges=ranges,
+            search=search.strip(),
+            sort_by=sort_by,
+            ascending=ascending,
+        )
+        result = explorer.query(visible_columns or ["Country"], page=page_number - 1, page_size=page_size, **filters)
+        st.caption(f"Rows {result.first_row:,}-{result.last_row:,} of {result.total:,} "
+                   f"(page {result.page + 1} of {result.pages})")
+        show_dataframe(
+            result.frame,
             use_container_width=True,
-            height=400
+            height=400,
+            hide_index=True
         )
- 
- 
+
+        # Download: the file is written (once per version and selection) only when the button is clicked
+        st.markdown('<div class="section-header">Download</div>', unsafe_allow_html=True)
+        col1, col2 = st.columns(2)
+        with col1:
+            export_format = st.selectbox("Format", list(FORMATS), key="export_format")
+        with col2:
+            export_rows = st.radio("Rows", ["Full dataset", "Explorer selection"], horizontal=True, key="export_rows")
+        if export_rows == "Full dataset":
+            positions, columns = None, None
+            st.caption(f"All {len(df):,} rows and columns, including the country summaries.")
+        else:
+            positions, columns = explorer.select(**filters), visible_columns or ["Country"]
+            st.caption(f"{len(positions):,} rows x {len(columns)} columns, in the explorer's sort order.")
+        extension, mime = FORMATS[export_format]
+        st.download_button(
+            f"⬇ Download {export_format}",
+            data=export_cache.opener(dataset.version, export_format, positions, columns),
+            file_name=f"economic_intelligence_dataset{extension}",
+            mime=mime
+        )
+
+
+# Performance (hidden)
+
+elif section == "Performance":
+    st.markdown("<div class='section-title'>Performance</div>", unsafe_allow_html=True)
+    recent_runs = st.session_state.get("perf_runs", [])
+    previous = recent_runs[-1] if recent_runs else None
+
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Previous Rerun", f"{previous['seconds'] * 1000:,.0f} ms" if previous else "N/A")
+    with col2:
+        st.metric("Previous Payload", f"{previous['payload_bytes'] / 1024:,.0f} KB" if previous else "N/A")
+    with col3:
+        st.metric("Process Memory", f"{metrics.process_rss_bytes() / 2**20:,.0f} MB")
+    with col4:
+        # Shallow size of the session's widget values and run history
+        session_bytes = sum(sys.getsizeof(value) for value in st.session_state.to_dict().values())
+        st.metric("Session State", f"{session_bytes / 1024:,.1f} KB")
+
+    if metrics_server is not None:
+        host, port = metrics_server.server_address[:2]
+        st.caption(f"Prometheus metrics: http://{host}:{port}/metrics")
+
+    st.markdown('<div class="section-header">Recent Reruns (this session)</div>', unsafe_allow_html=True)
+    if recent_runs:
+        show_dataframe(pd.DataFrame([
+            {"Section": r["section"], "Seconds": r["seconds"], "Payload (bytes)": r["payload_bytes"],
+             "Spans": len(r["spans"])}
+            for r in reversed(recent_runs)
+        ]), use_container_width=True, hide_index=True)
+        st.markdown('<div class="section-header">Spans of the Previous Rerun</div>', unsafe_allow_html=True)
+        show_dataframe(pd.DataFrame(previous["spans"]), use_container_width=True, hide_index=True)
+    else:
+        st.info("No reruns recorded yet in this session.")
+
+    st.markdown('<div class="section-header">Span Summary (all sessions)</div>', unsafe_allow_html=True)
+    span_table = perf.span_table()
+    if span_table:
+        show_dataframe(pd.DataFrame(span_table), use_container_width=True, hide_index=True)
+
+    st.markdown('<div class="section-header">Caches</div>', unsafe_allow_html=True)
+    collected = perf.collected()
+    if collected:
+        show_dataframe(pd.DataFrame.from_dict(collected, orient="index"), use_container_width=True)
+
+
+perf.observe("section", time.perf_counter() - section_started, section=section)
+
+
 # Footer
  
 st.markdown(
@@ -617,4 +1233,6 @@ st.markdown(
     unsafe_allow_html=True
 )
 
- 
+finished = perf.finish_run()
+if finished is not None:
+    st.session_state["perf_runs"] = (st.session_state.get("perf_runs", []) + [finished.as_dict()])[-20:]
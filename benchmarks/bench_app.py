@@ -0,0 +1,288 @@
+"""
+Headless benchmark of the dashboard sections, with regression gates.
+
+For each dataset size a synthetic Final_output.csv is generated (see
+synthetic_data.py) and its snapshot built once, and the snapshot's panel is
+seeded with PANEL_HISTORY earlier years (synthetic copies with other seeds), so
+the year sliders, year-over-year deltas and trend charts have history to read.
+Then every case runs in a fresh process through Streamlit's AppTest, with
+EID_DATA_PATH / EID_REFERENCE_PATH / EID_SNAPSHOT_DIR pointing the app at that
+dataset. A case is a section, optionally with widget interactions applied after
+switching to it (CASES: a narrative search, the earliest panel year), and records:
+
+- cold_start_s: first script run plus the switch to the section and its
+  interactions, in a new process (imports, dataset load, model and engine
+  construction, first render)
+- warm_rerun_s: median of --repeat further reruns of the section (caches hot)
+- peak_rss_mb: peak resident memory of the process
+- the span summary of the run (load_data, figure_build, plotly_chart, ...) from
+  metrics.REGISTRY, so a slow section can be traced to a stage
+
+Results are compared with benchmarks/baseline.json. A metric regresses when it
+exceeds baseline * threshold and baseline + min_delta (the absolute floor keeps
+millisecond noise from failing the gate); the script then exits with status 1.
+Thresholds come from the baseline file and can be overridden with --threshold.
+
+The gate runs 1k, 100k and 1M rows by default; the 1M cases take several
+minutes, so use --rows 1000 100000 for a quick local check.
+
+Usage:
+    python benchmarks/bench_app.py                                   # 1k, 100k and 1M rows, compare
+    python benchmarks/bench_app.py --rows 1000 100000                # quick check
+    python benchmarks/bench_app.py --update-baseline
+    python benchmarks/bench_app.py --sections "Trade Analysis" "Global Overview: earliest year"
+    python benchmarks/bench_app.py --threshold warm_rerun_s=1.5 --output results.json
+"""
+import argparse
+import json
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BASE_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, BASE_DIR)
+
+APP = os.path.join(BASE_DIR, "app.py")
+BASELINE = os.path.join(BENCH_DIR, "baseline.json")
+SECTIONS = [
+    "Country Analysis",
+    "Global Overview",
+    "Regional Insights",
+    "Trade Analysis",
+    "Cluster Explorer",
+    "Model Insights",
+    "Download Data",
+]
+# Section plus widget interactions: (widget, key, value), "earliest" picks the first slider option
+INTERACTIONS = {
+    "Country Analysis: narrative search": ("Country Analysis", [("text_input", "narrative_query", "oil exports")]),
+    "Country Analysis: earliest year": ("Country Analysis", [("select_slider", "country_year", "earliest")]),
+    "Global Overview: earliest year": ("Global Overview", [("select_slider", "overview_year", "earliest")]),
+}
+CASES = {**{section: (section, []) for section in SECTIONS}, **INTERACTIONS}
+DEFAULT_ROWS = [1_000, 100_000, 1_000_000]
+PANEL_HISTORY = 2
+METRICS = ["cold_start_s", "warm_rerun_s", "peak_rss_mb"]
+DEFAULT_THRESHOLDS = {"cold_start_s": 1.5, "warm_rerun_s": 1.5, "peak_rss_mb": 1.2}
+DEFAULT_MIN_DELTA = {"cold_start_s": 1.0, "warm_rerun_s": 0.1, "peak_rss_mb": 50.0}
+TIMEOUT = 1800
+
+
+def peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+# --- worker side: runs in the child process ---------------------------------------------
+
+def interact(at, widget, key, value):
+    element = getattr(at, widget)(key=key)
+    if widget == "text_input":
+        element.input(value)
+    elif value == "earliest":
+        element.set_value(int(element.options[0]))
+    else:
+        element.set_value(value)
+
+
+def run_section(case, repeat):
+    from streamlit.testing.v1 import AppTest
+
+    import metrics
+
+    section, interactions = CASES[case]
+    start = time.perf_counter()
+    at = AppTest.from_file(APP, default_timeout=TIMEOUT)
+    at.run()
+    if section != SECTIONS[0]:
+        at.sidebar.selectbox[0].select(section)
+        at.run()
+    for widget, key, value in interactions:
+        interact(at, widget, key, value)
+        at.run()
+    cold = time.perf_counter() - start
+    errors = [str(e.value) for e in at.exception]
+
+    reruns = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        at.run()
+        reruns.append(time.perf_counter() - start)
+        errors += [str(e.value) for e in at.exception]
+
+    return {
+        "cold_start_s": cold,
+        "warm_rerun_s": statistics.median(reruns) if reruns else None,
+        "peak_rss_mb": peak_rss_mb(),
+        "errors": errors,
+        "spans": metrics.REGISTRY.span_table(),
+    }
+
+
+def build_snapshot(rows, text_chars):
+    import data_store
+
+    start = time.perf_counter()
+    manifest = data_store.build_snapshot()
+    elapsed = time.perf_counter() - start
+    seed_panel(manifest, rows, text_chars)
+    return {"snapshot_build_s": elapsed, "snapshot_rows": manifest.get("rows")}
+
+
+def seed_panel(manifest, rows, text_chars):
+    """Append the snapshot and PANEL_HISTORY earlier synthetic years to the snapshot's panel (once)."""
+    import data_store
+    from panel_store import YEAR_COLUMN, PanelStore
+    from synthetic_data import synthetic_dataset
+
+    panel = PanelStore()
+    frame = data_store.load_indicators(data_store.version_dir(manifest))
+    panel.append(frame, manifest["source_sha256"][:12])
+    year = int(frame[YEAR_COLUMN].max())
+    for back in range(1, PANEL_HISTORY + 1):
+        source_sha256 = f"synthetic-{rows}-{year - back}"
+        latest = panel.latest(year - back)
+        if latest is not None and latest["source_sha256"] == source_sha256:
+            continue
+        history, _ = synthetic_dataset(rows, seed=42 + back, text_chars=text_chars)
+        history[YEAR_COLUMN] = year - back
+        history = data_store.prepare_frame(history.drop(columns=data_store.TEXT_COLUMNS))
+        panel.append(history, source_sha256)
+
+
+# --- driver side ------------------------------------------------------------------------
+
+def in_worker(env, *args):
+    """Run this script with --worker args in a new process and return its JSON result."""
+    completed = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--worker", *args],
+        env=env, capture_output=True, text=True, timeout=TIMEOUT,
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"Worker {args} failed:\n{completed.stderr[-4000:]}")
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def dataset_env(rows, data_dir, text_chars):
+    from synthetic_data import write_dataset
+
+    csv_path, reference_path = write_dataset(rows, data_dir, text_chars=text_chars)
+    env = dict(os.environ)
+    env.update({
+        "EID_DATA_PATH": csv_path,
+        "EID_REFERENCE_PATH": reference_path,
+        "EID_SNAPSHOT_DIR": os.path.join(data_dir, f"snapshot_{rows}"),
+        "PYTHONWARNINGS": "ignore",
+    })
+    return env
+
+
+def load_baseline(path):
+    if not os.path.exists(path):
+        return {"thresholds": dict(DEFAULT_THRESHOLDS), "min_delta": dict(DEFAULT_MIN_DELTA), "results": {}}
+    with open(path) as f:
+        baseline = json.load(f)
+    baseline.setdefault("thresholds", dict(DEFAULT_THRESHOLDS))
+    baseline.setdefault("min_delta", dict(DEFAULT_MIN_DELTA))
+    baseline.setdefault("results", {})
+    return baseline
+
+
+def regressions(result, expected, thresholds, min_delta):
+    """[(metric, baseline, current)] for the metrics of one section that exceed their gate."""
+    failed = []
+    for metric in METRICS:
+        current, before = result.get(metric), expected.get(metric)
+        if current is None or before is None:
+            continue
+        if current > before * thresholds.get(metric, DEFAULT_THRESHOLDS[metric]) and \
+                current - before > min_delta.get(metric, DEFAULT_MIN_DELTA[metric]):
+            failed.append((metric, before, current))
+    return failed
+
+
+def parse_thresholds(values):
+    thresholds = {}
+    for value in values:
+        metric, _, ratio = value.partition("=")
+        if metric not in METRICS or not ratio:
+            raise SystemExit(f"--threshold expects one of {', '.join(METRICS)}=<ratio>, got {value!r}")
+        thresholds[metric] = float(ratio)
+    return thresholds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=DEFAULT_ROWS)
+    parser.add_argument("--sections", nargs="+", default=list(CASES), choices=list(CASES),
+                        help="sections and interaction cases to run (default: all)")
+    parser.add_argument("--repeat", type=int, default=5, help="warm reruns per section")
+    parser.add_argument("--data-dir", default=os.path.join(BENCH_DIR, "fixtures", "synthetic"))
+    parser.add_argument("--text-chars", type=int, help="truncate the synthetic narrative text (see synthetic_data.py)")
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--update-baseline", action="store_true",
+                        help="store these results as the baseline instead of comparing")
+    parser.add_argument("--threshold", action="append", default=[], metavar="METRIC=RATIO",
+                        help="override a regression ratio from the baseline file")
+    parser.add_argument("--output", help="also write the full results (with spans) to this JSON file")
+    parser.add_argument("--worker", nargs="+", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        if args.worker[0] == "snapshot":
+            result = build_snapshot(int(args.worker[1]), int(args.worker[2]) or None)
+        else:
+            result = run_section(args.worker[1], int(args.worker[2]))
+        print(json.dumps(result))
+        return
+
+    sys.path.insert(0, BENCH_DIR)
+    baseline = load_baseline(args.baseline)
+    thresholds = {**baseline["thresholds"], **parse_thresholds(args.threshold)}
+    min_delta = baseline["min_delta"]
+
+    results = {}
+    failed = False
+    print(f"{'rows':>9}  {'case':<38}{'cold s':>9}{'warm s':>9}{'peak MB':>10}  status")
+    for rows in args.rows:
+        env = dataset_env(rows, args.data_dir, args.text_chars)
+        snapshot = in_worker(env, "snapshot", str(rows), str(args.text_chars or 0))
+        print(f"{rows:>9,}  {'(snapshot build)':<38}{snapshot['snapshot_build_s']:>9.2f}")
+        results[str(rows)] = {}
+        for case in args.sections:
+            result = in_worker(env, "case", case, str(args.repeat))
+            results[str(rows)][case] = result
+            expected = baseline["results"].get(str(rows), {}).get(case, {})
+            status = "ok" if expected else "new"
+            if result["errors"]:
+                status, failed = "error: " + result["errors"][0][:60], True
+            elif not args.update_baseline:
+                slower = regressions(result, expected, thresholds, min_delta)
+                if slower:
+                    failed = True
+                    status = "REGRESSION " + ", ".join(f"{m} {b:.2f} -> {c:.2f}" for m, b, c in slower)
+            warm = result["warm_rerun_s"]
+            print(f"{rows:>9,}  {case:<38}{result['cold_start_s']:>9.2f}"
+                  f"{warm if warm is not None else float('nan'):>9.3f}{result['peak_rss_mb']:>10.0f}  {status}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    if args.update_baseline:
+        for rows, sections in results.items():
+            stored = baseline["results"].setdefault(rows, {})
+            for section, result in sections.items():
+                stored[section] = {metric: round(result[metric], 4) for metric in METRICS if result[metric] is not None}
+        with open(args.baseline, "w") as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"Baseline written to {args.baseline}")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,380 @@
+"""
+Parity check and benchmark of cleaning.py against the GDP_Finder.ipynb cleaners.
+
+The notebook functions are copied here unchanged and applied row by row with
+`.apply`, exactly as the notebook does; cleaning.py must return identical values
+(NaN == NaN) on every generated row. Raw indicator strings are generated from
+Wikipedia-style templates, including the awkward ones the cleaners special-case
+(comma decimals, FY years, several years per cell, mojibake, index notes).
+
+Usage:
+    python benchmarks/bench_cleaning.py                    # 1k and 100k rows
+    python benchmarks/bench_cleaning.py --rows 1000 100000 1000000 --reference-rows 100000
+    python benchmarks/bench_cleaning.py --raw GDP_Finder_raw.csv
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import cleaning  # noqa: E402
+
+GDP_PER_CAPITA = [
+    "${a:,} (nominal; {y}) ${b:,} (PPP; {y})",
+    "US${a:,} (nominal, {y} est.)",
+    "${a:,}.{c} ({y})",
+    "${a:,} nominal ${b:,} PPP ${c:,} other",
+    "€{a:,} (nominal)",
+    "$ , data unavailable",
+    "none",
+    "",
+]
+RATES = [
+    "{r}% ({y})",
+    "{r}% ({y0} est.) {s}% ({y}f)",
+    "-{r}% (FY{y})",
+    "{r}% ({y0}) {s}% ({y}) {t}% ({y})",
+    "{r}%",
+    "{r}% (June {y})",
+    "{r}% in {y}",
+    "–{r}% ({y})",
+    "{r} % ({y0})",
+    "{r}%\xa0({y})",
+    "N/A",
+]
+FINANCIAL = [
+    "${a}.{c} trillion ({y})",
+    "US$ {a:,}.{c} billion ({y0})",
+    "${a}.{c} billion ({y} est.)",
+    "${a} million ({y0})",
+    "€{a},{c} billion",
+    "A${a}.{c} billion",
+    "£{a}.{c}.{c} billion",
+    "$ billion",
+    "({y}) ${a} Billion",
+    "${a:,} million ({y})",
+    "",
+]
+DEBT = [
+    "{r}% of GDP ({y})",
+    "US${a}.{c} trillion ({y}) {r}% of GDP",
+    "${a:,} billion; {r}% of gdp",
+    "{a:,} quadrillion",
+    "¥{a:,} trillion ({y}) {r}% of GDP",
+    "PLN {a}.{c} trillion",
+    "â‚¹{a:,} billion ({y0})",
+    "n/a",
+]
+CURRENCY = [
+    "United States dollar (USD)",
+    "Euro ( € ) ( EUR )",
+    "Japanese yen (¥) (JPY)",
+    "Pound sterling (Â£) (GBP)",
+    "Indian rupee (â‚¹) (INR)",
+    "United States dollar (US Dollar Index) Except in some territories",
+    "Polish zÅ‚oty (PLN)",
+    "West African CFA franc (XOF)",
+    "$ (USD)",
+    "Currency {a} [{y}]",
+    "",
+]
+
+
+def render(rng, templates):
+    template = rng.choice(templates)
+    return template.format(
+        a=rng.randint(1, 99999), b=rng.randint(1, 99999), c=rng.randint(0, 999),
+        r=round(rng.uniform(0, 60), rng.choice([0, 1, 2])), s=round(rng.uniform(0, 20), 1), t=round(rng.uniform(0, 20), 1),
+        y=rng.choice([2023, 2024, 2025, 2021]), y0=rng.choice([2022, 2023, 2024]),
+    )
+
+
+def synthetic_raw(rows, seed=42):
+    rng = random.Random(seed)
+    columns = {
+        'GDP_per_capita': GDP_PER_CAPITA,
+        'GDP_growth_rate': RATES,
+        'Inflation_rate': RATES,
+        'Unemployment_rate': RATES,
+        'Exports': FINANCIAL,
+        'Imports': FINANCIAL,
+        'Government_debt': DEBT,
+        'Currency': CURRENCY,
+    }
+    data = {column: [render(rng, templates) for _ in range(rows)] for column, templates in columns.items()}
+    frame = pd.DataFrame(data)
+    # Missing cells, as read_csv gives them for empty scraper fields
+    for column in columns:
+        frame.loc[frame.sample(frac=0.05, random_state=rng.randint(0, 10**6)).index, column] = np.nan
+    return frame
+
+
+# --- GDP_Finder.ipynb cleaners, unchanged ---------------------------------------------
+
+def extract_gdp_per_capita_parts(value):
+    if pd.isna(value):
+        return pd.Series([None, None])
+
+    # Remove symbols like US$, commas, etc.
+    clean_text = value.replace('US$', '$').replace('\xa0', ' ')
+    parts = re.findall(r'\$[\d,\.]+', clean_text)
+
+    # Convert to plain numbers
+    nums = []
+    for p in parts:
+        num = re.sub(r'[^\d.]', '', p)  # remove $ and commas
+        nums.append(float(num) if num else None)
+
+    # ✅ Handle cases
+    if len(nums) == 2:          # Both nominal & PPP found
+        return pd.Series([nums[0], nums[1]])
+    elif len(nums) == 1:        # Only one value → put in both
+        return pd.Series([nums[0], nums[0]])
+    else:                       # No valid numbers
+        return pd.Series([None, None])
+
+
+PRIORITY_YEARS = (2025, 2024, 2023)
+
+
+def extract_rate_with_fallback(text, priorities=PRIORITY_YEARS):
+    if not isinstance(text, str) or not text.strip():
+        return pd.NA
+
+    # normalize odd characters
+    s = (text.replace('\xa0', ' ')
+             .replace('Â', ' ')
+             .replace('％', '%')
+             .replace('–', '-')  # en-dash to hyphen
+             .strip())
+
+    pattern = re.compile(
+        r'([+-]?\d+(?:\.\d+)?)\s*%'      # the rate
+        r'(?:'                           # then EITHER:
+        r'\s*\([^)]*?\b(?:FY)?(\d{4})[a-z]?\b[^)]*\)'  # year inside (...) after the rate
+        r'|'                             # OR:
+        r'[^()\n]*?\b(?:FY)?(\d{4})[a-z]?\b'          # year appears in free text after the rate
+        r')',
+        re.I
+    )
+
+    pairs = []
+    for m in pattern.finditer(s):
+        rate = float(m.group(1))
+        y = m.group(2) or m.group(3)
+        if y:
+            pairs.append((int(y), rate))
+
+    if not pairs:
+        return pd.NA
+
+    # keep the last seen value for each year
+    by_year = {}
+    for y, r in pairs:
+        by_year[y] = r
+
+    for y in priorities:
+        if y in by_year:
+            return by_year[y]
+
+    return pd.NA
+
+
+def clean_financial_value(value):
+    if not isinstance(value, str):
+        return None
+
+    # Remove currency symbols and bracketed years like (2023)
+    value = re.sub(r'(US\$|A\$|\$|£|€)', '', value)
+    value = re.sub(r'\(.*?\)', '', value).strip()
+
+    # Find the unit (billion/million/trillion)
+    m_unit = re.search(r'\b(trillion|billion|million)\b', value, flags=re.I)
+    if not m_unit:
+        return None
+
+    unit = m_unit.group(1).lower()
+    number_text = value[:m_unit.start()].strip()
+
+    # Extract digits/commas/dots
+    num = re.findall(r'[\d,\.]+', number_text)
+    if not num:
+        return None
+    num = num[0]
+
+    # ✅ Handle commas:
+    if ',' in num:
+        last = num.rfind(',')
+        # earlier commas removed, last one -> decimal
+        num = num[:last].replace(',', '') + '.' + num[last+1:]
+
+    # Fix multiple dots (keep only first decimal)
+    if num.count('.') > 1:
+        first = num.find('.')
+        num = num[:first+1] + num[first+1:].replace('.', '')
+
+    try:
+        number = float(num)
+    except:  # noqa: E722
+        return None
+
+    # Normalize to billions
+    if unit == 'trillion':
+        number *= 1000
+    elif unit == 'million':
+        number *= 0.001
+
+    return round(number, 3)
+
+
+def clean_government_debt(value):
+    if not isinstance(value, str):
+        return None, None
+
+    # Normalize input
+    val = value.replace('$', '').replace('US$', '').replace('€', '').replace('£', '').replace('Â', '')
+    val = val.replace('¥', '').replace('â‚¹', '').replace('â‚¬', '').replace('PLN', '')
+    val = val.replace('â‚½', '').replace(',', '').strip().lower()
+
+    # Extract percentage of GDP
+    percent_match = re.search(r'([\d.]+)% of gdp', val)
+    percent = float(percent_match.group(1)) if percent_match else None
+
+    # Extract absolute value and normalize to billion
+    num_match = re.search(r'([\d.]+)\s*(million|billion|trillion|quadrillion)', val)
+    if num_match:
+        number = float(num_match.group(1))
+        unit = num_match.group(2)
+
+        if unit == 'million':
+            number *= 0.001
+        elif unit == 'trillion':
+            number *= 1000
+        elif unit == 'quadrillion':
+            number *= 1_000_000
+        # billion remains same
+
+        number = round(number, 2)
+    else:
+        number = None
+
+    return percent, number
+
+
+def clean_currency(value):
+    if not isinstance(value, str):
+        return ''
+
+    # Fix common encoding issues
+    value = (
+        value.replace('â‚¬', '€').replace('Â¥', '¥')
+             .replace('â‚¹', '₹').replace('â‚©', '₩')
+             .replace('â‚½', '₽').replace('â‚º', '₺')
+             .replace('zÅ‚', 'zł').replace('Â£', '£')
+    )
+
+    # Remove known extra descriptions (e.g., US Dollar Index, 'Except in...')
+    value = re.sub(r'\(.*?index.*?\)', '', value, flags=re.IGNORECASE)
+    value = re.sub(r'Except.*$', '', value, flags=re.IGNORECASE)
+    value = re.sub(r'US Dollar Index', '', value, flags=re.IGNORECASE)
+
+    # Extract currency code (3 uppercase letters)
+    currency_code_match = re.search(r'\b([A-Z]{3})\b', value)
+    currency_code = currency_code_match.group(1) if currency_code_match else ''
+
+    # Extract currency name: remove everything after first bracket or symbol
+    name_part = re.split(r'[\(\[\$€¥₹₩₽₺]', value)[0].strip()
+
+    if name_part and currency_code:
+        return f"{name_part} ({currency_code})"
+    else:
+        return name_part or value.strip()
+
+# ---------------------------------------------------------------------------------------
+
+
+def notebook_clean(raw):
+    out = pd.DataFrame(index=raw.index)
+    out[['GDP_per_capita_nominal_cleaned', 'GDP_per_capita_ppp_cleaned']] = raw['GDP_per_capita'].apply(extract_gdp_per_capita_parts)
+    for column in ['GDP_growth_rate', 'Inflation_rate', 'Unemployment_rate']:
+        out[f'{column}_cleaned'] = raw[column].apply(extract_rate_with_fallback)
+    rates = ['GDP_growth_rate_cleaned', 'Inflation_rate_cleaned', 'Unemployment_rate_cleaned']
+    out[rates] = out[rates].replace({pd.NA: np.nan}).astype('float64')
+    out['Exports_Cleaned_Billion'] = raw['Exports'].apply(clean_financial_value)
+    out['Imports_Cleaned_Billion'] = raw['Imports'].apply(clean_financial_value)
+    out[['Gov_Debt_Percent_GDP_Cleaned', 'Gov_Debt_Absolute_Billion_Cleaned']] = raw['Government_debt'].apply(
+        lambda x: pd.Series(clean_government_debt(x))
+    )
+    out['clean_currency'] = raw['Currency'].apply(clean_currency)
+    return out
+
+
+def vectorized_clean(raw):
+    out = pd.DataFrame(index=raw.index)
+    out[['GDP_per_capita_nominal_cleaned', 'GDP_per_capita_ppp_cleaned']] = cleaning.gdp_per_capita_parts(raw['GDP_per_capita'])
+    for column in ['GDP_growth_rate', 'Inflation_rate', 'Unemployment_rate']:
+        out[f'{column}_cleaned'] = cleaning.rates_with_fallback(raw[column])
+    out['Exports_Cleaned_Billion'] = cleaning.financial_values(raw['Exports'])
+    out['Imports_Cleaned_Billion'] = cleaning.financial_values(raw['Imports'])
+    out[['Gov_Debt_Percent_GDP_Cleaned', 'Gov_Debt_Absolute_Billion_Cleaned']] = cleaning.government_debt(raw['Government_debt'])
+    out['clean_currency'] = cleaning.currencies(raw['Currency'])
+    return out
+
+
+def mismatches(expected, actual):
+    """Per-column count of cells that differ, treating NaN/None as equal."""
+    counts = {}
+    for column in expected.columns:
+        a, b = expected[column], actual[column]
+        if column == 'clean_currency':
+            same = a.astype(object).to_numpy() == b.astype(object).to_numpy()
+        else:
+            a, b = pd.to_numeric(a).to_numpy(dtype='float64'), b.to_numpy(dtype='float64')
+            same = (a == b) | (np.isnan(a) & np.isnan(b))
+        counts[column] = int((~same).sum())
+    return counts
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 100000])
+    parser.add_argument("--reference-rows", type=int, default=100000,
+                        help="largest input the row-by-row notebook cleaners are run on")
+    parser.add_argument("--raw", help="also check a raw scraper CSV")
+    args = parser.parse_args()
+
+    inputs = [(f"synthetic {rows:,}", synthetic_raw(rows)) for rows in args.rows]
+    if args.raw:
+        inputs.insert(0, (os.path.basename(args.raw), pd.read_csv(args.raw)))
+
+    print(f"{'input':<20}{'notebook s':>12}{'vectorized s':>14}{'speedup':>10}  mismatches")
+    failed = False
+    for name, raw in inputs:
+        actual, vectorized_s = timed(vectorized_clean, raw)
+        if len(raw) > args.reference_rows:
+            print(f"{name:<20}{'-':>12}{vectorized_s:>14.2f}{'-':>10}  (reference skipped)")
+            continue
+        expected, notebook_s = timed(notebook_clean, raw)
+        counts = mismatches(expected, actual)
+        failed |= any(counts.values())
+        detail = ", ".join(f"{column}={count}" for column, count in counts.items() if count) or "none"
+        print(f"{name:<20}{notebook_s:>12.2f}{vectorized_s:>14.2f}{notebook_s / vectorized_s:>9.1f}x  {detail}")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+"""
+Benchmark infobox parsing on saved HTML fixtures.
+
+Compares the notebook's parser (full BeautifulSoup tree + `in label` elif chain,
+kept here as the reference) with infobox_parser.parse_infobox_html, serially and
+on a process pool, and checks that all three return identical results.
+
+Fixtures are read from --fixtures (any *.html or *.body files, e.g. the response
+cache in .cache/http). Without --fixtures, deterministic Wikipedia-sized economy
+pages are generated once into benchmarks/fixtures/infobox/.
+
+Usage:
+    python benchmarks/bench_infobox_parser.py
+    python benchmarks/bench_infobox_parser.py --fixtures .cache/http --workers 4
+"""
+import argparse
+import glob
+import os
+import random
+import re
+import sys
+import time
+
+from bs4 import BeautifulSoup
+from bs4.element import Tag
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from infobox_parser import parse_infobox_html, parse_many  # noqa: E402
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "infobox")
+
+ECONOMIC_ROWS = [
+    ("GDP", "${n:,} billion (nominal; 2025)<sup>[3]</sup>"),
+    ("GDP rank", "{n}th (nominal; 2025)"),
+    ("GDP growth", "{f}% (2025)<sup>[4]</sup>"),
+    ("GDP per capita", "${n:,} (nominal; 2025) ${m:,} (PPP; 2025)<sup>[3]</sup>"),
+    ("GDP per capita rank", "{n}th (nominal; 2025)"),
+    ("GDP by sector", "agriculture: {f}% industry: {f}% services: {f}%"),
+    ("Inflation (CPI)", "{f}% (2024)<sup>[5]</sup>"),
+    ("Population below poverty line", "{f}% (2022)"),
+    ("Labour force", "{n:,} (2024)"),
+    ("Unemployment", "{f}% (2024)<sup>[6]</sup>"),
+    ("Main industries", "textiles, machinery, food processing"),
+    ("Exports", "${n} billion (2024)<sup>[7]</sup>"),
+    ("Export goods", "machinery, vehicles, chemicals"),
+    ("Main export partners", "Partner A {f}% Partner B {f}%"),
+    ("Imports", "${m} billion (2024)<sup>[7]</sup>"),
+    ("Import goods", "fuels, electronics, pharmaceuticals"),
+    ("Main import partners", "Partner C {f}% Partner D {f}%"),
+    ("FDI stock", "${n} billion (2024)"),
+    ("Government debt", "{f}% of GDP (2024)<sup>[8]</sup>"),
+    ("Revenues", "${n} billion (2024)"),
+    ("Expenses", "${m} billion (2024)"),
+    ("Credit rating", "Standard & Poor's: AA"),
+    ("Foreign reserves", "${n} billion (2024)"),
+]
+
+
+def notebook_parse_infobox(html):
+    """The parser from GDP_Finder.ipynb, unchanged, as the reference."""
+    soup = BeautifulSoup(html, 'lxml')
+    infobox = soup.find('table', class_='infobox')
+    if not infobox or not isinstance(infobox, Tag):
+        return {}
+
+    info = {}
+    for row in infobox.find_all('tr'):
+        if row.th and row.td:
+            label = row.th.text.strip().lower()
+            value = row.td.get_text(separator=' ', strip=True)
+            value = re.sub(r'\[.*?\]', '', value).strip()
+
+            if "gdp per capita rank" in label:
+                info['GDP_per_capita_rank'] = value
+            elif "gdp per capita" in label:
+                info['GDP_per_capita'] = value
+            elif "gdp growth" in label:
+                info['GDP_growth_rate'] = value
+            elif "inflation" in label:
+                info['Inflation_rate'] = value
+            elif "unemployment" in label:
+                info['Unemployment_rate'] = value
+            elif "exports" in label and 'Exports' not in info:
+                info['Exports'] = value
+            elif "imports" in label and 'Imports' not in info:
+                info['Imports'] = value
+            elif "government debt" in label:
+                info['Government_debt'] = value
+            elif "currency" in label:
+                info['Currency'] = value
+    return info
+
+
+def synthetic_page(i, rng):
+    """One economy article: nav chrome, an infobox, long prose, tables and references."""
+    def fill(template):
+        return template.format(n=rng.randint(10, 90000), m=rng.randint(10, 90000), f=round(rng.uniform(-5, 40), 1))
+
+    rows = [f'<tr><th scope="row" class="infobox-label"><a href="/wiki/{label.replace(" ", "_")}">{label}</a></th>'
+            f'<td class="infobox-data">{fill(value)}</td></tr>'
+            for label, value in ECONOMIC_ROWS if rng.random() > 0.1]
+    rows.insert(0, f'<tr><th colspan="2" class="infobox-above">Economy of Country {i}</th></tr>'
+                   f'<tr><th scope="row">Currency</th><td>Country {i} dollar (C{i:03d})</td></tr>'
+                   f'<tr><th scope="row">Fiscal year</th><td>Calendar year</td></tr>')
+    infobox = '<table class="infobox vcard">' + ''.join(rows) + '</table>'
+
+    nav = ''.join(f'<li><a href="/wiki/Portal_{k}">Portal {k}</a></li>' for k in range(150))
+    prose = ''.join(
+        f'<h2><span class="mw-headline">Section {s}</span></h2>'
+        + ''.join(f'<p>The economy of Country {i} grew <a href="/wiki/Link_{s}_{p}">steadily</a> in period {p}, '
+                  f'driven by exports of goods and services.<sup class="reference"><a href="#cite_note-{s}{p}">[{p}]</a></sup> '
+                  + 'Further detail on sectors, trade and public finance follows. ' * 12 + '</p>'
+                  for p in range(8))
+        + '<table class="wikitable">' + ''.join(
+            f'<tr><td>{1990 + y}</td><td>{rng.random():.3f}</td><td>{rng.random():.3f}</td></tr>' for y in range(30))
+        + '</table>'
+        for s in range(12))
+    references = '<ol class="references">' + ''.join(
+        f'<li id="cite_note-{r}"><cite>Source {r}, Statistical Office, retrieved 2025</cite></li>' for r in range(200)) + '</ol>'
+    return (f'<!DOCTYPE html><html><head><title>Economy of Country {i}</title></head><body>'
+            f'<div id="mw-navigation"><ul>{nav}</ul></div>'
+            f'<div id="mw-content-text"><div class="mw-content-ltr mw-parser-output">'
+            f'{infobox}{prose}{references}</div></div></body></html>')
+
+
+def ensure_fixtures(count):
+    os.makedirs(FIXTURE_DIR, exist_ok=True)
+    rng = random.Random(42)
+    for i in range(count):
+        page = synthetic_page(i, rng)
+        path = os.path.join(FIXTURE_DIR, f"economy_{i:04d}.html")
+        if not os.path.exists(path):
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(page)
+    return sorted(glob.glob(os.path.join(FIXTURE_DIR, "*.html")))[:count]
+
+
+def load_pages(paths):
+    pages = []
+    for path in paths:
+        with open(path, "rb") as f:
+            pages.append(f.read().decode("utf-8", errors="replace"))
+    return pages
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fixtures", help="directory of saved *.html / *.body pages")
+    parser.add_argument("--pages", type=int, default=200, help="number of generated fixture pages")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="parser processes")
+    args = parser.parse_args()
+
+    if args.fixtures:
+        paths = sorted(glob.glob(os.path.join(args.fixtures, "**", "*.html"), recursive=True)
+                       + glob.glob(os.path.join(args.fixtures, "**", "*.body"), recursive=True))
+    else:
+        paths = ensure_fixtures(args.pages)
+    if not paths:
+        sys.exit(f"No fixture pages found in {args.fixtures}")
+    pages = load_pages(paths)
+    megabytes = sum(len(page) for page in pages) / 1e6
+    print(f"{len(pages)} pages, {megabytes:.1f} MB of HTML, {args.workers} parser processes")
+
+    reference, reference_s = timed(lambda: [notebook_parse_infobox(page) for page in pages])
+    serial, serial_s = timed(lambda: [parse_infobox_html(page) for page in pages])
+    pooled, pooled_s = timed(lambda: parse_many(pages, workers=args.workers))
+
+    for name, results in (("targeted serial", serial), ("targeted pool", pooled)):
+        mismatches = [path for path, a, b in zip(paths, reference, results) if a != b]
+        if mismatches:
+            sys.exit(f"{name}: {len(mismatches)} pages differ from the notebook parser, e.g. {mismatches[0]}")
+
+    print(f"{'parser':<22}{'seconds':>10}{'pages/s':>10}{'speedup':>10}")
+    for name, seconds in (("notebook full tree", reference_s), ("targeted serial", serial_s), ("targeted pool", pooled_s)):
+        print(f"{name:<22}{seconds:>10.2f}{len(pages) / seconds:>10.1f}{reference_s / seconds:>9.1f}x")
+    print(f"All parsers agree on {sum(bool(info) for info in reference)} infoboxes.")
+
+
+if __name__ == "__main__":
+    main()
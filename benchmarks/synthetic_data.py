@@ -0,0 +1,132 @@
+"""
+Synthetic datasets with the Final_output.csv schema, for scaling benchmarks.
+
+Row i is a copy of source row i % n (n = rows in Final_output.csv) with its
+indicators perturbed: money amounts are scaled by log-normal noise, rates and
+ratios shifted by a fraction of the column's spread, and the *_log columns
+recomputed with log1p. The first n rows are the source rows unchanged. Later
+copies are named "<Country> <k>", and a country reference table mapping every
+synthetic name to its source country's ISO3 and region is written next to the
+CSV, so the Region groupbys and choropleths see the real distribution.
+Narrative text is copied from the source row (optionally truncated).
+
+Point the dashboard at a generated dataset with:
+    EID_DATA_PATH=<csv> EID_REFERENCE_PATH=<reference csv> EID_SNAPSHOT_DIR=<dir>
+
+Usage:
+    python benchmarks/synthetic_data.py                          # 1k, 100k and 1M rows
+    python benchmarks/synthetic_data.py --rows 1000 --out /tmp/eid --text-chars 200
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from country_reference import load_reference, normalize_name  # noqa: E402
+
+SOURCE_CSV = os.path.join(BASE_DIR, "Final_output.csv")
+DEFAULT_OUT = os.path.join(BASE_DIR, "benchmarks", "fixtures", "synthetic")
+DEFAULT_ROWS = [1_000, 100_000, 1_000_000]
+
+# Positive amounts: multiplied by exp(N(0, AMOUNT_SIGMA))
+AMOUNT_COLUMNS = [
+    'gdp_total_usd_billion_cleaned', 'GDP_per_capita_nominal_cleaned', 'GDP_per_capita_ppp_cleaned',
+    'Exports_Cleaned_Billion', 'Imports_Cleaned_Billion', 'Gov_Debt_Absolute_Billion_Cleaned',
+]
+# Rates and ratios: shifted by N(0, SHIFT_SCALE * column std)
+SHIFT_COLUMNS = [
+    'GDP_growth_rate_cleaned', 'Inflation_rate_cleaned', 'Unemployment_rate_cleaned',
+    'Gov_Debt_Percent_GDP_Cleaned', 'Trade_Balance', 'Trade_Openness', 'GDP_Capita_Ratio',
+    'Debt_to_Income', 'Import_Export_Ratio',
+]
+TEXT_COLUMNS = ['scraped_paragraph', 'summary']
+AMOUNT_SIGMA = 0.25
+SHIFT_SCALE = 0.3
+
+
+def synthetic_dataset(rows, seed=42, source=None, text_chars=None):
+    """(frame, reference): rows rows with the source schema and a reference table covering their names."""
+    if source is None:
+        source = pd.read_csv(SOURCE_CSV)
+    rng = np.random.default_rng(seed)
+    n = len(source)
+    base = np.arange(rows) % n
+    copy = np.arange(rows) // n
+
+    frame = source.iloc[base].reset_index(drop=True)
+    names = frame['Country'].astype(str)
+    frame['Country'] = names.where(copy == 0, names + " " + pd.Series(copy + 1).astype(str))
+    frame['Links'] = frame['Links'].where(copy == 0, frame['Links'] + "#" + pd.Series(copy + 1).astype(str))
+
+    perturbed = copy > 0
+    for col in AMOUNT_COLUMNS:
+        noise = np.exp(rng.normal(0.0, AMOUNT_SIGMA, rows))
+        frame[col] = np.where(perturbed, frame[col].to_numpy(dtype='float64') * noise, frame[col])
+        log_col = col + '_log'
+        if log_col in frame.columns:
+            frame[log_col] = np.where(perturbed, np.log1p(frame[col].to_numpy(dtype='float64')), frame[log_col])
+    for col in SHIFT_COLUMNS:
+        values = frame[col].to_numpy(dtype='float64')
+        shift = rng.normal(0.0, SHIFT_SCALE * np.nanstd(source[col].to_numpy(dtype='float64')), rows)
+        frame[col] = np.where(perturbed, values + shift, values)
+    if text_chars:
+        for col in TEXT_COLUMNS:
+            frame[col] = frame[col].str.slice(0, text_chars)
+
+    # Synthetic names inherit the ISO3 and region of the country they were copied from
+    reference = load_reference()
+    matched = pd.DataFrame({'name_key': normalize_name(source['Country']).to_numpy()}).merge(
+        reference[['name_key', 'iso3', 'region']], on='name_key', how='left'
+    )
+    synthetic = pd.DataFrame({
+        'name': frame['Country'][perturbed].to_numpy(),
+        'iso3': matched['iso3'].to_numpy()[base[perturbed]],
+        'region': matched['region'].to_numpy()[base[perturbed]],
+    }).dropna(subset=['iso3'])
+    reference = pd.concat([reference[['name', 'iso3', 'region']], synthetic], ignore_index=True)
+    return frame, reference
+
+
+def paths(out, rows):
+    """(dataset CSV, reference CSV) written for a row count."""
+    return (os.path.join(out, f"Final_output_{rows}.csv"),
+            os.path.join(out, f"country_reference_{rows}.csv"))
+
+
+def write_dataset(rows, out=DEFAULT_OUT, seed=42, text_chars=None, source=None):
+    """Write the dataset and reference CSVs for rows (unless already present) and return their paths."""
+    csv_path, reference_path = paths(out, rows)
+    if os.path.exists(csv_path) and os.path.exists(reference_path):
+        return csv_path, reference_path
+    os.makedirs(out, exist_ok=True)
+    frame, reference = synthetic_dataset(rows, seed=seed, source=source, text_chars=text_chars)
+    for table, path in ((frame, csv_path), (reference, reference_path)):
+        table.to_csv(path + ".tmp", index=False)
+        os.replace(path + ".tmp", path)
+    return csv_path, reference_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=DEFAULT_ROWS)
+    parser.add_argument("--out", default=DEFAULT_OUT)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--text-chars", type=int, help="truncate scraped_paragraph and summary to this many characters")
+    args = parser.parse_args()
+
+    source = pd.read_csv(SOURCE_CSV)
+    for rows in args.rows:
+        start = time.perf_counter()
+        csv_path, _ = write_dataset(rows, args.out, args.seed, args.text_chars, source)
+        print(f"{rows:>10,} rows  {os.path.getsize(csv_path) / 2**20:>8.1f} MB  "
+              f"{time.perf_counter() - start:>6.1f}s  {csv_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,317 @@
+"""
+Column-at-a-time cleaning of the scraped indicator strings.
+
+Vectorized versions of the GDP_Finder.ipynb cleaners (extract_gdp_per_capita_parts,
+extract_rate_with_fallback, clean_financial_value, clean_government_debt and
+clean_currency). Every pattern is compiled once at import and each cleaner works on
+a whole column through the pandas `.str` methods, so there is no per-row `.apply`,
+`re.compile` or `pd.Series` construction. Unit scaling and the year-priority
+fallback are plain array operations.
+
+The output matches the notebook functions value for value, including their quirks
+(e.g. the last comma of "1,234.5 billion" is read as a decimal point). Text is
+matched as object dtype on purpose: the Arrow string kernels use RE2, whose
+`\\b` and case folding differ from Python's `re`.
+
+Usage:
+    python cleaning.py GDP_Finder_raw.csv --out GDP_Finder_clean.csv
+    python cleaning.py GDP_Finder_raw.csv --check    # golden check against Final_output.csv
+"""
+import argparse
+import functools
+import logging
+import re
+import sys
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+PRIORITY_YEARS = (2025, 2024, 2023)
+
+UNIT_SCALE = {
+    'million': 0.001,
+    'billion': 1.0,
+    'trillion': 1000.0,
+    'quadrillion': 1_000_000.0,
+}
+
+EDA_COLUMNS = [
+    'Country', 'gdp_total_usd_billion_cleaned', 'GDP_total_Year',
+    'GDP_per_capita_nominal_cleaned', 'GDP_per_capita_ppp_cleaned', 'GDP_growth_rate_cleaned',
+    'Inflation_rate_cleaned', 'Unemployment_rate_cleaned', 'Exports_Cleaned_Billion',
+    'Imports_Cleaned_Billion', 'Gov_Debt_Percent_GDP_Cleaned', 'Gov_Debt_Absolute_Billion_Cleaned',
+    'clean_currency', 'Links',
+]
+
+# extract_gdp_per_capita_parts
+_MONEY = re.compile(r'\$[\d,\.]+')
+_FIRST_MONEY = re.compile(r'\$([\d,\.]+)')
+_SECOND_MONEY = re.compile(r'(?s)\$[\d,\.]+.*?\$([\d,\.]+)')
+
+# extract_rate_with_fallback
+_RATE_CHARACTERS = str.maketrans({'\xa0': ' ', 'Â': ' ', '％': '%', '–': '-'})
+_RATE = re.compile(
+    r'([+-]?\d+(?:\.\d+)?)\s*%'
+    r'(?:'
+    r'\s*\([^)]*?\b(?:FY)?(\d{4})[a-z]?\b[^)]*\)'  # year inside (...) after the rate
+    r'|'
+    r'[^()\n]*?\b(?:FY)?(\d{4})[a-z]?\b'  # year in free text after the rate
+    r')',
+    re.I
+)
+
+# clean_financial_value
+_CURRENCY_SYMBOL = re.compile(r'(US\$|A\$|\$|£|€)')
+_PARENTHESIZED = re.compile(r'\(.*?\)')
+_BEFORE_UNIT = re.compile(r'(?s)^(.*?)\b(trillion|billion|million)\b', re.I)
+_NUMBER_TEXT = re.compile(r'([\d,\.]+)')
+_LAST_COMMA = re.compile(r',(?=[^,]*$)')
+_FIRST_DOT_SPLIT = re.compile(r'^([^.]*\.?)(.*)$', re.S)
+
+# clean_government_debt
+# Single characters first (order-free), then the notebook's sequential removals
+_DEBT_CHARACTERS = str.maketrans('', '', '$€£Â¥')
+_DEBT_REMOVALS = ['â‚¹', 'â‚¬', 'PLN', 'â‚½', ',']
+_DEBT_PERCENT = re.compile(r'([\d.]+)% of gdp')
+_DEBT_ABSOLUTE = re.compile(r'([\d.]+)\s*(million|billion|trillion|quadrillion)')
+
+# clean_currency
+_MOJIBAKE = [('â‚¬', '€'), ('Â¥', '¥'), ('â‚¹', '₹'), ('â‚©', '₩'),
+             ('â‚½', '₽'), ('â‚º', '₺'), ('zÅ‚', 'zł'), ('Â£', '£')]
+_INDEX_NOTE = re.compile(r'\(.*?index.*?\)', re.I)
+_EXCEPT_NOTE = re.compile(r'Except.*$', re.I)
+_DOLLAR_INDEX = re.compile(r'US Dollar Index', re.I)
+_CURRENCY_CODE = re.compile(r'\b([A-Z]{3})\b')
+_CURRENCY_NAME = re.compile(r'^([^\(\[\$€¥₹₩₽₺]*)')
+
+
+def _text(series):
+    """Object-dtype view of a raw column; cells that are not strings become NaN."""
+    values = pd.Series(series, dtype=object)
+    return values.where(values.str.len().notna())
+
+
+def _to_float(strings):
+    # float() parity: '' and malformed numbers become NaN instead of raising
+    return pd.to_numeric(strings, errors='coerce').astype('float64')
+
+
+def round_like_python(values, decimals):
+    """Python round() over an array.
+
+    np.round scales by 10**decimals first, which can push a value across a .5
+    boundary; the few values that land near one are re-rounded with round().
+    """
+    values = np.asarray(values, dtype='float64')
+    rounded = np.round(values, decimals)
+    scaled = values * 10.0 ** decimals
+    distance = np.abs(np.abs(scaled - np.trunc(scaled)) - 0.5)
+    suspect = np.flatnonzero(((distance < 1e-6) | (np.abs(scaled) >= 2.0 ** 52)) & np.isfinite(values))
+    if len(suspect):
+        rounded[suspect] = [round(float(value), decimals) for value in values[suspect]]
+    return rounded
+
+
+def distinct_values(cleaner):
+    """Run a column cleaner once per distinct raw string and broadcast the result.
+
+    Multi-year and subnational scrapes repeat the same cells (currencies, "N/A",
+    unchanged indicators) many times over.
+    """
+    @functools.wraps(cleaner)
+    def wrapper(series, *args, **kwargs):
+        codes, uniques = pd.factorize(series)
+        # Code -1 (missing) picks the trailing NaN
+        distinct = pd.Series(np.append(np.asarray(uniques, dtype=object), np.nan), dtype=object)
+        result = cleaner(distinct, *args, **kwargs).take(codes)
+        result.index = series.index
+        return result
+    return wrapper
+
+
+def gdp_total_billion(series):
+    """GDP_total_usd in millions -> billions (notebook "Step 2"/"Step 4")."""
+    cleaned = series.astype(str).str.replace(',', '', regex=False).str.strip()
+    return (pd.to_numeric(cleaned, errors='coerce') / 1000).round(2)
+
+
+@distinct_values
+def gdp_per_capita_parts(series):
+    """Nominal and PPP GDP per capita; a single value fills both."""
+    text = _text(series)
+    count = text.str.count(_MONEY)
+    first = _to_float(text.str.extract(_FIRST_MONEY, expand=False).str.replace(',', '', regex=False))
+    second = _to_float(text.str.extract(_SECOND_MONEY, expand=False).str.replace(',', '', regex=False))
+
+    found = count.isin([1, 2])
+    nominal = first.where(found)
+    ppp = second.where(count == 2, first).where(found)
+    return pd.DataFrame({
+        'GDP_per_capita_nominal_cleaned': nominal,
+        'GDP_per_capita_ppp_cleaned': ppp,
+    }, index=series.index)
+
+
+@distinct_values
+def rates_with_fallback(series, priorities=PRIORITY_YEARS):
+    """The "<rate>% (<year>)" value for the first year in priorities, last match per year winning."""
+    text = _text(series).str.translate(_RATE_CHARACTERS).str.strip()
+
+    result = pd.Series(np.nan, index=series.index, dtype='float64')
+    matches = text.str.extractall(_RATE)
+    if matches.empty:
+        return result
+
+    years = pd.to_numeric(matches[1].fillna(matches[2]), errors='coerce')
+    rank = years.map({year: i for i, year in enumerate(priorities)})
+    candidates = pd.DataFrame({
+        'row': matches.index.get_level_values(0),
+        'match': matches.index.get_level_values(1),
+        'rank': rank.to_numpy(),
+        'rate': matches[0].astype('float64').to_numpy(),
+    }).dropna(subset=['rank'])
+
+    # Best priority first; within a year, the last match
+    best = (candidates.sort_values(['row', 'rank', 'match'], ascending=[True, True, False], kind='stable')
+                      .drop_duplicates('row'))
+    result.loc[best['row'].to_numpy()] = best['rate'].to_numpy()
+    return result
+
+
+def _scale_to_billion(numbers, units, decimals):
+    scale = units.str.lower().map(UNIT_SCALE).astype('float64')
+    return pd.Series(round_like_python(numbers * scale, decimals), index=numbers.index)
+
+
+@distinct_values
+def financial_values(series):
+    """Exports/Imports text -> value in billions, rounded to 3 decimals."""
+    text = _text(series).str.replace(_CURRENCY_SYMBOL, '', regex=True)
+    text = text.str.replace(_PARENTHESIZED, '', regex=True).str.strip()
+
+    parts = text.str.extract(_BEFORE_UNIT)
+    number = parts[0].str.extract(_NUMBER_TEXT, expand=False)
+
+    # Earlier commas are thousands separators, the last one is the decimal point
+    number = (number.str.replace(_LAST_COMMA, '#', regex=True)
+                    .str.replace(',', '', regex=False)
+                    .str.replace('#', '.', regex=False))
+
+    # Keep only the first decimal point
+    halves = number.str.extract(_FIRST_DOT_SPLIT)
+    number = halves[0] + halves[1].str.replace('.', '', regex=False)
+
+    return _scale_to_billion(_to_float(number), parts[1], 3)
+
+
+@distinct_values
+def government_debt(series):
+    """Government debt text -> (% of GDP, absolute value in billions rounded to 2 decimals)."""
+    text = _text(series).str.translate(_DEBT_CHARACTERS)
+    for removal in _DEBT_REMOVALS:
+        text = text.str.replace(removal, '', regex=False)
+    text = text.str.strip().str.lower()
+
+    percent = _to_float(text.str.extract(_DEBT_PERCENT, expand=False))
+    absolute = text.str.extract(_DEBT_ABSOLUTE)
+    return pd.DataFrame({
+        'Gov_Debt_Percent_GDP_Cleaned': percent,
+        'Gov_Debt_Absolute_Billion_Cleaned': _scale_to_billion(_to_float(absolute[0]), absolute[1], 2),
+    }, index=series.index)
+
+
+@distinct_values
+def currencies(series):
+    """Currency text -> "Name (CODE)", falling back to the name or the whole text."""
+    text = _text(series)
+    missing = text.isna()
+    text = text.fillna('')
+    for old, new in _MOJIBAKE:
+        text = text.str.replace(old, new, regex=False)
+    text = text.str.replace(_INDEX_NOTE, '', regex=True)
+    text = text.str.replace(_EXCEPT_NOTE, '', regex=True)
+    text = text.str.replace(_DOLLAR_INDEX, '', regex=True)
+
+    code = text.str.extract(_CURRENCY_CODE, expand=False).fillna('')
+    name = text.str.extract(_CURRENCY_NAME, expand=False).str.strip()
+
+    labelled = name + ' (' + code + ')'
+    fallback = name.where(name != '', text.str.strip())
+    cleaned = labelled.where((name != '') & (code != ''), fallback)
+    return cleaned.mask(missing, '')
+
+
+def clean_scrape(raw):
+    """Raw scraper output -> the notebook's EDA frame (cells "Step 1" to `df_eda`)."""
+    df = raw[raw['GDP_total_usd'].astype(str).str.strip() != '—'].copy()
+    df['gdp_total_usd_billion_cleaned'] = gdp_total_billion(df['GDP_total_usd'])
+    df[['GDP_per_capita_nominal_cleaned', 'GDP_per_capita_ppp_cleaned']] = gdp_per_capita_parts(df['GDP_per_capita'])
+    for column in ['GDP_growth_rate', 'Inflation_rate', 'Unemployment_rate']:
+        df[f'{column}_cleaned'] = rates_with_fallback(df[column])
+    df['Exports_Cleaned_Billion'] = financial_values(df['Exports'])
+    df['Imports_Cleaned_Billion'] = financial_values(df['Imports'])
+    df[['Gov_Debt_Percent_GDP_Cleaned', 'Gov_Debt_Absolute_Billion_Cleaned']] = government_debt(df['Government_debt'])
+    df['clean_currency'] = currencies(df['Currency'])
+    return df[EDA_COLUMNS].copy()
+
+
+def golden_check(raw, final_path='Final_output.csv'):
+    """Compare clean_scrape(raw) with the cleaned columns of Final_output.csv.
+
+    Final_output.csv went through more notebook steps after cleaning, so each column
+    is compared the way it was transformed later: exactly, only where the scrape had
+    a value (median imputation), or after clipping to the final range (IQR capping).
+    Returns one row per column with the number of compared and mismatching rows.
+    """
+    final = pd.read_csv(final_path, float_precision='round_trip').set_index('Country')
+    cleaned = clean_scrape(raw).drop_duplicates('Country').set_index('Country')
+    cleaned = cleaned.loc[cleaned.index.intersection(final.index)]
+    final = final.loc[cleaned.index]
+
+    exact = ['gdp_total_usd_billion_cleaned', 'GDP_per_capita_nominal_cleaned', 'GDP_per_capita_ppp_cleaned',
+             'Exports_Cleaned_Billion', 'Imports_Cleaned_Billion']
+    imputed = ['Unemployment_rate_cleaned', 'Gov_Debt_Absolute_Billion_Cleaned']
+    capped = ['GDP_growth_rate_cleaned', 'Inflation_rate_cleaned', 'Gov_Debt_Percent_GDP_Cleaned']
+
+    report = []
+    for column in exact + imputed + capped:
+        ours, theirs = cleaned[column], final[column]
+        if column in capped:
+            ours = ours.clip(theirs.min(), theirs.max())
+        if column in exact:
+            compared = pd.Series(True, index=ours.index)
+        else:
+            compared = cleaned[column].notna()
+        same = (ours == theirs) | (ours.isna() & theirs.isna())
+        report.append({'column': column, 'compared': int(compared.sum()), 'mismatches': int((compared & ~same).sum())})
+
+    currency = cleaned['clean_currency'].fillna('') == final['clean_currency'].fillna('')
+    report.append({'column': 'clean_currency', 'compared': len(currency), 'mismatches': int((~currency).sum())})
+    return pd.DataFrame(report)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Clean a raw GDP_Finder scrape.")
+    parser.add_argument("raw", help="raw scraper CSV (python scraper.py --out ...)")
+    parser.add_argument("--out", help="write the cleaned EDA columns here")
+    parser.add_argument("--check", action="store_true", help="golden check against --final")
+    parser.add_argument("--final", default="Final_output.csv")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    raw = pd.read_csv(args.raw)
+    if args.out:
+        cleaned = clean_scrape(raw)
+        cleaned.to_csv(args.out, index=False)
+        logger.info("Saved %d cleaned rows to %s", len(cleaned), args.out)
+    if args.check:
+        report = golden_check(raw, args.final)
+        print(report.to_string(index=False))
+        if report['mismatches'].any():
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""
+Interactive re-clustering for the Cluster Explorer section.
+
+The notebook fixes KMeans(n_clusters=4) on the scaled cluster features. Here the
+user picks k and the feature subset; each choice is fitted with MiniBatchKMeans
+and warm-started from the centroids of the last fit on the same features:
+- for a smaller k, the most populated previous centroids are kept
+- for a larger k, the new centroids are seeded on the points farthest from the
+  existing ones (the k-means++ idea, made deterministic)
+
+The scaled matrix and 2-D PCA projection depend only on the feature set, so they
+are cached per (features, dataset version), keeping the max_spaces most recently
+used. Fits are cached per (features, k, dataset version), keeping max_entries.
+"""
+import logging
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from model_serving import CLUSTER_FEATURES, feature_matrix
+
+logger = logging.getLogger(__name__)
+
+# Indicators offered in the explorer: the notebook's cluster features without the flags
+EXPLORER_FEATURES = [col for col in CLUSTER_FEATURES if not col.startswith("Is_")]
+DEFAULT_FEATURES = [
+    'gdp_total_usd_billion_cleaned', 'GDP_per_capita_ppp_cleaned', 'GDP_growth_rate_cleaned',
+    'Inflation_rate_cleaned', 'Unemployment_rate_cleaned', 'Gov_Debt_Percent_GDP_Cleaned',
+    'Trade_Openness',
+]
+
+
+class ClusterResult:
+    def __init__(self, features, k, labels, centers, inertia, projection, explained, warm_started):
+        self.features = features
+        self.k = k
+        self.labels = labels
+        self.centers = centers
+        self.inertia = inertia
+        self.projection = projection
+        self.explained = explained
+        self.warm_started = warm_started
+
+    def sizes(self):
+        valid = self.labels[self.labels >= 0]
+        return np.bincount(valid, minlength=self.k)
+
+
+class ClusterEngine:
+    def __init__(self, frame, version, batch_size=1024, max_entries=32, max_spaces=4, random_state=42):
+        self.frame = frame
+        self.version = version
+        self.batch_size = batch_size
+        self.max_entries = max_entries
+        self.max_spaces = max_spaces
+        self.random_state = random_state
+        self._spaces = OrderedDict()
+        self._results = OrderedDict()
+        self._last_centers = {}
+        self._lock = threading.Lock()
+
+    def space(self, features):
+        """(row mask, scaled matrix, PCA projection, explained variance ratio) for a feature set."""
+        from sklearn.decomposition import PCA
+        from sklearn.preprocessing import StandardScaler
+
+        key = (features, self.version)
+        with self._lock:
+            if key in self._spaces:
+                self._spaces.move_to_end(key)
+                return self._spaces[key]
+
+        X = feature_matrix(self.frame, features)
+        mask = ~np.isnan(X).any(axis=1)
+        scaled = StandardScaler().fit_transform(X[mask])
+        pca = PCA(n_components=min(2, len(features)), random_state=self.random_state)
+        projection = pca.fit_transform(scaled)
+        if projection.shape[1] == 1:
+            projection = np.column_stack([projection, np.zeros(len(projection))])
+        space = (mask, scaled, projection, pca.explained_variance_ratio_)
+        with self._lock:
+            self._spaces[key] = space
+            while len(self._spaces) > self.max_spaces:
+                # Each space holds a scaled copy of the feature columns; its warm-start centroids go with it
+                (evicted, _), _ = self._spaces.popitem(last=False)
+                self._last_centers.pop(evicted, None)
+        return space
+
+    def _initial_centers(self, scaled, features, k):
+        previous = self._last_centers.get(features)
+        if previous is None:
+            return None
+        centers, sizes = previous
+        if k <= len(centers):
+            return centers[np.argsort(-sizes, kind="stable")[:k]]
+        centers = list(centers)
+        distances = np.min([((scaled - c) ** 2).sum(axis=1) for c in centers], axis=0)
+        while len(centers) < k:
+            far = scaled[int(np.argmax(distances))]
+            centers.append(far)
+            distances = np.minimum(distances, ((scaled - far) ** 2).sum(axis=1))
+        return np.array(centers)
+
+    def fit(self, features, k):
+        """Cluster on the chosen features; rows with missing values get label -1."""
+        from sklearn.cluster import MiniBatchKMeans
+
+        features = tuple(features)
+        if not features:
+            raise ValueError("Choose at least one feature to cluster on")
+        key = (features, k, self.version)
+        with self._lock:
+            if key in self._results:
+                self._results.move_to_end(key)
+                return self._results[key]
+
+        mask, scaled, projection, explained = self.space(features)
+        if k > len(scaled):
+            raise ValueError(f"Cannot form {k} clusters from {len(scaled)} complete rows")
+        init = self._initial_centers(scaled, features, k)
+        model = MiniBatchKMeans(
+            n_clusters=k,
+            init=init if init is not None else "k-means++",
+            n_init=1 if init is not None else 3,
+            batch_size=self.batch_size,
+            random_state=self.random_state,
+        ).fit(scaled)
+
+        labels = np.full(len(mask), -1, dtype="int64")
+        labels[mask] = model.labels_
+        result = ClusterResult(features, k, labels, model.cluster_centers_, model.inertia_,
+                               projection, explained, warm_started=init is not None)
+        logger.info("Clustered %d rows on %d features, k=%d (warm start: %s)",
+                    len(scaled), len(features), k, result.warm_started)
+
+        with self._lock:
+            self._last_centers[features] = (model.cluster_centers_, np.bincount(model.labels_, minlength=k))
+            self._results[key] = result
+            while len(self._results) > self.max_entries:
+                self._results.popitem(last=False)
+        return result
@@ -0,0 +1,53 @@
+"""
+Country reference table: name aliases -> ISO-3 code -> region.
+
+country_reference.csv holds one row per accepted spelling of a country name
+(Wikipedia names first, then common aliases), so Region and ISO3 are attached to
+the dataset with a single vectorized merge. The choropleths use the ISO3 column
+with locationmode="ISO-3" instead of asking Plotly to resolve names per render.
+EID_REFERENCE_PATH replaces the table (e.g. with the one written next to a
+synthetic benchmark dataset).
+"""
+import logging
+import os
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+REFERENCE_CSV = os.environ.get(
+    "EID_REFERENCE_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "country_reference.csv")
+)
+
+REGIONS = ["North America", "South America", "Europe", "Asia", "Africa", "Oceania", "Other"]
+UNMAPPED_REGION = "Other"
+
+
+def normalize_name(names):
+    return names.astype("string").str.strip().str.casefold()
+
+
+def load_reference(path=REFERENCE_CSV):
+    reference = pd.read_csv(path, dtype=str, keep_default_na=False)
+    reference["name_key"] = normalize_name(reference["name"])
+    duplicated = reference["name_key"].duplicated()
+    if duplicated.any():
+        raise ValueError(f"Duplicate names in {path}: {reference.loc[duplicated, 'name'].tolist()}")
+    return reference
+
+
+def attach_reference(df, reference=None):
+    """Add ISO3 and a categorical Region column to df in one merge on the country name."""
+    if reference is None:
+        reference = load_reference()
+
+    keys = pd.DataFrame({"name_key": normalize_name(df["Country"]).to_numpy()})
+    matched = keys.merge(reference[["name_key", "iso3", "region"]], on="name_key", how="left")
+
+    unmapped = df["Country"][matched["iso3"].isna().to_numpy()]
+    if len(unmapped):
+        logger.warning("No country reference entry for %d countries: %s", len(unmapped), ", ".join(map(str, unmapped)))
+
+    df["ISO3"] = matched["iso3"].to_numpy()
+    df["Region"] = pd.Categorical(matched["region"].fillna(UNMAPPED_REGION).to_numpy(), categories=REGIONS)
+    return df
@@ -0,0 +1,467 @@
+"""
+Columnar snapshot store for the dashboard dataset.
+
+Final_output.csv stays the source of truth written by GDP_Finder.ipynb. Each
+version of it is parsed once and split into two files under
+snapshot/v-<sha256 prefix>/:
+
+- indicators.arrow: uncompressed Arrow IPC file with the numeric indicators with typed/categorical columns,
+  plus the derived Region, ISO3, Trade Balance and Total Trade columns
+- narratives.parquet: the scraped_paragraph and summary text, read only
+  when the Country Analysis summary block asks for it
+- search_index.joblib / search_text.arrow: the full-text index over the
+  narratives (narrative_search.py), loaded on the first search
+
+snapshot/manifest.json points at the current version directory and is replaced
+atomically after the new files are complete. The newest KEEP_VERSIONS versions
+are kept, and so is any older one a live Dataset still reads from: every Dataset
+holds a lease file in <version>/.readers/ (released when it is garbage
+collected, ignored once its process is gone), since the narratives and the
+search index are read lazily from the version directory.
+
+The dashboard shares one read-only Dataset per process across all sessions: the
+indicator frame is Arrow-backed and reads straight from the memory-mapped IPC
+file, so it is never copied per session or per rerun. Views must not add or overwrite columns; add
+derived columns in prepare_frame() instead.
+
+DatasetStore holds the current Dataset and can watch the CSV from a background
+thread: a new version is loaded and precomputed off the request path and then
+swapped in with a single reference assignment, so each script run sees one
+consistent Dataset while the next run picks up the new one. Given a PanelStore
+(panel_store.py), it also appends every version it loads as a year partition.
+
+Run `python data_store.py` to prebuild the snapshot (e.g. in a container image).
+EID_DATA_PATH and EID_SNAPSHOT_DIR point the store at another CSV and snapshot
+directory (the benchmarks use them for the synthetic datasets).
+"""
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+import uuid
+import weakref
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from aggregates import AggregateCube
+from country_reference import REFERENCE_CSV, attach_reference
+from explorer import DataExplorer
+from narrative_search import build_index, load_index
+from peers import PeerIndex
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+SOURCE_CSV = os.environ.get("EID_DATA_PATH", os.path.join(BASE_DIR, "Final_output.csv"))
+SNAPSHOT_DIR = os.environ.get("EID_SNAPSHOT_DIR", os.path.join(BASE_DIR, "snapshot"))
+
+# Bump when the snapshot layout or the derived columns change
+SNAPSHOT_FORMAT = 5
+KEEP_VERSIONS = 2
+
+INDICATORS_FILE = "indicators.arrow"
+NARRATIVES_FILE = "narratives.parquet"
+MANIFEST_FILE = "manifest.json"
+READERS_DIR = ".readers"
+
+TEXT_COLUMNS = ["scraped_paragraph", "summary"]
+CATEGORICAL_COLUMNS = ["Region", "economic_class", "clean_currency"]
+INTEGER_COLUMNS = {
+    "GDP_total_Year": "int16",
+    "cluster": "int8",
+    "Is_Eurozone": "int8",
+    "Is_USD_Pegged": "int8",
+}
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def prepare_frame(df):
+    """Add the derived columns and apply the snapshot dtypes to a raw CSV frame."""
+    attach_reference(df)
+    df["Trade Balance"] = df["Exports_Cleaned_Billion"] - df["Imports_Cleaned_Billion"]
+    df["Total Trade"] = df["Exports_Cleaned_Billion"] + df["Imports_Cleaned_Billion"]
+
+    for col in CATEGORICAL_COLUMNS:
+        df[col] = df[col].astype("category")
+    for col, dtype in INTEGER_COLUMNS.items():
+        df[col] = df[col].astype(dtype)
+    return df
+
+
+def write_table(df, path):
+    # Write next to the target and rename, so concurrent workers never read a partial file
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    if path.endswith(".arrow"):
+        with pa.OSFile(tmp_path, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    else:
+        pq.write_table(table, tmp_path)
+    os.replace(tmp_path, path)
+
+
+def _write_manifest(manifest, directory):
+    manifest_path = os.path.join(directory, MANIFEST_FILE)
+    with open(f"{manifest_path}.{os.getpid()}.tmp", "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(f"{manifest_path}.{os.getpid()}.tmp", manifest_path)
+
+
+def version_dir(manifest, snapshot_dir=SNAPSHOT_DIR):
+    return os.path.join(snapshot_dir, manifest["directory"])
+
+
+def _acquire_lease(directory):
+    """Mark a version directory as read by this process; returns the lease path (None if read-only)."""
+    readers = os.path.join(directory, READERS_DIR)
+    lease = os.path.join(readers, f"{os.getpid()}-{uuid.uuid4().hex[:8]}")
+    try:
+        os.makedirs(readers, exist_ok=True)
+        open(lease, "w").close()
+    except OSError:
+        # A read-only snapshot is never pruned by this process either
+        return None
+    return lease
+
+
+def _release_lease(lease):
+    try:
+        os.remove(lease)
+    except OSError:
+        pass
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _in_use(directory):
+    """Whether a live process holds a lease on a version directory; stale leases are removed."""
+    readers = os.path.join(directory, READERS_DIR)
+    try:
+        names = os.listdir(readers)
+    except OSError:
+        return False
+    in_use = False
+    for name in names:
+        pid = name.partition("-")[0]
+        if pid.isdigit() and _pid_alive(int(pid)):
+            in_use = True
+        else:
+            _release_lease(os.path.join(readers, name))
+    return in_use
+
+
+def _built_at(path):
+    # The version manifest is written last and never touched again; the directory's own
+    # mtime moves whenever a reader adds its lease
+    try:
+        return os.path.getmtime(os.path.join(path, MANIFEST_FILE))
+    except OSError:
+        return os.path.getmtime(path)
+
+
+def _prune_versions(snapshot_dir, keep):
+    """Remove version directories (and pre-versioning files) other than the newest `keep` and those still read."""
+    for name in (INDICATORS_FILE, NARRATIVES_FILE):
+        if os.path.exists(os.path.join(snapshot_dir, name)):
+            os.remove(os.path.join(snapshot_dir, name))
+    versions = [
+        os.path.join(snapshot_dir, name) for name in os.listdir(snapshot_dir)
+        if name.startswith("v-") and os.path.isdir(os.path.join(snapshot_dir, name))
+    ]
+    for path in sorted(versions, key=_built_at, reverse=True)[keep:]:
+        if _in_use(path):
+            logger.debug("Keeping snapshot %s, still read by a live dataset", path)
+            continue
+        shutil.rmtree(path, ignore_errors=True)
+
+
+def build_snapshot(csv_path=SOURCE_CSV, snapshot_dir=SNAPSHOT_DIR):
+    """Parse the CSV once, write its version directory and point the manifest at it."""
+    source_sha256 = file_hash(csv_path)
+    stat = os.stat(csv_path)
+    df = pd.read_csv(csv_path)
+    source_columns = list(df.columns)
+
+    narratives = df[["Country"] + TEXT_COLUMNS]
+    indicators = prepare_frame(df.drop(columns=TEXT_COLUMNS))
+
+    manifest = {
+        "format": SNAPSHOT_FORMAT,
+        "directory": f"v-{source_sha256[:12]}",
+        "source_sha256": source_sha256,
+        "source_size": stat.st_size,
+        "source_mtime": stat.st_mtime,
+        "reference_sha256": file_hash(REFERENCE_CSV),
+        "source_columns": source_columns,
+        "rows": len(indicators),
+    }
+    directory = version_dir(manifest, snapshot_dir)
+    os.makedirs(directory, exist_ok=True)
+    write_table(indicators, os.path.join(directory, INDICATORS_FILE))
+    write_table(narratives, os.path.join(directory, NARRATIVES_FILE))
+    build_index(narratives, directory)
+    _write_manifest(manifest, directory)
+    # The top-level manifest is the pointer readers follow; swap it last
+    _write_manifest(manifest, snapshot_dir)
+    _prune_versions(snapshot_dir, KEEP_VERSIONS)
+
+    logger.info("Built snapshot %s of %d rows from %s", manifest["directory"], len(indicators), csv_path)
+    return manifest
+
+
+def read_manifest(snapshot_dir=SNAPSHOT_DIR):
+    try:
+        with open(os.path.join(snapshot_dir, MANIFEST_FILE)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def snapshot_is_fresh(manifest, csv_path=SOURCE_CSV, snapshot_dir=SNAPSHOT_DIR):
+    if not manifest or manifest.get("format") != SNAPSHOT_FORMAT:
+        return False
+    if not os.path.exists(os.path.join(version_dir(manifest, snapshot_dir), INDICATORS_FILE)):
+        return False
+    if manifest.get("reference_sha256") != file_hash(REFERENCE_CSV):
+        return False
+    if not os.path.exists(csv_path):
+        # Deployments may ship only the snapshot
+        return True
+
+    stat = os.stat(csv_path)
+    if stat.st_size == manifest["source_size"] and stat.st_mtime == manifest["source_mtime"]:
+        return True
+    if stat.st_size != manifest["source_size"] or file_hash(csv_path) != manifest["source_sha256"]:
+        return False
+    # Touched but unchanged: record the new mtime so the next check skips the hash
+    manifest["source_mtime"] = stat.st_mtime
+    try:
+        _write_manifest(manifest, snapshot_dir)
+    except OSError:
+        logger.debug("Could not update the manifest mtime in %s", snapshot_dir)
+    return True
+
+
+def ensure_snapshot(csv_path=SOURCE_CSV, snapshot_dir=SNAPSHOT_DIR):
+    """Return the manifest of an up-to-date snapshot, rebuilding it if the CSV changed."""
+    manifest = read_manifest(snapshot_dir)
+    if snapshot_is_fresh(manifest, csv_path, snapshot_dir):
+        return manifest
+    return build_snapshot(csv_path, snapshot_dir)
+
+
+def _arrow_dtype(arrow_type):
+    # Dictionary columns become pandas categoricals, everything else stays Arrow-backed
+    if pa.types.is_dictionary(arrow_type):
+        return None
+    return pd.ArrowDtype(arrow_type)
+
+
+def read_arrow(path):
+    """Arrow-backed frame over a memory-mapped Arrow IPC file (no column copies)."""
+    table = pa.ipc.open_file(pa.memory_map(path, "r")).read_all()
+    return table.to_pandas(types_mapper=_arrow_dtype)
+
+
+def load_indicators(directory):
+    return read_arrow(os.path.join(directory, INDICATORS_FILE))
+
+
+def load_narratives(directory):
+    table = pq.read_table(os.path.join(directory, NARRATIVES_FILE), memory_map=True)
+    return table.to_pandas()
+
+
+def load_summary(country, directory):
+    """Read the summary text of a single country from the narratives snapshot."""
+    table = pq.read_table(
+        os.path.join(directory, NARRATIVES_FILE),
+        columns=["summary"],
+        filters=[("Country", "==", country)],
+    )
+    summaries = table.column("summary").to_pylist()
+    return summaries[0] if summaries else None
+
+
+def load_full_dataset(directory):
+    """Indicators joined with the narrative columns, in the original CSV column order."""
+    manifest = read_manifest(directory)
+    df = load_indicators(directory).merge(load_narratives(directory), on="Country", how="left")
+    ordered = [col for col in manifest["source_columns"] if col in df.columns]
+    return df[ordered + [col for col in df.columns if col not in ordered]]
+
+
+class Dataset:
+    """One immutable version of the dashboard data, shared by every session."""
+
+    def __init__(self, version, frame, directory=None):
+        self.version = version
+        self.frame = frame
+        self.directory = directory  # snapshot version directory holding the narratives
+        lease = _acquire_lease(directory) if directory is not None else None
+        if lease is not None:
+            # Keeps the directory from being pruned while this dataset can still read it
+            weakref.finalize(self, _release_lease, lease)
+        self.year = int(frame["GDP_total_Year"].max()) if len(frame) else None
+        # Derived structures are built once here, never per view
+        self.cube = AggregateCube(frame)
+        self.positions = {country: i for i, country in enumerate(frame["Country"].tolist())}
+        self.peers = PeerIndex(frame)
+        self.explorer = DataExplorer(frame)
+        self._search_index = None
+        self._search_lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.frame)
+
+    def summary(self, country):
+        return load_summary(country, self.directory)
+
+    def full_frame(self):
+        return load_full_dataset(self.directory)
+
+    def search_index(self):
+        with self._search_lock:
+            if self._search_index is None:
+                self._search_index = load_index(self.directory, load_narratives)
+            return self._search_index
+
+    def search(self, query, regions=None, classes=None, limit=10):
+        """Ranked SearchHits for a narrative query, optionally restricted to regions and economic classes."""
+        mask = None
+        if regions or classes:
+            mask = self.explorer.mask(categories={"Region": regions, "economic_class": classes})
+        return self.search_index().search(query, mask, limit)
+
+    def row(self, country):
+        """The indicator row of one country, without scanning the frame."""
+        return self.frame.iloc[self.positions[country]]
+
+    def peer_frame(self, country, k=5):
+        """The k countries closest to country on the standardized indicators, nearest first."""
+        positions, distances = self.peers.neighbours(self.positions[country], k)
+        peers = self.frame.iloc[positions].copy()
+        peers.insert(1, "Distance", distances)
+        return peers
+
+
+def _dataset_from_manifest(manifest, snapshot_dir):
+    directory = version_dir(manifest, snapshot_dir)
+    return Dataset(manifest["source_sha256"][:12], load_indicators(directory), directory)
+
+
+def load_dataset(csv_path=SOURCE_CSV, snapshot_dir=SNAPSHOT_DIR):
+    return _dataset_from_manifest(ensure_snapshot(csv_path, snapshot_dir), snapshot_dir)
+
+
+class DatasetStore:
+    """The current Dataset, replaced atomically when the source CSV or snapshot changes."""
+
+    def __init__(self, csv_path=SOURCE_CSV, snapshot_dir=SNAPSHOT_DIR, panel=None):
+        self.csv_path = csv_path
+        self.snapshot_dir = snapshot_dir
+        self.panel = panel  # PanelStore that keeps every loaded version as a year partition
+        try:
+            self._current = load_dataset(csv_path, snapshot_dir)
+        except Exception:
+            # A broken CSV must not take the dashboard down while a built version exists
+            manifest = read_manifest(snapshot_dir)
+            if not manifest or manifest.get("format") != SNAPSHOT_FORMAT:
+                raise
+            logger.exception("Could not load %s, serving snapshot %s", csv_path, manifest["directory"])
+            self._current = _dataset_from_manifest(manifest, snapshot_dir)
+        self._append_to_panel(self._current)
+        self._reload_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.reloads = 0
+        self.last_error = None
+
+    def _append_to_panel(self, dataset):
+        if self.panel is None:
+            return
+        try:
+            self.panel.append(dataset.frame, dataset.version)
+        except Exception:
+            # History is best-effort; the current version is served either way
+            logger.exception("Could not append version %s to the panel", dataset.version)
+
+    def current(self):
+        # Read once per script run; a concurrent swap only affects later reads
+        return self._current
+
+    def is_current(self):
+        manifest = read_manifest(self.snapshot_dir)
+        return (snapshot_is_fresh(manifest, self.csv_path, self.snapshot_dir)
+                and manifest["source_sha256"][:12] == self._current.version)
+
+    def refresh(self):
+        """Load and swap in a new version if the data changed; returns True on a swap."""
+        with self._reload_lock:
+            if self.is_current():
+                return False
+            dataset = load_dataset(self.csv_path, self.snapshot_dir)
+            if dataset.version == self._current.version:
+                return False
+            self._append_to_panel(dataset)
+            previous, self._current = self._current.version, dataset
+            self.reloads += 1
+        logger.info("Dataset version %s replaced %s", dataset.version, previous)
+        return True
+
+    def _source_signature(self):
+        try:
+            stat = os.stat(self.csv_path)
+            return stat.st_size, stat.st_mtime
+        except OSError:
+            return None
+
+    def _watch(self, interval):
+        failed_signature = None
+        while not self._stop.wait(interval):
+            try:
+                self.refresh()
+                self.last_error = None
+                failed_signature = None
+            except Exception as e:
+                # Keep serving the current version and retry on the next tick; log once per source change
+                self.last_error = e
+                signature = self._source_signature()
+                if signature != failed_signature:
+                    logger.exception("Dataset refresh failed, still serving version %s", self._current.version)
+                    failed_signature = signature
+
+    def start_watcher(self, interval=30.0):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._watch, args=(interval,), name="dataset-watcher", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop_watcher(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    build_snapshot()
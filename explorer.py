@@ -0,0 +1,137 @@
+"""
+Server-side filtering, sorting and pagination for the Download Data explorer.
+
+The explorer keeps, per Dataset:
+- a position index per categorical column (Region, economic_class, cluster):
+  value -> sorted row positions
+- an argsort per column and direction (missing values last, ties in row
+  order as in pandas; text columns by their sorted values), built on the first
+  sort or range filter that uses it and then reused
+
+A query combines its filters into one row mask, walks the chosen column's sort
+order (or row order) to keep the matching positions, and materializes only the
+requested page and columns. The browser never receives more than one page.
+"""
+import logging
+import threading
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+CATEGORY_COLUMNS = ["Region", "economic_class", "cluster"]
+
+
+class Page:
+    def __init__(self, frame, total, page, page_size):
+        self.frame = frame
+        self.total = total
+        self.page = page
+        self.page_size = page_size
+
+    @property
+    def pages(self):
+        return max(1, -(-self.total // self.page_size))
+
+    @property
+    def first_row(self):
+        return self.page * self.page_size + 1 if self.total else 0
+
+    @property
+    def last_row(self):
+        return min(self.total, (self.page + 1) * self.page_size)
+
+
+class DataExplorer:
+    def __init__(self, frame, category_columns=CATEGORY_COLUMNS):
+        self.frame = frame
+        self.numeric_columns = [
+            col for col in frame.columns
+            if pd.api.types.is_numeric_dtype(frame[col].dtype) and not isinstance(frame[col].dtype, pd.CategoricalDtype)
+        ]
+        self._values = {}
+        self._orders = {}
+        self._lock = threading.Lock()
+
+        self.categories = {}
+        for col in category_columns:
+            if col not in frame.columns:
+                continue
+            codes, uniques = pd.factorize(frame[col], sort=True)
+            order = np.argsort(codes, kind="stable")
+            counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+            starts = np.searchsorted(codes[order], np.arange(len(uniques)))
+            self.categories[col] = {
+                value: order[start:start + count]
+                for value, start, count in zip(uniques.tolist(), starts, counts)
+            }
+        self._country = frame["Country"].astype(object).str.lower().to_numpy().astype(str)
+
+    def values(self, col):
+        """col as float64; text and categorical columns as their sorted category codes."""
+        with self._lock:
+            if col not in self._values:
+                if col in self.numeric_columns:
+                    values = self.frame[col].to_numpy(dtype="float64", na_value=np.nan)
+                else:
+                    codes, _ = pd.factorize(self.frame[col], sort=True)
+                    values = np.where(codes >= 0, codes, np.nan)
+                self._values[col] = values
+            return self._values[col]
+
+    def sort_order(self, col, ascending=True):
+        """Row positions ordered by col, missing values last and ties in row order; computed once per direction."""
+        values = self.values(col)
+        with self._lock:
+            if (col, ascending) not in self._orders:
+                # Stable on the negated values, so descending ties keep row order; NaN sorts last either way
+                self._orders[col, ascending] = np.argsort(values if ascending else -values, kind="stable")
+            return self._orders[col, ascending]
+
+    def bounds(self, col):
+        values = self.values(col)
+        if np.isnan(values).all():
+            return 0.0, 0.0
+        return float(np.nanmin(values)), float(np.nanmax(values))
+
+    def mask(self, categories=None, ranges=None, search=None):
+        """Boolean row mask for {column: allowed values}, {column: (low, high)} and a Country substring."""
+        keep = np.ones(len(self.frame), dtype=bool)
+        for col, allowed in (categories or {}).items():
+            if not allowed:
+                continue
+            index = self.categories[col]
+            selected = np.zeros(len(self.frame), dtype=bool)
+            for value in allowed:
+                selected[index.get(value, [])] = True
+            keep &= selected
+        for col, (low, high) in (ranges or {}).items():
+            order = self.sort_order(col)
+            ordered = self.values(col)[order]
+            valid = np.count_nonzero(~np.isnan(ordered))
+            start = np.searchsorted(ordered[:valid], low, side="left")
+            stop = np.searchsorted(ordered[:valid], high, side="right")
+            selected = np.zeros(len(self.frame), dtype=bool)
+            selected[order[start:stop]] = True
+            keep &= selected
+        if search:
+            keep &= np.char.find(self._country, search.lower()) >= 0
+        return keep
+
+    def select(self, categories=None, ranges=None, search=None, sort_by=None, ascending=True):
+        """Positions of the rows matching the filters, in sort order."""
+        keep = self.mask(categories, ranges, search)
+        if sort_by is None:
+            return np.flatnonzero(keep)
+        order = self.sort_order(sort_by, ascending)
+        return order[keep[order]]
+
+    def query(self, columns, categories=None, ranges=None, search=None,
+              sort_by=None, ascending=True, page=0, page_size=50):
+        """One Page of the rows matching the filters, in sort order, restricted to columns."""
+        positions = self.select(categories, ranges, search, sort_by, ascending)
+        total = len(positions)
+        page = min(max(page, 0), max(0, -(-total // page_size) - 1))
+        visible = positions[page * page_size:(page + 1) * page_size]
+        return Page(self.frame.iloc[visible][list(columns)], total, page, page_size)
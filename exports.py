@@ -0,0 +1,181 @@
+"""
+Cached, chunked exports of the dashboard dataset.
+
+Each export is written once per dataset version and row/column selection to
+.cache/exports/<version>/<slice>.<ext>, where <slice> hashes the selected row
+positions and columns, so the same selection is never serialized twice and
+every format of a selection shares one in-memory slice. Files are written from
+fixed-size row chunks into a temporary file that is renamed into place, so
+memory stays bounded by the chunk size and readers never see a partial file.
+When a new version is exported, the directories of all but the KEEP_VERSIONS
+most recently written versions are removed, so a session still downloading from
+the previous dataset version keeps its files.
+
+The Download Data button passes a callable, so nothing is serialized until a
+user actually asks for a file. Only the writes are chunked: Streamlit holds a
+download in memory, so the callable reads the finished file and returns its bytes.
+"""
+import gzip
+import hashlib
+import logging
+import os
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_EXPORT_DIR = os.path.join(BASE_DIR, ".cache", "exports")
+CHUNK_ROWS = 10_000
+KEEP_VERSIONS = 2
+
+# format -> (file extension, MIME type)
+FORMATS = {
+    "CSV": (".csv", "text/csv"),
+    "CSV (gzip)": (".csv.gz", "application/gzip"),
+    "Parquet": (".parquet", "application/vnd.apache.parquet"),
+    "JSON Lines": (".jsonl", "application/x-ndjson"),
+}
+
+
+def _chunks(frame, chunk_rows):
+    for start in range(0, len(frame), chunk_rows):
+        yield frame.iloc[start:start + chunk_rows]
+
+
+def _write_csv(frame, path, chunk_rows):
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        for i, chunk in enumerate(_chunks(frame, chunk_rows)):
+            chunk.to_csv(f, header=i == 0, index=False)
+        if not len(frame):
+            frame.to_csv(f, index=False)
+
+
+def _write_csv_gz(frame, path, chunk_rows):
+    with gzip.open(path, "wt", encoding="utf-8", newline="") as f:
+        for i, chunk in enumerate(_chunks(frame, chunk_rows)):
+            chunk.to_csv(f, header=i == 0, index=False)
+        if not len(frame):
+            frame.to_csv(f, index=False)
+
+
+def _write_parquet(frame, path, chunk_rows):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.Schema.from_pandas(frame, preserve_index=False)
+    with pq.ParquetWriter(path, schema) as writer:
+        for chunk in _chunks(frame, chunk_rows):
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+
+
+def _write_jsonl(frame, path, chunk_rows):
+    with open(path, "w", encoding="utf-8") as f:
+        for chunk in _chunks(frame, chunk_rows):
+            text = chunk.to_json(orient="records", lines=True, force_ascii=False)
+            f.write(text if text.endswith("\n") else text + "\n")
+
+
+WRITERS = {
+    "CSV": _write_csv,
+    "CSV (gzip)": _write_csv_gz,
+    "Parquet": _write_parquet,
+    "JSON Lines": _write_jsonl,
+}
+
+
+class ExportCache:
+    def __init__(self, load_frame, root=DEFAULT_EXPORT_DIR, chunk_rows=CHUNK_ROWS, max_slices=8,
+                 keep_versions=KEEP_VERSIONS):
+        self.load_frame = load_frame    # () -> full export frame, called at most once per version
+        self.root = root
+        self.chunk_rows = chunk_rows
+        self.max_slices = max_slices
+        self.keep_versions = keep_versions
+        self._frames = {}
+        self._slices = OrderedDict()
+        self._locks = {}                # path -> lock, only while that file is being written
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def slice_key(positions, columns):
+        """Hash of the selected row positions and columns; None selects all of them."""
+        digest = hashlib.sha256()
+        digest.update(b"all" if positions is None else b"rows" + np.asarray(positions, dtype=np.int64).tobytes())
+        digest.update(b"\x00" + ("\x1f".join(columns).encode("utf-8") if columns is not None else b"all"))
+        return digest.hexdigest()[:16]
+
+    def path(self, version, key, fmt):
+        return os.path.join(self.root, version, key + FORMATS[fmt][0])
+
+    def _full_frame(self, version):
+        with self._lock:
+            if version not in self._frames:
+                self._frames = {version: self.load_frame()}
+            return self._frames[version]
+
+    def _slice(self, version, key, positions, columns):
+        with self._lock:
+            if (version, key) in self._slices:
+                self._slices.move_to_end((version, key))
+                return self._slices[(version, key)]
+        frame = self._full_frame(version)
+        if positions is not None:
+            frame = frame.iloc[positions]
+        sliced = frame[list(columns)] if columns is not None else frame
+        with self._lock:
+            self._slices[(version, key)] = sliced
+            while len(self._slices) > self.max_slices:
+                self._slices.popitem(last=False)
+        return sliced
+
+    def _prune(self, version):
+        """Remove version directories other than version and the most recently written keep_versions."""
+        if not os.path.isdir(self.root):
+            return
+        others = [
+            os.path.join(self.root, name) for name in os.listdir(self.root)
+            if name != version and os.path.isdir(os.path.join(self.root, name))
+        ]
+        # Open download handles keep reading removed files
+        for path in sorted(others, key=os.path.getmtime, reverse=True)[self.keep_versions - 1:]:
+            shutil.rmtree(path, ignore_errors=True)
+
+    def export(self, version, fmt, positions=None, columns=None):
+        """Path of the export file for this selection, writing it on the first request."""
+        key = self.slice_key(positions, columns)
+        path = self.path(version, key, fmt)
+        if os.path.exists(path):
+            return path
+        with self._lock:
+            lock = self._locks.setdefault(path, threading.Lock())
+        with lock:
+            if os.path.exists(path):
+                return path
+            self._prune(version)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            frame = self._slice(version, key, positions, columns)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            os.close(fd)
+            try:
+                WRITERS[fmt](frame, tmp_path, self.chunk_rows)
+                os.replace(tmp_path, path)
+            finally:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                # Once the file exists later requests return before taking a lock
+                with self._lock:
+                    self._locks.pop(path, None)
+            logger.info("Exported %d rows x %d columns as %s to %s", len(frame), frame.shape[1], fmt, path)
+        return path
+
+    def opener(self, version, fmt, positions=None, columns=None):
+        """Zero-argument callable for st.download_button: builds the export if needed and returns its bytes."""
+        def read_export():
+            with open(self.export(version, fmt, positions, columns), "rb") as f:
+                return f.read()
+        return read_export
@@ -0,0 +1,83 @@
+"""
+Process-wide LRU cache of built Plotly figures.
+
+Figures are keyed on (section, chart, dataset version, parameters) and stored as
+Figure objects, so a section switch or widget click with unchanged data skips
+building the figure through plotly.express. This is a build cache, not a
+serialization cache: st.plotly_chart serializes the figure on every call and
+takes no pre-serialized spec. Cached figures are shared by every session and
+must not be modified. A new dataset version produces new keys; the stale entries
+fall out through LRU eviction.
+"""
+import threading
+from collections import OrderedDict
+
+import plotly.io as pio
+
+from metrics import REGISTRY
+
+
+class FigureCache:
+    def __init__(self, max_entries=64):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(section, chart, version, params=None):
+        return (section, chart, version, tuple(sorted((params or {}).items())))
+
+    def get(self, key):
+        """(figure, spec size in bytes), or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key, figure, size):
+        with self._lock:
+            self._entries[key] = (figure, size)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_build(self, section, chart, version, builder, **params):
+        """Return the cached figure, calling builder() to create it on a miss."""
+        key = self.make_key(section, chart, version, params)
+        entry = self.get(key)
+        if entry is None:
+            with REGISTRY.span("figure_build", section=section, chart=chart):
+                figure = builder()
+            # Measured once: the spec is about what st.plotly_chart sends to the browser
+            with REGISTRY.span("figure_serialize", section=section, chart=chart):
+                size = len(pio.to_json(figure, validate=False))
+            self.put(key, figure, size)
+        else:
+            figure, size = entry
+        REGISTRY.add_payload(size, section=section)
+        return figure
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "spec_bytes": sum(size for _, size in self._entries.values()),
+            }
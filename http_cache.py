@@ -0,0 +1,154 @@
+"""
+Persistent on-disk HTTP response cache with conditional revalidation.
+
+Responses are stored per URL (sha256 of the URL) as a body file plus a JSON
+metadata file holding the status, headers, ETag and Last-Modified. A cached
+entry younger than `max_age` seconds is served without a request; an older one
+is revalidated with If-None-Match / If-Modified-Since and a 304 reuses the
+stored body, taking any new ETag / Last-Modified from the 304 and restarting
+the entry's max_age.
+
+Callers that check fresh() before get() can load() the entry once and pass it
+to both, so a miss reads the metadata and body from disk only once.
+
+Modes:
+- "revalidate" (default): the behaviour above
+- "cache-only": never touch the network, return None for uncached URLs
+- "refresh": always download, but still store the result
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "http")
+MODES = ("revalidate", "cache-only", "refresh")
+
+
+class CachedResponse:
+    """The parts of requests.Response the scrapers use, backed by the cache."""
+
+    def __init__(self, url, status_code, content, headers, from_cache=False):
+        self.url = url
+        self.status_code = status_code
+        self.content = content
+        self.headers = CaseInsensitiveDict(headers)
+        self.from_cache = from_cache
+
+    @property
+    def text(self):
+        content_type = self.headers.get("Content-Type", "")
+        encoding = "utf-8"
+        if "charset=" in content_type:
+            encoding = content_type.split("charset=")[-1].split(";")[0].strip()
+        return self.content.decode(encoding, errors="replace")
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} for url: {self.url}")
+
+
+class ResponseCache:
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, mode="revalidate", max_age=3600):
+        if mode not in MODES:
+            raise ValueError(f"Unknown cache mode {mode!r}, expected one of {MODES}")
+        self.cache_dir = cache_dir
+        self.mode = mode
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self.stats = {"fresh_hits": 0, "revalidated": 0, "downloads": 0, "offline_misses": 0}
+
+    def _paths(self, url):
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        folder = os.path.join(self.cache_dir, key[:2])
+        return os.path.join(folder, f"{key}.body"), os.path.join(folder, f"{key}.json")
+
+    def _count(self, name):
+        with self._lock:
+            self.stats[name] += 1
+
+    def load(self, url):
+        body_path, meta_path = self._paths(url)
+        try:
+            with open(meta_path) as f:
+                meta = json.load(f)
+            with open(body_path, "rb") as f:
+                body = f.read()
+        except (OSError, ValueError):
+            return None, None
+        return meta, body
+
+    def store(self, url, response, write_body=True):
+        body_path, meta_path = self._paths(url)
+        os.makedirs(os.path.dirname(body_path), exist_ok=True)
+        meta = {
+            "url": url,
+            "status_code": response.status_code,
+            "headers": {k: v for k, v in response.headers.items() if k.lower() in ("content-type", "etag", "last-modified")},
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "fetched_at": time.time(),
+        }
+        suffix = f".{os.getpid()}.{threading.get_ident()}.tmp"
+        if write_body:
+            with open(body_path + suffix, "wb") as f:
+                f.write(response.content)
+            os.replace(body_path + suffix, body_path)
+        with open(meta_path + suffix, "w") as f:
+            json.dump(meta, f)
+        os.replace(meta_path + suffix, meta_path)
+        return meta
+
+    def fresh(self, url, entry=None):
+        """The cached response if it can be served without any request, else None. entry: a load() result."""
+        if self.mode == "refresh":
+            return None
+        meta, body = entry if entry is not None else self.load(url)
+        if meta is None:
+            return None
+        if self.mode == "cache-only" or time.time() - meta["fetched_at"] < self.max_age:
+            self._count("fresh_hits")
+            return CachedResponse(url, meta["status_code"], body, meta["headers"], from_cache=True)
+        return None
+
+    def get(self, session, url, timeout=15, entry=None):
+        """Fetch url through the cache. Raises requests exceptions like session.get. entry: a load() result."""
+        if self.mode == "refresh":
+            meta, body = None, None
+        else:
+            meta, body = entry if entry is not None else self.load(url)
+
+        if meta is not None:
+            cached = CachedResponse(url, meta["status_code"], body, meta["headers"], from_cache=True)
+            if self.mode == "cache-only" or time.time() - meta["fetched_at"] < self.max_age:
+                self._count("fresh_hits")
+                return cached
+        elif self.mode == "cache-only":
+            self._count("offline_misses")
+            return None
+
+        headers = {}
+        if meta is not None:
+            if meta.get("etag"):
+                headers["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                headers["If-Modified-Since"] = meta["last_modified"]
+
+        response = session.get(url, headers=headers, timeout=timeout)
+        if response.status_code == 304 and meta is not None:
+            self._count("revalidated")
+            # A 304 may carry new validators; they replace the stored ones
+            for name in ("ETag", "Last-Modified"):
+                if response.headers.get(name):
+                    cached.headers[name] = response.headers[name]
+            self.store(url, cached, write_body=False)
+            return cached
+
+        response.raise_for_status()
+        self._count("downloads")
+        self.store(url, response)
+        return CachedResponse(url, response.status_code, response.content, dict(response.headers))
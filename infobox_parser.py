@@ -0,0 +1,82 @@
+"""
+Targeted, process-parallel parsing of Wikipedia economy infoboxes.
+
+Only the `table.infobox` subtree is built (lxml + SoupStrainer), instead of a
+full BeautifulSoup tree of the whole article. Row labels are dispatched through
+LABEL_RULES, one precompiled table in the same priority order as the notebook's
+`in label` elif chain, and the dispatch result is memoized per label because the
+same labels repeat on every country page.
+
+parse_many() spreads a batch of pages over a process pool; parsing is CPU-bound,
+so threads would not help once fetching is concurrent.
+"""
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+# (field, label keyword, keep first match only), in priority order
+LABEL_RULES = [
+    ('GDP_per_capita_rank', 'gdp per capita rank', False),
+    ('GDP_per_capita', 'gdp per capita', False),
+    ('GDP_growth_rate', 'gdp growth', False),
+    ('Inflation_rate', 'inflation', False),
+    ('Unemployment_rate', 'unemployment', False),
+    ('Exports', 'exports', True),
+    ('Imports', 'imports', True),
+    ('Government_debt', 'government debt', False),
+    ('Currency', 'currency', False),
+]
+
+_ANY_KEYWORD = re.compile('|'.join(re.escape(keyword) for _, keyword, _ in LABEL_RULES))
+_REFERENCE = re.compile(r'\[.*?\]')
+# Matched against the raw class attribute while parsing, e.g. "infobox vcard"
+_INFOBOX_ONLY = SoupStrainer('table', class_=re.compile(r'(?:^|\s)infobox(?:\s|$)'))
+
+# Below this many pages a process pool costs more than it saves
+MIN_PAGES_FOR_POOL = 16
+
+
+@lru_cache(maxsize=4096)
+def match_label(label):
+    """Candidate (field, first_only) pairs for a lowercased label, in priority order."""
+    if not _ANY_KEYWORD.search(label):
+        return ()
+    return tuple((field, first_only) for field, keyword, first_only in LABEL_RULES if keyword in label)
+
+
+def parse_infobox_html(html):
+    """Economic indicators from the first infobox of a page, as {field: text}."""
+    if not html:
+        return {}
+    soup = BeautifulSoup(html, 'lxml', parse_only=_INFOBOX_ONLY)
+    infobox = soup.find('table', class_='infobox')
+    if infobox is None:
+        return {}
+
+    info = {}
+    for row in infobox.find_all('tr'):
+        if row.th and row.td:
+            candidates = match_label(row.th.text.strip().lower())
+            if not candidates:
+                continue
+            for field, first_only in candidates:
+                # Same fall-through as the notebook: a repeated exports/imports row tries the next rule
+                if first_only and field in info:
+                    continue
+                value = row.td.get_text(separator=' ', strip=True)
+                info[field] = _REFERENCE.sub('', value).strip()
+                break
+    return info
+
+
+def parse_many(pages, workers=None, chunksize=4):
+    """Parse a batch of HTML pages, on a process pool when the batch is large enough."""
+    pages = list(pages)
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(pages) < MIN_PAGES_FOR_POOL:
+        return [parse_infobox_html(html) for html in pages]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(parse_infobox_html, pages, chunksize=chunksize))
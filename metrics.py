@@ -0,0 +1,278 @@
+"""
+Process-wide instrumentation for the dashboard.
+
+- span(name, **labels): times a block and records it in a summary keyed on
+  (name, labels): count, total, max and a window of recent samples for
+  percentiles
+- count(name, value, **labels) / gauge(name, value, **labels): counters and gauges
+- collectors: callables registered by name that return {metric: value} and are
+  read at scrape time (e.g. cache hit/miss counts kept by the caches themselves)
+- runs: a Run per script rerun, tracked per thread (Streamlit runs each session's
+  script on its own thread), that collects the spans and payload bytes of that
+  rerun; finished runs are logged as one structured record on the "metrics" logger
+
+render_prometheus() returns everything in the Prometheus text format;
+start_http_server(port) serves it on /metrics from a daemon thread.
+JsonFormatter turns log records (including the run records) into JSON lines.
+"""
+import json
+import logging
+import os
+import re
+import resource
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger(__name__)
+
+PREFIX = "eid_"
+WINDOW = 512    # recent samples kept per span for percentiles
+
+
+def _key(name, labels):
+    return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    escaped = (
+        f'{k}="' + v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") + '"'
+        for k, v in labels
+    )
+    return "{" + ",".join(escaped) + "}"
+
+
+def _metric_name(name):
+    return PREFIX + re.sub(r"[^a-zA-Z0-9_]", "_", name)
+
+
+def process_rss_bytes():
+    """Resident set size of this process (peak RSS where /proc is unavailable)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class SpanStats:
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.recent = deque(maxlen=WINDOW)
+
+    def observe(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.recent.append(seconds)
+
+    def quantile(self, q):
+        if not self.recent:
+            return 0.0
+        ordered = sorted(self.recent)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class Run:
+    """Spans and payload of one script rerun."""
+
+    def __init__(self, section):
+        self.section = section
+        self.started = time.perf_counter()
+        self.spans = []
+        self.payload_bytes = 0
+        self.seconds = None
+
+    def as_dict(self):
+        return {
+            "section": self.section,
+            "seconds": self.seconds,
+            "payload_bytes": self.payload_bytes,
+            "spans": [{"span": name, **dict(labels), "seconds": seconds} for name, labels, seconds in self.spans],
+        }
+
+
+class Metrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.spans = {}
+        self.counters = {}
+        self.gauges = {}
+        self.collectors = {}
+        self._local = threading.local()
+
+    @contextmanager
+    def span(self, name, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def observe(self, name, seconds, **labels):
+        key = _key(name, labels)
+        with self._lock:
+            self.spans.setdefault(key, SpanStats()).observe(seconds)
+        run = self.current_run()
+        if run is not None:
+            run.spans.append((key[0], key[1], seconds))
+
+    def count(self, name, value=1, **labels):
+        key = _key(name, labels)
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def gauge(self, name, value, **labels):
+        with self._lock:
+            self.gauges[_key(name, labels)] = value
+
+    def register_collector(self, name, collect):
+        """collect() -> {metric name: value}, exported as gauges labelled source=name."""
+        with self._lock:
+            self.collectors[name] = collect
+
+    def start_run(self, section):
+        run = Run(section)
+        self._local.run = run
+        return run
+
+    def current_run(self):
+        return getattr(self._local, "run", None)
+
+    def add_payload(self, nbytes, **labels):
+        self.count("payload_bytes_total", nbytes, **labels)
+        run = self.current_run()
+        if run is not None:
+            run.payload_bytes += nbytes
+
+    def finish_run(self):
+        run = self.current_run()
+        if run is None:
+            return None
+        self._local.run = None
+        run.seconds = time.perf_counter() - run.started
+        self.observe("rerun", run.seconds, section=run.section)
+        self.count("reruns_total", section=run.section)
+        self.gauge("last_rerun_payload_bytes", run.payload_bytes, section=run.section)
+        logger.info("rerun", extra={"run": run.as_dict()})
+        return run
+
+    def span_table(self):
+        """One dict per (span, labels) with count, mean, p50, p95 and max seconds."""
+        with self._lock:
+            items = [(key, stats.count, stats.total, stats.max, stats.quantile(0.5), stats.quantile(0.95))
+                     for key, stats in self.spans.items()]
+        return [
+            {"span": name, **dict(labels), "count": count, "mean": total / count,
+             "p50": p50, "p95": p95, "max": longest}
+            for (name, labels), count, total, longest, p50, p95 in sorted(items)
+        ]
+
+    def collected(self):
+        with self._lock:
+            collectors = list(self.collectors.items())
+        values = {}
+        for source, collect in collectors:
+            try:
+                values[source] = collect()
+            except Exception:
+                logger.exception("Metrics collector %s failed", source)
+        return values
+
+    def render_prometheus(self):
+        lines = []
+        with self._lock:
+            spans = list(self.spans.items())
+            counters = list(self.counters.items())
+            gauges = list(self.gauges.items())
+
+        lines.append(f"# TYPE {PREFIX}span_seconds summary")
+        for (name, labels), stats in sorted(spans):
+            labels = (("span", name),) + labels
+            for q in (0.5, 0.95):
+                lines.append(f"{PREFIX}span_seconds{_format_labels(labels + (('quantile', str(q)),))} {stats.quantile(q):.6f}")
+            lines.append(f"{PREFIX}span_seconds_sum{_format_labels(labels)} {stats.total:.6f}")
+            lines.append(f"{PREFIX}span_seconds_count{_format_labels(labels)} {stats.count}")
+
+        for kind, samples in (("counter", counters), ("gauge", gauges)):
+            for name in sorted({name for (name, _), _ in samples}):
+                lines.append(f"# TYPE {_metric_name(name)} {kind}")
+                for (sample_name, labels), value in sorted(samples):
+                    if sample_name == name:
+                        lines.append(f"{_metric_name(name)}{_format_labels(labels)} {value}")
+
+        lines.append(f"# TYPE {PREFIX}process_resident_memory_bytes gauge")
+        lines.append(f"{PREFIX}process_resident_memory_bytes {process_rss_bytes()}")
+        collected = {}
+        for source, values in sorted(self.collected().items()):
+            for name, value in values.items():
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    collected.setdefault(name, []).append((source, value))
+        for name, samples in sorted(collected.items()):
+            lines.append(f"# TYPE {_metric_name(name)} gauge")
+            for source, value in samples:
+                lines.append(f"{_metric_name(name)}{_format_labels((('source', source),))} {value}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Metrics()
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    registry = REGISTRY
+
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = self.registry.render_prometheus().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.debug("metrics endpoint: " + format, *args)
+
+
+def start_http_server(port, host="127.0.0.1", registry=REGISTRY):
+    """Serve registry on http://host:port/metrics from a daemon thread; returns the server."""
+    handler = type("MetricsHandler", (_MetricsHandler,), {"registry": registry})
+    server = ThreadingHTTPServer((host, port), handler)
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    logger.info("Serving metrics on http://%s:%d/metrics", *server.server_address[:2])
+    return server
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record: time, level, logger, message and any `run` payload."""
+
+    def format(self, record):
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if hasattr(record, "run"):
+            entry["run"] = record.run
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+def configure_json_logging(level=logging.INFO):
+    """Send this module's run records (and anything else on the root logger) to stderr as JSON lines."""
+    handler = logging.StreamHandler()
+    handler.setFormatter(JsonFormatter())
+    root = logging.getLogger()
+    root.addHandler(handler)
+    root.setLevel(level)
+    return handler
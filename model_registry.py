@@ -0,0 +1,102 @@
+"""
+Content-addressed store for trained models.
+
+Each artifact is saved as <registry>/objects/<sha256>.joblib, so publishing the
+same model twice stores it once. index.json holds one metadata record per
+publish: name, algorithm, hyperparameters, metrics, timings, the hash of the
+training data and library versions. Entries marked validated and promoted are
+the ones the dashboard may serve; latest(name) returns the newest of them.
+"""
+import json
+import logging
+import os
+import tempfile
+import threading
+from datetime import datetime, timezone
+
+import joblib
+
+from data_store import file_hash
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_REGISTRY_DIR = os.path.join(BASE_DIR, "models", "registry")
+INDEX_FILE = "index.json"
+
+
+class ModelRegistry:
+    def __init__(self, root=DEFAULT_REGISTRY_DIR):
+        self.root = root
+        self._lock = threading.Lock()
+        self._entries = []
+        self._entries_mtime = None
+
+    def object_path(self, sha256):
+        return os.path.join(self.root, "objects", f"{sha256}.joblib")
+
+    def entries(self):
+        """Every published entry, oldest first; the index is re-read only when the file changed."""
+        path = os.path.join(self.root, INDEX_FILE)
+        try:
+            mtime = os.stat(path).st_mtime_ns
+            if mtime != self._entries_mtime:
+                with open(path) as f:
+                    self._entries, self._entries_mtime = json.load(f), mtime
+        except (OSError, ValueError):
+            return []
+        return list(self._entries)
+
+    def _write_index(self, entries):
+        os.makedirs(self.root, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(entries, f, indent=2)
+        os.replace(tmp_path, os.path.join(self.root, INDEX_FILE))
+
+    def publish(self, name, model, metadata, validated=False, promoted=False):
+        """Store model under its content hash and append a metadata entry; returns the entry."""
+        objects_dir = os.path.join(self.root, "objects")
+        os.makedirs(objects_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=objects_dir, suffix=".tmp")
+        os.close(fd)
+        joblib.dump(model, tmp_path)
+        sha256 = file_hash(tmp_path)
+        path = self.object_path(sha256)
+        if os.path.exists(path):
+            os.remove(tmp_path)
+        else:
+            os.replace(tmp_path, path)
+
+        entry = {
+            "name": name,
+            "sha256": sha256,
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "validated": bool(validated),
+            "promoted": bool(promoted),
+            **metadata,
+        }
+        with self._lock:
+            entries = self.entries()
+            entries.append(entry)
+            self._write_index(entries)
+        logger.info("Published %s %s (%s)%s", name, metadata.get("algorithm", ""), sha256[:12],
+                    " as the served model" if promoted else "")
+        return entry
+
+    def find(self, name=None, **fields):
+        """Entries matching name and the given metadata fields, newest first."""
+        # The index is append-only, so later entries are newer
+        return [
+            entry for entry in reversed(self.entries())
+            if (name is None or entry["name"] == name)
+            and all(entry.get(key) == value for key, value in fields.items())
+        ]
+
+    def latest(self, name):
+        """Newest validated, promoted entry for name, or None."""
+        matches = self.find(name, validated=True, promoted=True)
+        return matches[0] if matches else None
+
+    def load(self, entry):
+        return joblib.load(self.object_path(entry["sha256"]))
@@ -0,0 +1,265 @@
+"""
+Serving layer for the shipped joblib models.
+
+Artifacts are loaded once per process and deduplicated by content hash, so
+gdp_growth_rf_model.joblib and final_gdp_growth_model.pkl (the same forest)
+become one estimator in memory. They are not memory-mapped: the shipped files
+are plain pickles, and sklearn copies tree arrays into its own buffers on load.
+
+The notebook never saved its scalers, so each ServedModel refits the
+StandardScaler it was trained with on the dataset:
+- the Random Forest on the train split of train_test_split(X, y, test_size=0.2, random_state=42)
+- KMeans on every row
+
+When a model registry is given and holds a validated, promoted GDP model
+(python training.py), that model is served instead of the shipped forest. Its
+scaler is part of the artifact, so no scaler is refit for it. refresh()
+re-resolves the promoted model when the registry changed, so a long-running
+dashboard picks up a new training run without a restart.
+
+Inputs are checked against the training feature order before anything is
+predicted. predict() takes a whole frame, answers the rows it has already seen
+from an LRU cache keyed on (model hash, feature row), and sends the remaining
+rows to the estimator in one batch.
+"""
+import logging
+import os
+import threading
+import warnings
+from collections import OrderedDict
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from data_store import file_hash
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Column order the notebook trained on (df_model and features_for_cluster)
+GDP_FEATURES = [
+    'Inflation_rate_cleaned', 'Unemployment_rate_cleaned', 'Gov_Debt_Percent_GDP_Cleaned',
+    'Gov_Debt_Absolute_Billion_Cleaned', 'Trade_Balance', 'Trade_Openness', 'GDP_Capita_Ratio',
+    'Debt_to_Income', 'gdp_total_usd_billion_cleaned_log', 'Exports_Cleaned_Billion_log',
+    'Imports_Cleaned_Billion_log', 'Gov_Debt_Absolute_Billion_Cleaned_log',
+]
+GDP_TARGET = 'GDP_per_capita_ppp_cleaned'
+CLUSTER_FEATURES = [
+    'gdp_total_usd_billion_cleaned', 'GDP_total_Year', 'GDP_per_capita_nominal_cleaned',
+    'GDP_per_capita_ppp_cleaned', 'GDP_growth_rate_cleaned', 'Inflation_rate_cleaned',
+    'Unemployment_rate_cleaned', 'Exports_Cleaned_Billion', 'Imports_Cleaned_Billion',
+    'Gov_Debt_Percent_GDP_Cleaned', 'Gov_Debt_Absolute_Billion_Cleaned', 'Trade_Balance',
+    'Trade_Openness', 'GDP_Capita_Ratio', 'Debt_to_Income', 'Import_Export_Ratio',
+    'Is_Eurozone', 'Is_USD_Pegged',
+]
+
+# Every shipped artifact; files with identical content share one loaded estimator
+MODEL_FILES = {
+    "gdp_ppp": ["gdp_growth_rf_model.joblib", "final_gdp_growth_model.pkl"],
+    "cluster": ["economic_clustering_model.joblib"],
+}
+
+_artifacts = {}
+_artifacts_lock = threading.Lock()
+
+
+def load_artifact(path):
+    """(estimator, sha256) for a joblib file, loaded at most once per process per content hash."""
+    digest = file_hash(path)
+    with _artifacts_lock:
+        if digest not in _artifacts:
+            with warnings.catch_warnings(record=True) as caught:
+                warnings.simplefilter("always")
+                estimator = joblib.load(path)
+            # e.g. one InconsistentVersionWarning per tree of the forest
+            for message in dict.fromkeys(str(warning.message) for warning in caught):
+                logger.warning("%s: %s", os.path.basename(path), message)
+            _artifacts[digest] = estimator
+            logger.info("Loaded %s (%s)", os.path.basename(path), digest[:12])
+        else:
+            logger.info("Reusing loaded artifact for %s (%s)", os.path.basename(path), digest[:12])
+        return _artifacts[digest], digest
+
+
+def feature_matrix(frame, features):
+    """float64 matrix of frame's columns in training order; raises ValueError on missing columns."""
+    missing = [col for col in features if col not in frame.columns]
+    if missing:
+        raise ValueError(f"Missing model features: {missing}")
+    return np.column_stack([frame[col].to_numpy(dtype="float64", na_value=np.nan) for col in features])
+
+
+class PredictionCache:
+    """LRU of single-row predictions keyed on (model hash, raw feature bytes)."""
+
+    def __init__(self, max_entries=100_000):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, keys):
+        with self._lock:
+            found = {}
+            for i, key in enumerate(keys):
+                value = self._entries.get(key)
+                if value is not None:
+                    self._entries.move_to_end(key)
+                    found[i] = value
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+            return found
+
+    def store(self, keys, values):
+        with self._lock:
+            for key, value in zip(keys, values):
+                self._entries[key] = value
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+class ServedModel:
+    def __init__(self, name, estimator, sha256, features, scaler, cache):
+        n_features = getattr(estimator, "n_features_in_", len(features))
+        if n_features != len(features):
+            raise ValueError(f"{name}: estimator expects {n_features} features, training columns list {len(features)}")
+        self.name = name
+        self.estimator = estimator
+        self.sha256 = sha256
+        self.features = list(features)
+        self.scaler = scaler
+        self.cache = cache
+
+    def matrix(self, frame):
+        if isinstance(frame, pd.DataFrame):
+            return feature_matrix(frame, self.features)
+        X = np.asarray(frame, dtype="float64")
+        if X.ndim != 2 or X.shape[1] != len(self.features):
+            raise ValueError(f"{self.name}: expected an (n, {len(self.features)}) matrix in the order {self.features}")
+        return X
+
+    def predict(self, frame):
+        X = np.ascontiguousarray(self.matrix(frame))
+        if not len(X):
+            return np.empty(0)
+        rows = X.view(np.dtype((np.void, X.dtype.itemsize * X.shape[1]))).ravel()
+        keys = [(self.sha256, row.tobytes()) for row in rows]
+
+        found = self.cache.lookup(keys)
+        result = np.empty(len(X), dtype="float64")
+        for i, value in found.items():
+            result[i] = value
+        todo = np.array([i for i in range(len(X)) if i not in found], dtype=np.intp)
+        if len(todo):
+            predictions = self.estimator.predict(self.scaler.transform(X[todo]))
+            result[todo] = predictions
+            self.cache.store([keys[i] for i in todo], predictions.tolist())
+        return result
+
+
+class ModelServer:
+    """The shipped models, ready to score frames shaped like the dashboard dataset."""
+
+    def __init__(self, frame, model_dir=BASE_DIR, cache=None, registry=None):
+        from sklearn.model_selection import train_test_split
+        from sklearn.preprocessing import StandardScaler
+
+        self.cache = cache if cache is not None else PredictionCache()
+        self.registry = registry
+        self._lock = threading.Lock()
+        self.artifacts = {}
+        self.paths = {}
+        self.sources = {}
+        loaded = {}
+        for name, files in MODEL_FILES.items():
+            for file_name in files:
+                estimator, digest = load_artifact(os.path.join(model_dir, file_name))
+                self.artifacts[file_name] = digest
+                loaded.setdefault(name, (estimator, digest))
+                self.paths.setdefault(name, os.path.join(model_dir, file_name))
+                self.sources.setdefault(name, file_name)
+
+        X = feature_matrix(frame, GDP_FEATURES)
+        y = frame[GDP_TARGET].to_numpy(dtype="float64", na_value=np.nan)
+        X_train, _, _, _ = train_test_split(X, y, test_size=0.2, random_state=42)
+        shipped = ServedModel("gdp_ppp", *loaded["gdp_ppp"], GDP_FEATURES, StandardScaler().fit(X_train), self.cache)
+        # Kept to fall back on when the registry no longer promotes a model
+        self._shipped = (shipped, self.paths["gdp_ppp"], self.sources["gdp_ppp"])
+        self._registry_sha = None
+
+        self.models = {
+            "gdp_ppp": shipped,
+            "cluster": ServedModel("cluster", *loaded["cluster"], CLUSTER_FEATURES,
+                                   StandardScaler().fit(feature_matrix(frame, CLUSTER_FEATURES)), self.cache),
+        }
+        self.refresh()
+
+    def _promoted(self):
+        entry = self.registry.latest("gdp_ppp") if self.registry is not None else None
+        return entry if entry is not None and entry["features"] == GDP_FEATURES else None
+
+    def refresh(self):
+        """Serve the registry's currently promoted GDP model (or the shipped one); True if it changed."""
+        from sklearn.preprocessing import FunctionTransformer
+
+        entry = self._promoted()
+        sha256 = entry["sha256"] if entry is not None else None
+        with self._lock:
+            if sha256 == self._registry_sha:
+                return False
+            if entry is None:
+                model, path, source = self._shipped
+            else:
+                path = self.registry.object_path(sha256)
+                model = ServedModel("gdp_ppp", *load_artifact(path), GDP_FEATURES,
+                                    FunctionTransformer().fit(np.zeros((1, len(GDP_FEATURES)))), self.cache)
+                source = f"registry {entry['algorithm']} {sha256[:12]} ({entry['created_at']})"
+            self.models = {**self.models, "gdp_ppp": model}
+            self.paths = {**self.paths, "gdp_ppp": path}
+            self.sources = {**self.sources, "gdp_ppp": source}
+            self._registry_sha = sha256
+        logger.info("Serving GDP model: %s", source)
+        return True
+
+    def key(self):
+        """Hashes of the served models, for caches of anything derived from their predictions."""
+        return tuple(model.sha256 for model in self.models.values())
+
+    def predict(self, name, frame):
+        return self.models[name].predict(frame)
+
+    def insights(self, frame):
+        """Actual vs predicted GDP per capita (PPP) and stored vs predicted cluster per country."""
+        predicted_ppp = self.predict("gdp_ppp", frame)
+        predicted_cluster = self.predict("cluster", frame).astype(int)
+        actual_ppp = frame[GDP_TARGET].to_numpy(dtype="float64", na_value=np.nan)
+        return pd.DataFrame({
+            "Country": frame["Country"].to_numpy(dtype=object),
+            "Region": frame["Region"].to_numpy(dtype=object),
+            "Actual PPP": actual_ppp,
+            "Predicted PPP": predicted_ppp,
+            "Residual": actual_ppp - predicted_ppp,
+            "Cluster": frame["cluster"].to_numpy(dtype="int64"),
+            "Predicted Cluster": predicted_cluster,
+        })
+
+    def stats(self):
+        return {
+            "artifacts": len(self.artifacts),
+            "distinct_artifacts": len(set(self.artifacts.values())),
+            **self.cache.stats(),
+        }
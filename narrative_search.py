@@ -0,0 +1,170 @@
+"""
+Full-text search over the country narratives (summary and scraped_paragraph).
+
+The index is built once per dataset version, when the snapshot is built, and
+stored in the version directory next to the data:
+
+- search_index.joblib: the fitted TF-IDF vectorizer and the document-term
+  matrix in CSC form, so each term's column is its posting list
+- search_text.arrow: the narrative text, uncompressed and memory-mapped, so
+  snippets are cut from the few rows returned without reading the rest
+
+A query is analyzed with the same vectorizer and scored as the cosine
+similarity over the columns of its terms only, restricted by an optional row
+mask (the Region / economic_class filters), so a query touches its posting
+lists instead of scanning the text. Row positions match the indicator frame of
+the same version.
+"""
+import html
+import logging
+import os
+import re
+
+import joblib
+import numpy as np
+import pyarrow as pa
+
+logger = logging.getLogger(__name__)
+
+INDEX_FORMAT = 1
+INDEX_FILE = "search_index.joblib"
+TEXT_FILE = "search_text.arrow"
+SEARCH_COLUMNS = ["summary", "scraped_paragraph"]
+SNIPPET_CHARS = 240
+
+
+class SearchHit:
+    def __init__(self, position, country, score, snippet):
+        self.position = position
+        self.country = country
+        self.score = score
+        self.snippet = snippet  # HTML with the matched terms in <mark>
+
+
+def _documents(narratives):
+    text = narratives[SEARCH_COLUMNS[0]].fillna("").astype(str)
+    for col in SEARCH_COLUMNS[1:]:
+        text = text + "\n" + narratives[col].fillna("").astype(str)
+    return text.tolist()
+
+
+def _write_atomic(path, write):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    write(tmp_path)
+    os.replace(tmp_path, path)
+
+
+def _snippet(text, pattern, width=SNIPPET_CHARS):
+    """The window of text around the first match, HTML-escaped, with every match marked."""
+    match = pattern.search(text)
+    if match is None:
+        return None
+    start = max(0, match.start() - width // 3)
+    if start:
+        # Start on a word boundary
+        space = text.find(" ", start)
+        start = space + 1 if 0 <= space < match.start() else start
+    window = text[start:start + width]
+    if start + width < len(text) and " " in window[match.end() - start:]:
+        # End on a word boundary after the match
+        window = window[:window.rfind(" ")]
+    marked = []
+    last = 0
+    for m in pattern.finditer(window):
+        marked.append(html.escape(window[last:m.start()]))
+        marked.append(f"<mark>{html.escape(m.group(0))}</mark>")
+        last = m.end()
+    marked.append(html.escape(window[last:]))
+    return ("…" if start else "") + "".join(marked) + ("…" if start + width < len(text) else "")
+
+
+class NarrativeSearch:
+    def __init__(self, vectorizer, matrix, text):
+        self.vectorizer = vectorizer
+        self.matrix = matrix        # CSC, documents x terms, rows L2-normalized
+        self.text = text            # pyarrow Table: Country + SEARCH_COLUMNS
+        self._analyzer = vectorizer.build_analyzer()
+
+    def __len__(self):
+        return self.matrix.shape[0]
+
+    @classmethod
+    def build(cls, narratives):
+        from sklearn.feature_extraction.text import TfidfVectorizer
+
+        vectorizer = TfidfVectorizer(stop_words="english", sublinear_tf=True, dtype=np.float32)
+        matrix = vectorizer.fit_transform(_documents(narratives)).tocsc()
+        text = pa.Table.from_pandas(narratives[["Country"] + SEARCH_COLUMNS], preserve_index=False)
+        return cls(vectorizer, matrix, text)
+
+    def save(self, directory):
+        def write_text(path):
+            with pa.OSFile(path, "wb") as sink, pa.ipc.new_file(sink, self.text.schema) as writer:
+                writer.write_table(self.text)
+
+        _write_atomic(os.path.join(directory, TEXT_FILE), write_text)
+        _write_atomic(
+            os.path.join(directory, INDEX_FILE),
+            lambda path: joblib.dump({"format": INDEX_FORMAT, "vectorizer": self.vectorizer, "matrix": self.matrix}, path),
+        )
+
+    @classmethod
+    def load(cls, directory):
+        """The persisted index of a version directory, or None if missing or from another format."""
+        index_path = os.path.join(directory, INDEX_FILE)
+        text_path = os.path.join(directory, TEXT_FILE)
+        if not (os.path.exists(index_path) and os.path.exists(text_path)):
+            return None
+        stored = joblib.load(index_path)
+        if stored.get("format") != INDEX_FORMAT:
+            return None
+        text = pa.ipc.open_file(pa.memory_map(text_path, "r")).read_all()
+        return cls(stored["vectorizer"], stored["matrix"], text)
+
+    def terms(self, query):
+        """Vocabulary ids and weights of the query's terms (unknown terms dropped)."""
+        vector = self.vectorizer.transform([query])
+        return vector.indices, vector.data
+
+    def search(self, query, mask=None, limit=10):
+        """SearchHits for the best-matching rows (where mask is True), best first."""
+        term_ids, weights = self.terms(query or "")
+        if not len(term_ids):
+            return []
+        scores = np.asarray(self.matrix[:, term_ids] @ weights).ravel()
+        if mask is not None:
+            scores = np.where(mask, scores, 0.0)
+        candidates = np.flatnonzero(scores > 0)
+        if len(candidates) > limit:
+            candidates = candidates[np.argpartition(-scores[candidates], limit - 1)[:limit]]
+        ranked = candidates[np.argsort(-scores[candidates], kind="stable")]
+
+        words = sorted({token for token in self._analyzer(query) if " " not in token}, key=len, reverse=True)
+        pattern = re.compile(r"\b(" + "|".join(map(re.escape, words)) + r")\b", re.IGNORECASE)
+        rows = self.text.take(pa.array(ranked, type=pa.int64())).to_pydict()
+        hits = []
+        for i, position in enumerate(ranked):
+            snippet = None
+            for col in SEARCH_COLUMNS:
+                snippet = _snippet(rows[col][i] or "", pattern)
+                if snippet:
+                    break
+            hits.append(SearchHit(int(position), rows["Country"][i], float(scores[position]), snippet or ""))
+        return hits
+
+
+def build_index(narratives, directory):
+    """Build the index for a version directory and persist it there."""
+    index = NarrativeSearch.build(narratives)
+    index.save(directory)
+    logger.info("Built narrative search index of %d documents, %d terms in %s",
+                len(index), index.matrix.shape[1], directory)
+    return index
+
+
+def load_index(directory, load_narratives):
+    """The persisted index of a version directory, building it first for snapshots made without one."""
+    index = NarrativeSearch.load(directory)
+    if index is None:
+        index = build_index(load_narratives(directory), directory)
+    return index
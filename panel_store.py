@@ -0,0 +1,379 @@
+"""
+Year-partitioned history of the dashboard dataset.
+
+The scraper produces one year of indicators per refresh. Every version the
+DatasetStore loads is appended here, split on GDP_total_Year, as
+snapshot/panel/year=<year>/part-<source sha>.arrow; the newest vintage of a year
+is the one served, and the previous KEEP_VINTAGES - 1 are kept on disk.
+
+panel/manifest.json lists the partitions and, per vintage, a small summary
+(global totals and means) written at append time, so the year list, global
+trends and their deltas never open a partition. Year-over-year deltas per
+country are precomputed at append time into year=<year>/deltas-*.arrow
+(against the previous year present in the panel) and recomputed for the
+following year when a year is backfilled.
+
+Partitions are uncompressed Arrow IPC files read through a memory map: a year
+view loads only that year, and a country lookup touches only the Country column
+and the requested row: each loaded partition gets a compact index (its row
+positions in Country order, sorted by Arrow) searched by bisection.
+
+Appends from several processes (the dashboard's watcher, the backfill CLI) are
+serialized by an exclusive lock on panel/.lock held across the manifest's
+read-modify-write.
+
+Backfill a historical CSV (e.g. one scraped before GDP_total_Year was set) with:
+    python panel_store.py old_Final_output.csv --year 2023
+"""
+import argparse
+import bisect
+import contextlib
+import fcntl
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+from collections import OrderedDict
+
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from aggregates import AggregateCube
+from data_store import SNAPSHOT_DIR, read_arrow, write_table
+
+logger = logging.getLogger(__name__)
+
+PANEL_FORMAT = 1
+MANIFEST_FILE = "manifest.json"
+LOCK_FILE = ".lock"
+DEFAULT_PANEL_DIR = os.path.join(SNAPSHOT_DIR, "panel")
+KEEP_VINTAGES = 2
+YEAR_COLUMN = "GDP_total_Year"
+
+DELTA_COLUMNS = [
+    'gdp_total_usd_billion_cleaned', 'GDP_per_capita_nominal_cleaned', 'GDP_per_capita_ppp_cleaned',
+    'GDP_growth_rate_cleaned', 'Inflation_rate_cleaned', 'Unemployment_rate_cleaned',
+    'Gov_Debt_Percent_GDP_Cleaned', 'Exports_Cleaned_Billion', 'Imports_Cleaned_Billion', 'Trade_Openness',
+]
+# (column, stat) pairs kept per year in the manifest
+SUMMARY_STATS = [
+    ('gdp_total_usd_billion_cleaned', 'sum'),
+    ('GDP_growth_rate_cleaned', 'mean'),
+    ('Exports_Cleaned_Billion', 'sum'),
+    ('Imports_Cleaned_Billion', 'sum'),
+    ('Inflation_rate_cleaned', 'mean'),
+]
+
+
+class CountryIndex:
+    """Row positions of a Country column in sorted order: 8 bytes per row, no Python strings."""
+
+    def __init__(self, column):
+        self.column = column.combine_chunks()
+        # Stable, so equal names keep row order; nulls go last and are never searched
+        self.order = pc.sort_indices(self.column).to_numpy()
+        self.size = len(self.column) - self.column.null_count
+
+    def _name(self, i):
+        return self.column[int(self.order[i])].as_py()
+
+    def position(self, country):
+        """First row of country, or None."""
+        # UTF-8 byte order, which Arrow sorts by, is code point order, which str compares by
+        i = bisect.bisect_left(range(self.size), country, key=self._name)
+        return int(self.order[i]) if i < self.size and self._name(i) == country else None
+
+
+def summarize(frame):
+    summary = {f"{col}:{stat}": float(getattr(frame[col], stat)()) for col, stat in SUMMARY_STATS if col in frame}
+    summary["rows"] = len(frame)
+    return summary
+
+
+class YearView:
+    """One year of the panel as a frame with its aggregate cube."""
+
+    def __init__(self, year, version, frame):
+        self.year = year
+        self.version = version
+        self.frame = frame
+        self.cube = AggregateCube(frame)
+
+
+class PanelStore:
+    def __init__(self, root=DEFAULT_PANEL_DIR, max_views=2):
+        self.root = root
+        self.max_views = max_views
+        self._manifest = None
+        self._manifest_mtime = None
+        self._tables = {}
+        self._views = OrderedDict()
+        self._lock = threading.Lock()
+
+    # --- manifest ---------------------------------------------------------------------
+
+    def manifest(self):
+        """The panel manifest, re-read only when the file changed (e.g. another process appended)."""
+        path = os.path.join(self.root, MANIFEST_FILE)
+        try:
+            mtime = os.stat(path).st_mtime
+        except OSError:
+            return {"format": PANEL_FORMAT, "years": {}}
+        with self._lock:
+            if mtime != self._manifest_mtime:
+                with open(path) as f:
+                    manifest = json.load(f)
+                if manifest.get("format") != PANEL_FORMAT:
+                    manifest = {"format": PANEL_FORMAT, "years": {}}
+                self._manifest, self._manifest_mtime = manifest, mtime
+            return self._manifest
+
+    def _write_manifest(self, manifest):
+        path = os.path.join(self.root, MANIFEST_FILE)
+        with open(f"{path}.{os.getpid()}.tmp", "w") as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
+        os.replace(f"{path}.{os.getpid()}.tmp", path)
+
+    def years(self):
+        return sorted(int(year) for year in self.manifest()["years"])
+
+    def _entry(self, year):
+        return self.manifest()["years"].get(str(year))
+
+    def latest(self, year):
+        """Manifest record of the vintage served for year, or None."""
+        entry = self._entry(year)
+        return entry["vintages"][-1] if entry else None
+
+    def previous_year(self, year):
+        earlier = [y for y in self.years() if y < year]
+        return earlier[-1] if earlier else None
+
+    def version(self, year):
+        """Cache key of the data served for year."""
+        vintage = self.latest(year)
+        return f"{vintage['source_sha256']}-{year}" if vintage else None
+
+    def key(self):
+        """Cache key covering every year served, for views that span the whole panel."""
+        return ",".join(self.version(year) for year in self.years())
+
+    def summary(self, year):
+        vintage = self.latest(year)
+        return vintage["summary"] if vintage else None
+
+    def summary_delta(self, year, key):
+        """Change of a summary value against the previous year in the panel, or None."""
+        previous = self.previous_year(year)
+        if previous is None or self.summary(year) is None:
+            return None
+        current, before = self.summary(year).get(key), self.summary(previous).get(key)
+        if current is None or before is None:
+            return None
+        return current - before
+
+    def trends(self):
+        """{year: summary} for every year, straight from the manifest."""
+        return {year: self.summary(year) for year in self.years()}
+
+    # --- reads ------------------------------------------------------------------------
+
+    def _table(self, relative_path):
+        """(table, CountryIndex) of a file; memory-mapped, zero-copy and kept per file."""
+        path = os.path.join(self.root, relative_path)
+        with self._lock:
+            if relative_path not in self._tables:
+                table = pa.ipc.open_file(pa.memory_map(path, "r")).read_all()
+                self._tables[relative_path] = (table, CountryIndex(table.column("Country")))
+            return self._tables[relative_path]
+
+    def view(self, year):
+        """YearView of one year, loading only that partition; the last max_views are kept."""
+        version = self.version(year)
+        if version is None:
+            return None
+        with self._lock:
+            if version in self._views:
+                self._views.move_to_end(version)
+                return self._views[version]
+        view = YearView(year, version, read_arrow(os.path.join(self.root, self.latest(year)["file"])))
+        with self._lock:
+            self._views[version] = view
+            while len(self._views) > self.max_views:
+                self._views.popitem(last=False)
+        return view
+
+    def _lookup(self, relative_path, country, columns):
+        table, index = self._table(relative_path)
+        position = index.position(country)
+        if position is None:
+            return None
+        row = table.slice(position, 1)
+        if columns is not None:
+            row = row.select([col for col in columns if col in table.column_names])
+        return {name: values[0] for name, values in row.to_pydict().items()}
+
+    def row(self, year, country, columns=DELTA_COLUMNS):
+        """{column: value} (all columns for None) of one country in one year, or None if it has no row that year."""
+        vintage = self.latest(year)
+        return self._lookup(vintage["file"], country, columns) if vintage else None
+
+    def deltas(self, year, country):
+        """({column: change against the previous year}, previous year), or (None, None)."""
+        entry = self._entry(year)
+        if not entry or not entry.get("deltas"):
+            return None, None
+        changes = self._lookup(entry["deltas"]["file"], country, DELTA_COLUMNS)
+        return changes, entry["deltas"]["previous_year"]
+
+    def history(self, country, columns=DELTA_COLUMNS):
+        """{year: {column: value}} of one country across all years it appears in."""
+        rows = {}
+        for year in self.years():
+            row = self.row(year, country, columns)
+            if row is not None:
+                rows[year] = row
+        return rows
+
+    # --- appends ----------------------------------------------------------------------
+
+    def append(self, frame, source_sha256):
+        """Store each year of frame as a new vintage (once per source) and refresh the affected deltas."""
+        if YEAR_COLUMN not in frame or not len(frame):
+            return []
+        with self._file_lock():
+            appended = self._append(frame, source_sha256)
+        if appended:
+            logger.info("Appended %s as panel year(s) %s", source_sha256, ", ".join(map(str, appended)))
+        return appended
+
+    @contextlib.contextmanager
+    def _file_lock(self):
+        """Exclusive lock on the panel directory, across processes."""
+        os.makedirs(self.root, exist_ok=True)
+        with open(os.path.join(self.root, LOCK_FILE), "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _append(self, frame, source_sha256):
+        # Caller holds the file lock, so the manifest read here is still current when written back
+        appended = []
+        manifest = self._read_manifest_file()
+        for year in sorted(int(y) for y in frame[YEAR_COLUMN].dropna().unique()):
+            entry = manifest["years"].setdefault(str(year), {"vintages": [], "deltas": None})
+            if any(v["source_sha256"] == source_sha256 for v in entry["vintages"]):
+                continue
+            part = frame[frame[YEAR_COLUMN] == year].reset_index(drop=True)
+            relative_path = os.path.join(f"year={year}", f"part-{source_sha256}.arrow")
+            os.makedirs(os.path.join(self.root, f"year={year}"), exist_ok=True)
+            write_table(part, os.path.join(self.root, relative_path))
+            entry["vintages"].append({
+                "source_sha256": source_sha256,
+                "file": relative_path,
+                "rows": len(part),
+                "appended_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "summary": summarize(part),
+            })
+            entry["vintages"] = entry["vintages"][-KEEP_VINTAGES:]
+            appended.append(year)
+        if not appended:
+            return []
+
+        years = sorted(int(y) for y in manifest["years"])
+        # Appending a year changes its own deltas and those of the year after it
+        affected = set(appended)
+        for year in appended:
+            later = [y for y in years if y > year]
+            if later:
+                affected.add(later[0])
+        for year in sorted(affected):
+            earlier = [y for y in years if y < year]
+            manifest["years"][str(year)]["deltas"] = (
+                self._write_deltas(manifest, year, earlier[-1]) if earlier else None
+            )
+
+        self._write_manifest(manifest)
+        self._prune(manifest)
+        with self._lock:
+            self._manifest_mtime = None
+            self._views.clear()
+        return appended
+
+    def _read_manifest_file(self):
+        path = os.path.join(self.root, MANIFEST_FILE)
+        try:
+            with open(path) as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return {"format": PANEL_FORMAT, "years": {}}
+        return manifest if manifest.get("format") == PANEL_FORMAT else {"format": PANEL_FORMAT, "years": {}}
+
+    def _write_deltas(self, manifest, year, previous_year):
+        current = manifest["years"][str(year)]["vintages"][-1]
+        previous = manifest["years"][str(previous_year)]["vintages"][-1]
+        columns = ["Country"] + DELTA_COLUMNS
+        now = read_arrow(os.path.join(self.root, current["file"]))
+        before = read_arrow(os.path.join(self.root, previous["file"]))
+        now = now[[col for col in columns if col in now.columns]]
+        before = before[[col for col in columns if col in before.columns]].drop_duplicates("Country")
+        merged = now.merge(before, on="Country", how="left", suffixes=("", "_previous"))
+        deltas = merged[["Country"]].copy()
+        for col in DELTA_COLUMNS:
+            if col in now.columns and col in before.columns:
+                deltas[col] = merged[col].astype("float64") - merged[col + "_previous"].astype("float64")
+        relative_path = os.path.join(
+            f"year={year}", f"deltas-{current['source_sha256']}-{previous['source_sha256']}.arrow"
+        )
+        write_table(deltas, os.path.join(self.root, relative_path))
+        return {"file": relative_path, "previous_year": previous_year}
+
+    def _prune(self, manifest):
+        """Remove partition and delta files no longer referenced by the manifest."""
+        for year, entry in manifest["years"].items():
+            keep = {v["file"] for v in entry["vintages"]}
+            if entry.get("deltas"):
+                keep.add(entry["deltas"]["file"])
+            directory = os.path.join(self.root, f"year={year}")
+            for name in os.listdir(directory):
+                relative_path = os.path.join(f"year={year}", name)
+                if relative_path not in keep and not name.endswith(".tmp"):
+                    # Memory-mapped readers keep their pages after removal
+                    os.remove(os.path.join(directory, name))
+                    with self._lock:
+                        self._tables.pop(relative_path, None)
+
+    def clear(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+        with self._lock:
+            self._manifest, self._manifest_mtime = None, None
+            self._tables.clear()
+            self._views.clear()
+
+
+def main():
+    import pandas as pd
+
+    from data_store import TEXT_COLUMNS, file_hash, prepare_frame
+
+    parser = argparse.ArgumentParser(description="Append a Final_output.csv to the year-partitioned panel.")
+    parser.add_argument("csv_path")
+    parser.add_argument("--year", type=int, help=f"override {YEAR_COLUMN} (older scrapes hard-code it)")
+    parser.add_argument("--panel", default=DEFAULT_PANEL_DIR)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    df = pd.read_csv(args.csv_path)
+    if args.year is not None:
+        df[YEAR_COLUMN] = args.year
+    frame = prepare_frame(df.drop(columns=[col for col in TEXT_COLUMNS if col in df.columns]))
+    appended = PanelStore(args.panel).append(frame, file_hash(args.csv_path)[:12])
+    print(f"Appended year(s): {', '.join(map(str, appended)) or 'none (already in the panel)'}")
+
+
+if __name__ == "__main__":
+    main()
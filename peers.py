@@ -0,0 +1,45 @@
+"""
+Nearest-neighbour index over the standardized indicator vector of each country.
+
+Built once per Dataset. Size-like indicators use their log columns so the
+largest economies do not dominate the distance. Missing values are scored as the
+column mean (0 after standardization). Queries go to a KD-tree, so finding the k
+nearest peers stays logarithmic in the number of entities instead of computing
+every pairwise distance on each click.
+"""
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+PEER_FEATURES = [
+    'gdp_total_usd_billion_cleaned_log', 'GDP_per_capita_ppp_cleaned_log', 'GDP_per_capita_nominal_cleaned_log',
+    'GDP_growth_rate_cleaned', 'Inflation_rate_cleaned', 'Unemployment_rate_cleaned',
+    'Gov_Debt_Percent_GDP_Cleaned', 'Trade_Openness', 'Exports_Cleaned_Billion_log', 'Imports_Cleaned_Billion_log',
+]
+
+
+class PeerIndex:
+    def __init__(self, frame, features=PEER_FEATURES, leaf_size=40):
+        from sklearn.neighbors import KDTree
+
+        self.features = [col for col in features if col in frame.columns]
+        X = np.column_stack([frame[col].to_numpy(dtype="float64", na_value=np.nan) for col in self.features])
+        mean = np.nanmean(X, axis=0)
+        std = np.nanstd(X, axis=0)
+        std[~(std > 0)] = 1.0
+        self.matrix = np.nan_to_num((X - mean) / std, nan=0.0)
+        self.tree = KDTree(self.matrix, leaf_size=leaf_size)
+
+    def __len__(self):
+        return len(self.matrix)
+
+    def neighbours(self, position, k=5):
+        """(positions, distances) of the k rows closest to the row at position, excluding itself."""
+        k = min(k, len(self) - 1)
+        if k < 1:
+            return np.empty(0, dtype=np.intp), np.empty(0)
+        distances, positions = self.tree.query(self.matrix[position:position + 1], k=k + 1)
+        keep = positions[0] != position
+        return positions[0][keep][:k], distances[0][keep][:k]
@@ -0,0 +1,364 @@
+"""
+Staged, checkpointed refresh pipeline extracted from GDP_Finder.ipynb.
+
+    scrape ──> clean ──> features ──> cluster ──────┐
+       │                     └──> model_data        ├──> final (Final_output.csv)
+       └──> paragraphs ──> summaries ───────────────┘
+
+Every stage writes its artifacts into the output directory and records a key in
+pipeline_state.json: a hash of the stage's code (its function plus the modules it
+uses), its parameters and the content of its input artifacts. A stage whose key
+and outputs are unchanged is skipped, and a stage that reproduces byte-identical
+outputs leaves its downstream stages up to date. Stages whose inputs are ready run
+in parallel, so the paragraph crawl and the summaries overlap cleaning, features
+and clustering. Outputs are renamed into place only after a stage succeeds, so an
+interrupted run resumes from the last completed stage.
+
+Usage:
+    python pipeline.py --list
+    python pipeline.py --raw GDP_Finder_raw.csv --summarizer stub
+    python pipeline.py --force scrape --publish     # re-crawl and replace Final_output.csv
+"""
+import argparse
+import hashlib
+import inspect
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import numpy as np
+import pandas as pd
+
+import cleaning
+import http_cache
+import infobox_parser
+import scraper
+import summarizer
+from data_store import SOURCE_CSV, file_hash
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_OUT_DIR = os.path.join(BASE_DIR, "build")
+STATE_FILE = "pipeline_state.json"
+
+# Columns that must exist (dropped when missing) and columns imputed with the median
+STRICT_COLUMNS = [
+    'gdp_total_usd_billion_cleaned', 'Exports_Cleaned_Billion', 'Imports_Cleaned_Billion',
+    'GDP_per_capita_nominal_cleaned', 'GDP_per_capita_ppp_cleaned',
+]
+MEDIAN_COLUMNS = [
+    'GDP_growth_rate_cleaned', 'Inflation_rate_cleaned', 'Gov_Debt_Percent_GDP_Cleaned',
+    'Unemployment_rate_cleaned', 'Gov_Debt_Absolute_Billion_Cleaned',
+]
+LOG_COLUMNS = [
+    'gdp_total_usd_billion_cleaned', 'GDP_per_capita_nominal_cleaned', 'GDP_per_capita_ppp_cleaned',
+    'Exports_Cleaned_Billion', 'Imports_Cleaned_Billion', 'Gov_Debt_Absolute_Billion_Cleaned',
+]
+# Clipped to their interquartile range
+CAP_COLUMNS = [
+    'GDP_growth_rate_cleaned', 'Inflation_rate_cleaned', 'Gov_Debt_Percent_GDP_Cleaned', 'Trade_Balance',
+    'Trade_Openness', 'GDP_Capita_Ratio', 'Debt_to_Income', 'Import_Export_Ratio',
+]
+MODEL_DROP_COLUMNS = [
+    'Country', 'gdp_total_usd_billion_cleaned', 'GDP_total_Year', 'GDP_growth_rate_cleaned',
+    'GDP_per_capita_nominal_cleaned', 'clean_currency', 'Links', 'GDP_per_capita_ppp_cleaned_log',
+    'Exports_Cleaned_Billion', 'Imports_Cleaned_Billion', 'Import_Export_Ratio', 'Is_Eurozone',
+    'Is_USD_Pegged', 'GDP_per_capita_nominal_cleaned_log',
+]
+NON_NUMERIC_COLUMNS = ['Country', 'Links', 'clean_currency']
+
+
+def read_csv(path):
+    # round_trip keeps floats bit-identical between stages
+    return pd.read_csv(path, float_precision='round_trip')
+
+
+# --- stages -------------------------------------------------------------------------------
+# Each stage reads its input artifacts and writes every output path it is given.
+
+def run_scrape(inputs, outputs, params):
+    if params.get('raw'):
+        shutil.copyfile(params['raw'], outputs['raw'])
+        return
+    cache = http_cache.ResponseCache(mode="cache-only" if params['offline'] else "revalidate")
+    bot = scraper.EconomicIntelligenceScraper(max_workers=params['workers'], cache=cache)
+    bot.scrape_country_GDP_table(params['url']).to_csv(outputs['raw'], index=False)
+
+
+def run_paragraphs(inputs, outputs, params):
+    links = read_csv(inputs['raw'])['Links'].drop_duplicates()
+    cache = http_cache.ResponseCache(mode="cache-only" if params['offline'] else "revalidate")
+    bot = scraper.EconomicIntelligenceScraper(max_workers=params['workers'], cache=cache)
+    paragraphs = pd.DataFrame({'Links': links, 'scraped_paragraph': bot.scrape_paragraphs(links)})
+    paragraphs.to_csv(outputs['paragraphs'], index=False)
+
+
+def run_clean(inputs, outputs, params):
+    df = cleaning.clean_scrape(pd.read_csv(inputs['raw']))
+    df = df.dropna(subset=STRICT_COLUMNS).copy()
+    df[MEDIAN_COLUMNS] = df[MEDIAN_COLUMNS].fillna(df[MEDIAN_COLUMNS].median())
+    df.to_csv(outputs['cleaned'], index=False)
+
+
+def run_features(inputs, outputs, params):
+    df = read_csv(inputs['cleaned'])
+    df['Trade_Balance'] = df['Exports_Cleaned_Billion'] - df['Imports_Cleaned_Billion']
+    df['Trade_Openness'] = ((df['Exports_Cleaned_Billion'] + df['Imports_Cleaned_Billion']) / df['gdp_total_usd_billion_cleaned']) * 100
+    df['GDP_Capita_Ratio'] = df['GDP_per_capita_nominal_cleaned'] / df['GDP_per_capita_ppp_cleaned']
+    df['Debt_to_Income'] = df['Gov_Debt_Percent_GDP_Cleaned'] / df['GDP_per_capita_ppp_cleaned']
+    df['Import_Export_Ratio'] = df['Imports_Cleaned_Billion'] / df['Exports_Cleaned_Billion']
+
+    currency = df['clean_currency'].fillna('')
+    df['Is_Eurozone'] = (currency == 'Euro (EUR)').astype(int)
+    df['Is_USD_Pegged'] = currency.str.contains('United States dollar (USD)', regex=False).astype(int)
+
+    for col in LOG_COLUMNS:
+        df[col + '_log'] = np.log1p(df[col])
+    lower, upper = df[CAP_COLUMNS].quantile(0.25), df[CAP_COLUMNS].quantile(0.75)
+    df[CAP_COLUMNS] = df[CAP_COLUMNS].clip(lower, upper, axis=1)
+    df.to_csv(outputs['features'], index=False)
+
+
+def run_model_data(inputs, outputs, params):
+    read_csv(inputs['features']).drop(columns=MODEL_DROP_COLUMNS).to_csv(outputs['model_data'], index=False)
+
+
+def run_cluster(inputs, outputs, params):
+    import joblib
+    from sklearn.cluster import KMeans
+    from sklearn.preprocessing import StandardScaler
+
+    df = read_csv(inputs['features'])
+    features = df.drop(columns=NON_NUMERIC_COLUMNS, errors='ignore')
+    features = features.drop(columns=[col for col in features.columns if col.endswith('_log')])
+
+    kmeans = KMeans(n_clusters=params['clusters'], random_state=42)
+    df['cluster'] = kmeans.fit_predict(StandardScaler().fit_transform(features))
+
+    ppp = df['GDP_per_capita_ppp_cleaned']
+    df['economic_class'] = np.select(
+        [ppp > 30000, ppp > 15000, ppp > 5000],
+        ["Developed", "Developing (Upper)", "Developing (Lower)"],
+        default="Least Developed",
+    )
+    df.to_csv(outputs['clusters'], index=False)
+    joblib.dump(kmeans, outputs['cluster_model'])
+
+
+def run_summaries(inputs, outputs, params):
+    paragraphs = read_csv(inputs['paragraphs'])
+    engine = summarizer.Summarizer(summarizer.CLIENTS[params['summarizer']](), batch_size=params['batch_size'])
+    if os.path.exists(SOURCE_CSV):
+        # Reuse the published summaries of paragraphs that did not change
+        published = pd.read_csv(SOURCE_CSV, usecols=['scraped_paragraph', 'summary'])
+        engine.seed(published['scraped_paragraph'], published['summary'])
+    paragraphs['summary'] = engine.summarize(paragraphs['scraped_paragraph'])
+    paragraphs[['Links', 'summary']].to_csv(outputs['summaries'], index=False)
+    logger.info("Summaries: %s", engine.stats)
+
+
+def run_final(inputs, outputs, params):
+    df = read_csv(inputs['clusters'])
+    df = df.merge(read_csv(inputs['paragraphs']), on='Links', how='left')
+    df = df.merge(read_csv(inputs['summaries']), on='Links', how='left')
+    df.to_csv(outputs['final'], index=False)
+
+
+class Stage:
+    def __init__(self, name, func, inputs=(), outputs=None, modules=(), params=()):
+        self.name = name
+        self.func = func
+        self.inputs = list(inputs)          # artifact names produced by other stages
+        self.outputs = dict(outputs or {})  # artifact name -> file name
+        self.modules = list(modules)        # modules whose source is part of the code version
+        self.params = list(params)          # names of the run options this stage depends on
+
+    def code_version(self):
+        digest = hashlib.sha256(inspect.getsource(self.func).encode("utf-8"))
+        for module in self.modules:
+            digest.update(file_hash(module.__file__).encode("ascii"))
+        return digest.hexdigest()
+
+
+STAGES = [
+    Stage('scrape', run_scrape, outputs={'raw': 'GDP_Finder_raw.csv'},
+          modules=[scraper, infobox_parser, http_cache], params=['url', 'raw_sha256', 'offline']),
+    Stage('paragraphs', run_paragraphs, inputs=['raw'], outputs={'paragraphs': 'paragraphs.csv'},
+          modules=[scraper, http_cache], params=['offline']),
+    Stage('clean', run_clean, inputs=['raw'], outputs={'cleaned': 'GDP_Finder_V4.csv'}, modules=[cleaning]),
+    Stage('features', run_features, inputs=['cleaned'], outputs={'features': 'cleaned_economic_data.csv'}),
+    Stage('model_data', run_model_data, inputs=['features'], outputs={'model_data': 'model_data.csv'}),
+    Stage('cluster', run_cluster, inputs=['features'], params=['clusters'],
+          outputs={'clusters': 'economic_intelligence_dataset.csv', 'cluster_model': 'economic_clustering_model.joblib'}),
+    Stage('summaries', run_summaries, inputs=['paragraphs'], outputs={'summaries': 'summaries.csv'},
+          modules=[summarizer], params=['summarizer']),
+    Stage('final', run_final, inputs=['clusters', 'paragraphs', 'summaries'], outputs={'final': 'Final_output.csv'}),
+]
+
+
+class Pipeline:
+    def __init__(self, stages=STAGES, out_dir=DEFAULT_OUT_DIR, params=None, max_workers=4):
+        self.stages = {stage.name: stage for stage in stages}
+        self.producers = {artifact: stage.name for stage in stages for artifact in stage.outputs}
+        self.out_dir = out_dir
+        self.params = params or {}
+        self.max_workers = max_workers
+        self.state_path = os.path.join(out_dir, STATE_FILE)
+        self._lock = threading.Lock()
+        try:
+            with open(self.state_path) as f:
+                self.state = json.load(f)
+        except (OSError, ValueError):
+            self.state = {}
+
+    def path(self, artifact):
+        return os.path.join(self.out_dir, self.stages[self.producers[artifact]].outputs[artifact])
+
+    def dependencies(self, stage):
+        return {self.producers[artifact] for artifact in stage.inputs}
+
+    def upstream(self, names):
+        """The named stages plus everything they depend on."""
+        selected, todo = set(), list(names)
+        while todo:
+            name = todo.pop()
+            if name not in selected:
+                selected.add(name)
+                todo.extend(self.dependencies(self.stages[name]))
+        return selected
+
+    def stage_key(self, stage):
+        payload = {
+            "stage": stage.name,
+            "code": stage.code_version(),
+            "params": {name: self.params.get(name) for name in stage.params},
+            "inputs": {artifact: self.state[self.producers[artifact]]["outputs"][artifact] for artifact in stage.inputs},
+        }
+        return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+
+    def is_current(self, stage, key):
+        record = self.state.get(stage.name)
+        if not record or record["key"] != key:
+            return False
+        return all(
+            os.path.exists(self.path(artifact)) and file_hash(self.path(artifact)) == digest
+            for artifact, digest in record["outputs"].items()
+        )
+
+    def _save_state(self):
+        tmp_path = f"{self.state_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.state, f, indent=2)
+        os.replace(tmp_path, self.state_path)
+
+    def run_stage(self, stage, force=False):
+        key = self.stage_key(stage)
+        if not force and self.is_current(stage, key):
+            logger.info("%-10s up to date", stage.name)
+            return False
+
+        logger.info("%-10s running", stage.name)
+        started = time.perf_counter()
+        inputs = {artifact: self.path(artifact) for artifact in stage.inputs}
+        tmp_outputs = {artifact: f"{self.path(artifact)}.{os.getpid()}.tmp" for artifact in stage.outputs}
+        try:
+            stage.func(inputs, tmp_outputs, self.params)
+            for artifact, tmp_path in tmp_outputs.items():
+                os.replace(tmp_path, self.path(artifact))
+        finally:
+            for tmp_path in tmp_outputs.values():
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+
+        seconds = time.perf_counter() - started
+        with self._lock:
+            self.state[stage.name] = {
+                "key": key,
+                "outputs": {artifact: file_hash(self.path(artifact)) for artifact in stage.outputs},
+                "finished_at": time.time(),
+                "seconds": round(seconds, 3),
+            }
+            self._save_state()
+        logger.info("%-10s done in %.2fs", stage.name, seconds)
+        return True
+
+    def run(self, targets=None, force=()):
+        """Run the target stages (default: all) and their dependencies; returns the stages that ran."""
+        os.makedirs(self.out_dir, exist_ok=True)
+        pending = self.upstream(targets or self.stages)
+        done, ran, running = set(), [], {}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            while pending or running:
+                for name in sorted(pending):
+                    stage = self.stages[name]
+                    if self.dependencies(stage) <= done:
+                        pending.discard(name)
+                        running[pool.submit(self.run_stage, stage, name in force)] = name
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    name = running.pop(future)
+                    # Re-raises the stage's exception; stages already running finish first
+                    if future.result():
+                        ran.append(name)
+                    done.add(name)
+        return ran
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the GDP_Finder refresh as memoized stages.")
+    parser.add_argument("stages", nargs="*", help="target stages (default: all)")
+    parser.add_argument("--out-dir", default=DEFAULT_OUT_DIR)
+    parser.add_argument("--force", nargs="+", default=[], metavar="STAGE", help="re-run these stages even if up to date")
+    parser.add_argument("--raw", help="use this raw scrape CSV instead of crawling")
+    parser.add_argument("--url", default=scraper.GDP_TABLE_URL)
+    parser.add_argument("--offline", action="store_true", help="crawl from the response cache only")
+    parser.add_argument("--workers", type=int, default=8, help="crawler threads")
+    parser.add_argument("--clusters", type=int, default=4)
+    parser.add_argument("--summarizer", choices=sorted(summarizer.CLIENTS), default="openai")
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--parallel", type=int, default=4, help="stages run at the same time")
+    parser.add_argument("--publish", action="store_true", help="copy the final output over Final_output.csv")
+    parser.add_argument("--list", action="store_true", help="show the stages and whether they are up to date")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    params = {
+        "url": args.url,
+        "raw": os.path.abspath(args.raw) if args.raw else None,
+        "raw_sha256": file_hash(args.raw) if args.raw else None,
+        "offline": args.offline,
+        "workers": args.workers,
+        "clusters": args.clusters,
+        "summarizer": args.summarizer,
+        "batch_size": args.batch_size,
+    }
+    pipeline = Pipeline(out_dir=args.out_dir, params=params, max_workers=args.parallel)
+    unknown = set(args.stages + args.force) - set(pipeline.stages)
+    if unknown:
+        parser.error(f"unknown stages: {', '.join(sorted(unknown))}")
+
+    if args.list:
+        for name, stage in pipeline.stages.items():
+            record = pipeline.state.get(name)
+            status = "never run"
+            if record:
+                ready = all(artifact in pipeline.state.get(pipeline.producers[artifact], {}).get("outputs", {}) for artifact in stage.inputs)
+                status = "up to date" if ready and pipeline.is_current(stage, pipeline.stage_key(stage)) else "stale"
+            print(f"{name:<12}{', '.join(stage.inputs) or '-':<32}{status}")
+        return
+
+    ran = pipeline.run(args.stages, force=set(args.force))
+    logger.info("Ran %d stage(s): %s", len(ran), ", ".join(ran) or "none")
+    if args.publish:
+        shutil.copyfile(pipeline.path('final'), SOURCE_CSV + ".tmp")
+        os.replace(SOURCE_CSV + ".tmp", SOURCE_CSV)
+        logger.info("Published %s", SOURCE_CSV)
+
+
+if __name__ == "__main__":
+    main()
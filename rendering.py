@@ -0,0 +1,120 @@
+"""
+Adaptive figure builders for charts whose payload grows with the row count.
+
+Below WEBGL_MIN_ROWS the builders return exactly the plotly.express figure the
+dashboard has always drawn. Above it:
+- scatters use WebGL traces and level-of-detail downsampling: the plot area is
+  split into a grid and only the largest point of each color in each cell is
+  sent (the grid is coarsened until at most MAX_POINTS remain), so sparse
+  outliers survive while dense areas collapse. A server-side
+  2-D histogram of all rows is drawn underneath, so the density the dropped
+  points carried stays visible. The points that are sent keep their hover data.
+- box plots are drawn from the quantiles precomputed in the AggregateCube
+  (q25/median/q75, whiskers at min/max), so the browser gets one box per group
+  instead of every row.
+
+Either way the payload is bounded by the grid size and the number of groups,
+not by the row count.
+"""
+import logging
+
+import numpy as np
+import plotly.express as px
+import plotly.graph_objects as go
+
+logger = logging.getLogger(__name__)
+
+WEBGL_MIN_ROWS = 5_000
+LOD_GRID = 128          # cells per axis for downsampling
+MAX_POINTS = 5_000      # points sent per scatter; the grid is coarsened until the sample fits
+DENSITY_BINS = 60       # bins per axis for the density layer
+
+
+def lod_sample(frame, x, y, color=None, size=None, grid=LOD_GRID):
+    """One row per occupied (grid cell, color): the one with the largest size, or the first."""
+    xs = frame[x].to_numpy(dtype="float64", na_value=np.nan)
+    ys = frame[y].to_numpy(dtype="float64", na_value=np.nan)
+    valid = ~(np.isnan(xs) | np.isnan(ys))
+    positions = np.flatnonzero(valid)
+    if not len(positions):
+        return frame.iloc[positions]
+
+    def cell(values):
+        low, high = values.min(), values.max()
+        scaled = (values - low) / (high - low) if high > low else np.zeros_like(values)
+        return np.minimum((scaled * grid).astype(np.int64), grid - 1)
+
+    keys = cell(xs[valid]) * grid + cell(ys[valid])
+    if color is not None:
+        codes = frame[color].astype("category").cat.codes.to_numpy()[valid]
+        keys = keys * (codes.max() + 2) + codes + 1
+    if size is not None:
+        weights = frame[size].to_numpy(dtype="float64", na_value=np.nan)[valid]
+        order = np.argsort(-np.nan_to_num(weights, nan=-np.inf), kind="stable")
+    else:
+        order = np.arange(len(keys))
+    _, first = np.unique(keys[order], return_index=True)
+    return frame.iloc[np.sort(positions[order[first]])]
+
+
+def density_layer(frame, x, y, bins=DENSITY_BINS):
+    """Heatmap trace of the row counts of all rows, binned on the server."""
+    xs = frame[x].to_numpy(dtype="float64", na_value=np.nan)
+    ys = frame[y].to_numpy(dtype="float64", na_value=np.nan)
+    valid = ~(np.isnan(xs) | np.isnan(ys))
+    counts, x_edges, y_edges = np.histogram2d(xs[valid], ys[valid], bins=bins)
+    counts = np.where(counts > 0, counts, np.nan)
+    return go.Heatmap(
+        x=(x_edges[:-1] + x_edges[1:]) / 2,
+        y=(y_edges[:-1] + y_edges[1:]) / 2,
+        z=counts.T,
+        colorscale="Greys",
+        opacity=0.5,
+        showscale=False,
+        hovertemplate="%{z:,.0f} rows<extra></extra>",
+        name="All rows",
+    )
+
+
+def adaptive_scatter(frame, x, y, threshold=WEBGL_MIN_ROWS, max_points=MAX_POINTS, **kwargs):
+    """px.scatter for small frames; WebGL with LOD sampling over a density layer for large ones."""
+    if len(frame) < threshold:
+        return px.scatter(frame, x=x, y=y, **kwargs)
+
+    grid = LOD_GRID
+    sample = lod_sample(frame, x, y, color=kwargs.get("color"), size=kwargs.get("size"), grid=grid)
+    while len(sample) > max_points and grid > 2:
+        grid //= 2
+        sample = lod_sample(frame, x, y, color=kwargs.get("color"), size=kwargs.get("size"), grid=grid)
+    logger.info("Scatter of %d rows drawn with %d LOD points over a density layer", len(frame), len(sample))
+    figure = px.scatter(sample, x=x, y=y, render_mode="webgl", **kwargs)
+    figure.add_trace(density_layer(frame, x, y))
+    # Density underneath the points
+    figure.data = (figure.data[-1],) + figure.data[:-1]
+    return figure
+
+
+def adaptive_box(frame, cube, x, y, threshold=WEBGL_MIN_ROWS, color_discrete_sequence=None, **kwargs):
+    """px.box for small frames; boxes drawn from the cube's per-group quantiles for large ones."""
+    if len(frame) < threshold:
+        return px.box(frame, x=x, y=y, color=x, color_discrete_sequence=color_discrete_sequence, **kwargs)
+
+    stats = cube.rollup(x)
+    colors = color_discrete_sequence or px.colors.qualitative.Plotly
+    figure = go.Figure()
+    for i, (group, row) in enumerate(stats.iterrows()):
+        rows = int(row[("rows", "")])
+        figure.add_trace(go.Box(
+            name=str(group),
+            x=[str(group)],
+            q1=[row[(y, "q25")]],
+            median=[row[(y, "median")]],
+            q3=[row[(y, "q75")]],
+            lowerfence=[row[(y, "min")]],
+            upperfence=[row[(y, "max")]],
+            mean=[row[(y, "mean")]],
+            marker_color=colors[i % len(colors)],
+            hovertemplate=f"{group}<br>%{{y:,.2f}}<br>{rows:,} rows<extra></extra>",
+        ))
+    figure.update_layout(xaxis_title=x, yaxis_title=y)
+    return figure
@@ -0,0 +1,219 @@
+"""
+Vectorized what-if sweeps over the shipped models.
+
+A sweep takes one country's indicator row, varies one or two indicators over a
+grid, and scores every scenario with the Random Forest (GDP per capita, PPP) and
+KMeans (cluster). The grid is built as a single feature matrix, with every
+feature derived from a swept indicator (government debt, exports and imports and
+the ratios and logs built on them) recomputed column-wise, and scored in chunks.
+Large grids are spread over a process pool whose workers load the models once.
+Results are cached per (country, base row, grid spec, model hashes),
+so the same country in another panel year gets its own sweep.
+"""
+import hashlib
+import logging
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+import numpy as np
+import pandas as pd
+
+from model_serving import CLUSTER_FEATURES, GDP_FEATURES, GDP_TARGET, load_artifact
+
+logger = logging.getLogger(__name__)
+
+# Indicators an analyst can vary, with their display labels
+SCENARIO_INDICATORS = {
+    "Inflation_rate_cleaned": "Inflation Rate (%)",
+    "Unemployment_rate_cleaned": "Unemployment Rate (%)",
+    "Gov_Debt_Percent_GDP_Cleaned": "Gov. Debt (% of GDP)",
+    "Trade_Openness": "Trade Openness (%)",
+    "GDP_growth_rate_cleaned": "GDP Growth Rate (%)",
+}
+
+# Columns the notebook log-transformed with np.log1p, and the dashboard's trade totals
+LOG_COLUMNS = [
+    'gdp_total_usd_billion_cleaned', 'Exports_Cleaned_Billion', 'Imports_Cleaned_Billion',
+    'Gov_Debt_Absolute_Billion_Cleaned',
+]
+TRADE_TOTALS = ['Trade Balance', 'Total Trade']
+
+# Rows scored per predict call, and the grid size from which chunks go to the process pool
+CHUNK_ROWS = 20_000
+POOL_MIN_ROWS = 100_000
+
+_worker_models = {}
+
+
+class GridSpec:
+    """Axes of a sweep: (column, start, stop, steps) per varied indicator."""
+
+    def __init__(self, *axes):
+        for column, _, _, steps in axes:
+            if column not in SCENARIO_INDICATORS:
+                raise ValueError(f"{column} is not a scenario indicator")
+            if steps < 1:
+                raise ValueError("A grid axis needs at least one step")
+        self.axes = tuple((column, float(start), float(stop), int(steps)) for column, start, stop, steps in axes)
+
+    def key(self):
+        return self.axes
+
+    def values(self):
+        return [np.linspace(start, stop, steps) for _, start, stop, steps in self.axes]
+
+    def size(self):
+        return int(np.prod([steps for *_, steps in self.axes]))
+
+
+def base_key(base):
+    """Digest of the base row's model inputs; differs between panel years of one country."""
+    columns = list(dict.fromkeys(GDP_FEATURES + CLUSTER_FEATURES + [GDP_TARGET]))
+    values = np.array([base[col] for col in columns], dtype="float64")
+    return hashlib.sha1(values.tobytes()).hexdigest()[:16]
+
+
+def _factor(values, base_value):
+    """values relative to the base row's value, or None when there is nothing to scale."""
+    if pd.isna(base_value) or base_value == 0:
+        return None
+    return values / base_value
+
+
+def derive_features(frame, base, swept):
+    """Recompute the columns built from the swept indicators (notebook "Feature Engineering").
+
+    GDP and the export/import mix stay at the base row's values. The stored ratios
+    were outlier-capped after the notebook computed them, so a derived column moves
+    by the same factor as the indicator it is built from rather than being recomputed
+    from scratch, and the scenario equal to the base row matches the base row exactly.
+    """
+    gdp = base["gdp_total_usd_billion_cleaned"]
+    if "Gov_Debt_Percent_GDP_Cleaned" in swept:
+        percent = frame["Gov_Debt_Percent_GDP_Cleaned"]
+        factor = _factor(percent, base["Gov_Debt_Percent_GDP_Cleaned"])
+        if factor is None:
+            frame["Gov_Debt_Absolute_Billion_Cleaned"] = percent * gdp / 100
+            frame["Debt_to_Income"] = percent / base[GDP_TARGET]
+        else:
+            for col in ["Gov_Debt_Absolute_Billion_Cleaned", "Debt_to_Income"]:
+                frame[col] = base[col] * factor
+
+    if "Trade_Openness" in swept:
+        openness = frame["Trade_Openness"]
+        factor = _factor(openness, base["Trade_Openness"])
+        if factor is None:
+            # No trade in the base row to scale: split the new trade evenly
+            frame["Exports_Cleaned_Billion"] = frame["Imports_Cleaned_Billion"] = openness * gdp / 200
+            frame["Trade_Balance"] = frame["Trade Balance"] = 0.0
+            frame["Total Trade"] = openness * gdp / 100
+            frame["Import_Export_Ratio"] = 1.0
+        else:
+            # Exports and imports scale together, so Import_Export_Ratio keeps the base value
+            for col in ["Exports_Cleaned_Billion", "Imports_Cleaned_Billion", "Trade_Balance", "Trade Balance",
+                        "Total Trade"]:
+                frame[col] = base[col] * factor
+
+    for col in LOG_COLUMNS:
+        frame[f"{col}_log"] = np.log1p(frame[col])
+    return frame
+
+
+def scenario_frame(base, spec):
+    """One row per grid point: the base indicators with the swept columns and those derived from them replaced."""
+    grids = np.meshgrid(*spec.values(), indexing="ij")
+    frame = pd.DataFrame({
+        col: np.full(spec.size(), base[col], dtype="float64")
+        for col in dict.fromkeys(GDP_FEATURES + CLUSTER_FEATURES + [GDP_TARGET] + TRADE_TOTALS)
+    })
+    for (column, *_), grid in zip(spec.axes, grids):
+        frame[column] = grid.ravel()
+    return derive_features(frame, base, {column for column, *_ in spec.axes})
+
+
+def _init_worker(paths, gdp_scaler, cluster_scaler):
+    _worker_models["gdp_ppp"] = (load_artifact(paths["gdp_ppp"])[0], gdp_scaler)
+    _worker_models["cluster"] = (load_artifact(paths["cluster"])[0], cluster_scaler)
+
+
+def _score(models, X_gdp, X_cluster):
+    estimator, scaler = models["gdp_ppp"]
+    ppp = estimator.predict(scaler.transform(X_gdp))
+    estimator, scaler = models["cluster"]
+    cluster = estimator.predict(scaler.transform(X_cluster))
+    return ppp, cluster
+
+
+def _score_in_worker(X_gdp, X_cluster):
+    return _score(_worker_models, X_gdp, X_cluster)
+
+
+class ScenarioEngine:
+    def __init__(self, server, chunk_rows=CHUNK_ROWS, pool_min_rows=POOL_MIN_ROWS, workers=None, max_entries=32):
+        self.server = server
+        self.chunk_rows = chunk_rows
+        self.pool_min_rows = pool_min_rows
+        self.workers = workers or os.cpu_count() or 1
+        self.max_entries = max_entries
+        self.models = {
+            name: (model.estimator, model.scaler) for name, model in server.models.items()
+        }
+        self.model_key = tuple(model.sha256 for model in server.models.values())
+        self._results = OrderedDict()
+        self._lock = threading.Lock()
+        self._pool = None
+
+    def _get_pool(self):
+        with self._lock:
+            if self._pool is None:
+                paths = dict(self.server.paths)
+                # spawn: never fork a process that is running server threads
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=get_context("spawn"),
+                    initializer=_init_worker,
+                    initargs=(paths, self.models["gdp_ppp"][1], self.models["cluster"][1]),
+                )
+            return self._pool
+
+    def score(self, frame):
+        """Predicted PPP and cluster for every row of a scenario frame."""
+        X_gdp = np.column_stack([frame[col].to_numpy() for col in GDP_FEATURES])
+        X_cluster = np.column_stack([frame[col].to_numpy() for col in CLUSTER_FEATURES])
+        bounds = range(0, len(frame), self.chunk_rows)
+        chunks = [(X_gdp[i:i + self.chunk_rows], X_cluster[i:i + self.chunk_rows]) for i in bounds]
+
+        if len(frame) >= self.pool_min_rows and self.workers > 1:
+            results = list(self._get_pool().map(_score_in_worker, *zip(*chunks)))
+        else:
+            results = [_score(self.models, X_g, X_c) for X_g, X_c in chunks]
+        ppp = np.concatenate([r[0] for r in results])
+        cluster = np.concatenate([r[1] for r in results]).astype(int)
+        return ppp, cluster
+
+    def sweep(self, country, base, spec):
+        """Grid columns plus Predicted PPP and Predicted Cluster, cached per country/base row/spec/models."""
+        key = (country, base_key(base), spec.key(), self.model_key)
+        with self._lock:
+            if key in self._results:
+                self._results.move_to_end(key)
+                return self._results[key]
+
+        frame = scenario_frame(base, spec)
+        ppp, cluster = self.score(frame)
+        result = frame[[column for column, *_ in spec.axes]].copy()
+        result["Predicted PPP"] = ppp
+        result["Predicted Cluster"] = cluster
+
+        with self._lock:
+            self._results[key] = result
+            while len(self._results) > self.max_entries:
+                self._results.popitem(last=False)
+        return result
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
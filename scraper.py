@@ -0,0 +1,325 @@
+"""
+Concurrent scraper for the Wikipedia GDP table crawl.
+
+Extracted from the "Data Collection" section of GDP_Finder.ipynb. The list page
+is fetched once, then every country page is fetched through a bounded thread
+pool over one pooled requests.Session, with a per-host rate limit and jittered
+exponential backoff between retries. Each page is handed to a process pool for
+infobox parsing (infobox_parser.py) as soon as it arrives. Throughput is tracked
+in CrawlMetrics.
+
+Links are resolved relative to the list page URL, so the crawl can be pointed at
+a local stub HTTP server.
+
+Pages go through the shared on-disk ResponseCache (http_cache.py) when one is
+given, so the infobox pass and the summary paragraph pass download each country
+page at most once and later runs only revalidate it.
+
+Usage:
+    python scraper.py --workers 8 --rps 5 --out GDP_Finder_raw.csv
+    python scraper.py --offline          # rebuild from the response cache only
+"""
+import argparse
+import logging
+import os
+import random
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from urllib.parse import urljoin, urlsplit
+
+import pandas as pd
+import requests
+from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from tqdm import tqdm
+
+from http_cache import DEFAULT_CACHE_DIR, ResponseCache
+from infobox_parser import parse_infobox_html
+
+logger = logging.getLogger(__name__)
+
+GDP_TABLE_URL = "https://en.wikipedia.org/wiki/List_of_countries_by_GDP_(nominal)"
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+
+INFOBOX_FIELDS = [
+    'GDP_per_capita', 'GDP_per_capita_rank', 'GDP_growth_rate',
+    'Inflation_rate', 'Unemployment_rate', 'Exports', 'Imports',
+    'Government_debt', 'Currency'
+]
+TABLE_COLUMNS = ['Country', 'GDP_total_usd', 'GDP_total_Year', 'Links'] + INFOBOX_FIELDS
+
+CONTENT_SELECTORS = [
+    'div.mw-content-ltr.mw-parser-output',  # Standard Wikipedia content
+    'div.mw-parser-output',
+    'div#mw-content-text'
+]
+SKIP_PATTERNS = [
+    'coordinates:',
+    'this article',
+    'for other uses',
+    'disambiguation',
+    'redirected from',
+    'jump to navigation',
+    'jump to search'
+]
+
+
+class HostRateLimiter:
+    """Spaces out request starts to at most `requests_per_second` per host."""
+
+    def __init__(self, requests_per_second=5.0):
+        self.interval = 1.0 / requests_per_second if requests_per_second else 0.0
+        self._next_slot = {}
+        self._lock = threading.Lock()
+
+    def wait(self, url):
+        if not self.interval:
+            return
+        host = urlsplit(url).netloc
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class CrawlMetrics:
+    """Thread-safe request, retry, failure and byte counters for one crawl."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started = time.monotonic()
+        self.requests = 0
+        self.cache_hits = 0
+        self.retries = 0
+        self.failures = 0
+        self.pages = 0
+        self.bytes = 0
+
+    def record(self, **counts):
+        with self._lock:
+            for name, value in counts.items():
+                setattr(self, name, getattr(self, name) + value)
+
+    def snapshot(self):
+        with self._lock:
+            elapsed = time.monotonic() - self.started
+            return {
+                "requests": self.requests,
+                "cache_hits": self.cache_hits,
+                "retries": self.retries,
+                "failures": self.failures,
+                "pages": self.pages,
+                "bytes": self.bytes,
+                "elapsed_s": round(elapsed, 3),
+                "pages_per_s": round(self.pages / elapsed, 2) if elapsed else 0.0,
+                "mb_per_s": round(self.bytes / elapsed / 1e6, 3) if elapsed else 0.0,
+            }
+
+
+class EconomicIntelligenceScraper:
+    def __init__(self, max_workers=8, requests_per_second=5.0, retries=3, backoff=1.0,
+                 max_backoff=30.0, timeout=15, cache=None, parse_workers=None):
+        # One pooled session shared by all worker threads
+        self.session = requests.Session()
+        self.session.headers.update({'User-Agent': USER_AGENT})
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max_workers)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+        self.max_workers = max_workers
+        self.parse_workers = parse_workers or os.cpu_count() or 1
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        self.rate_limiter = HostRateLimiter(requests_per_second)
+        self.metrics = CrawlMetrics()
+        self.cache = cache
+        self.economic_data = []
+
+    def backoff_delay(self, attempt):
+        # Full jitter: uniform over [0, backoff * 2^attempt], capped
+        return random.uniform(0, min(self.max_backoff, self.backoff * (2 ** attempt)))
+
+    def get_page(self, url, retries=None):
+        entry = None
+        if self.cache is not None:
+            # Read the cache entry once; the revalidation below reuses it
+            entry = self.cache.load(url) if self.cache.mode != "refresh" else None
+            cached = self.cache.fresh(url, entry)
+            if cached is not None:
+                self.metrics.record(pages=1, cache_hits=1)
+                return cached
+            if self.cache.mode == "cache-only":
+                logger.warning(f"{url} is not in the response cache (cache-only mode)")
+                self.metrics.record(failures=1)
+                return None
+
+        retries = retries or self.retries
+        for attempt in range(retries):
+            self.rate_limiter.wait(url)
+            self.metrics.record(requests=1)
+            try:
+                if self.cache is not None:
+                    response = self.cache.get(self.session, url, timeout=self.timeout, entry=entry)
+                else:
+                    response = self.session.get(url, timeout=self.timeout)
+                    response.raise_for_status()
+                if getattr(response, "from_cache", False):
+                    self.metrics.record(pages=1, cache_hits=1)
+                else:
+                    self.metrics.record(pages=1, bytes=len(response.content))
+                return response
+            except requests.RequestException as e:
+                logger.warning(f"Attempt {attempt + 1} failed for {url}: {e}")
+                if attempt < retries - 1:
+                    self.metrics.record(retries=1)
+                    time.sleep(self.backoff_delay(attempt))
+                else:
+                    logger.error(f"Failed to fetch {url} after {retries} attempts")
+                    self.metrics.record(failures=1)
+                    return None
+
+    def parse_infobox(self, url):
+        response = self.get_page(url)
+        if not response:
+            return {}
+        return parse_infobox_html(response.text)
+
+    def extract_first_paragraph(self, url):
+        """
+        Extract ONLY the first meaningful paragraph from Wikipedia
+        """
+        response = self.get_page(url)
+        if response is None:
+            return f"[Network Error] Failed to fetch {url}"
+
+        try:
+            soup = BeautifulSoup(response.text, 'html.parser')
+
+            content_div = None
+            for selector in CONTENT_SELECTORS:
+                content_div = soup.select_one(selector)
+                if content_div:
+                    break
+
+            if content_div is None:
+                return "[Scrape Error] Could not find main content block"
+
+            for para in content_div.find_all('p', recursive=True):
+                # Get the text and clean it - add separator to preserve spaces
+                text = para.get_text(separator=' ', strip=True)
+
+                # Skip empty paragraphs or very short ones
+                if not text or len(text) < 50:
+                    continue
+                # Skip coordinate paragraphs and other metadata
+                if any(pattern in text.lower() for pattern in SKIP_PATTERNS):
+                    continue
+                return text
+
+            # If no good paragraph found, look for the first paragraph anywhere on the page
+            for para in soup.find_all('p'):
+                text = para.get_text(separator=' ', strip=True)
+                if text and len(text) > 50:
+                    if not any(pattern in text.lower() for pattern in SKIP_PATTERNS[:4]):
+                        return text
+
+            return "[Scrape Error] No meaningful paragraph found"
+        except Exception as e:
+            return f"[Scrape Error] {e}"
+
+    def scrape_paragraphs(self, links):
+        """First meaningful paragraph of every page, fetched concurrently (in input order)."""
+        return self.map_concurrent(self.extract_first_paragraph, list(links), "Paragraphs")
+
+    def map_concurrent(self, func, items, desc):
+        """Run func over items on the worker pool, keeping input order, with a progress bar."""
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            return list(tqdm(pool.map(func, items), total=len(items), desc=desc))
+
+    def parse_gdp_table(self, url, html):
+        soup = BeautifulSoup(html, 'lxml')
+        table = soup.find('table', class_='wikitable')
+        rows = []
+        # Skip the header row (the first <tr> with <th> cells)
+        for row in table.find_all('tr')[1:]:
+            cells = row.find_all('td')
+            # Skip rows without data cells or without a country link
+            if not cells or not cells[0].find('a'):
+                continue
+
+            anchor = cells[0].find('a')
+            # Safely pick GDP value from column 1 if it exists, otherwise 2
+            gdp_value = cells[1].get_text(strip=True) if len(cells) > 1 else (cells[2].get_text(strip=True) if len(cells) > 2 else '')
+            rows.append({
+                'Country': anchor.get_text(strip=True),
+                'GDP_total_usd': gdp_value,
+                'GDP_total_Year': 2024,
+                'Links': urljoin(url, anchor['href']),
+            })
+        return rows
+
+    def scrape_country_GDP_table(self, url=GDP_TABLE_URL):
+        self.metrics = CrawlMetrics()
+        response = self.get_page(url)
+        if response is None:
+            raise RuntimeError(f"Could not fetch the GDP table at {url}")
+        rows = self.parse_gdp_table(url, response.text)
+
+        # Fetch country pages on the thread pool and parse each infobox on the process pool as it arrives
+        links = [row['Links'] for row in rows]
+        if self.parse_workers == 1:
+            infos = self.map_concurrent(self.parse_infobox, links, "Country pages")
+        else:
+            with ProcessPoolExecutor(max_workers=self.parse_workers) as parsers:
+                def fetch_and_submit(link):
+                    response = self.get_page(link)
+                    return parsers.submit(parse_infobox_html, response.text if response else '')
+
+                futures = self.map_concurrent(fetch_and_submit, links, "Country pages")
+                infos = [future.result() for future in futures]
+        for row, info in zip(rows, infos):
+            for field in INFOBOX_FIELDS:
+                row[field] = info.get(field, '')
+
+        logger.info("Crawl finished: %s", self.metrics.snapshot())
+        return pd.DataFrame(rows, columns=TABLE_COLUMNS)
+
+
+# Name used by GDP_Finder.ipynb
+economic_intelligence_data_scraper = EconomicIntelligenceScraper
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scrape the Wikipedia GDP table and country infoboxes.")
+    parser.add_argument("--url", default=GDP_TABLE_URL)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--rps", type=float, default=5.0, help="max requests per second per host")
+    parser.add_argument("--parse-workers", type=int, default=None, help="infobox parser processes (default: all cores)")
+    parser.add_argument("--out", default="GDP_Finder_raw.csv")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR)
+    parser.add_argument("--max-age", type=float, default=3600, help="seconds a cached page is served without revalidation")
+    parser.add_argument("--no-cache", action="store_true", help="bypass the response cache")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--offline", action="store_true", help="serve pages from the response cache only")
+    mode.add_argument("--refresh", action="store_true", help="download every page again")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    cache = None
+    if not args.no_cache:
+        cache_mode = "cache-only" if args.offline else "refresh" if args.refresh else "revalidate"
+        cache = ResponseCache(args.cache_dir, mode=cache_mode, max_age=args.max_age)
+    bot = EconomicIntelligenceScraper(max_workers=args.workers, requests_per_second=args.rps, cache=cache,
+                                      parse_workers=args.parse_workers)
+    df = bot.scrape_country_GDP_table(args.url)
+    df.to_csv(args.out, index=False)
+    logger.info("Saved %d rows to %s", len(df), args.out)
+
+
+if __name__ == "__main__":
+    main()
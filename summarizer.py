@@ -0,0 +1,273 @@
+"""
+Incremental summarization of the scraped country paragraphs.
+
+Replaces the notebook's summarize_text() loop. Summaries are cached on disk by a
+hash of the paragraph together with the model and prompt, so a refresh only calls
+the model for paragraphs that changed. Pending paragraphs are grouped into batches
+and sent concurrently; failed batches are retried with jittered exponential
+backoff and, if they still fail, left out of the cache so the next run retries them.
+Rows of a failed batch keep the summary they had before (the --input column), so
+an API outage never writes error text into the dataset.
+
+Any object with `name` and `summarize_batch(texts) -> list of summaries` can act as
+the client: OpenAIClient talks to the API, StubClient is a local stand-in that
+needs no key or network.
+
+Usage:
+    python summarizer.py                               # re-summarize changed rows of Final_output.csv
+    python summarizer.py --scrape --client openai      # re-scrape paragraphs first
+    python summarizer.py --client stub --out /tmp/out.csv
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+import random
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+from tqdm import tqdm
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_CACHE_PATH = os.path.join(BASE_DIR, ".cache", "summaries.json")
+
+SYSTEM_PROMPT = "You are an expert economic analyst. Provide concise, informative summaries for policy makers."
+PROMPT = "Summarize this content for a government policy dashboard in 2-3 sentences:\n\n{text}"
+BATCH_PROMPT = (
+    "Summarize each of the following {count} numbered texts for a government policy dashboard in 2-3 sentences. "
+    "Reply with only a JSON array of {count} strings, in the same order.\n\n{texts}"
+)
+SKIPPED = "[Skipped due to scrape error]"
+
+
+class OpenAIClient:
+    """Chat completions client with the notebook's model, prompt and sampling settings."""
+
+    def __init__(self, model="gpt-3.5-turbo", max_tokens=150, temperature=0.3, api_key=None):
+        from openai import OpenAI
+
+        self.client = OpenAI(api_key=api_key or os.environ.get("OPENAI_API_KEY"))
+        self.model = model
+        self.max_tokens = max_tokens
+        self.temperature = temperature
+        self.name = f"openai:{model}:{max_tokens}:{temperature}"
+
+    def _complete(self, prompt, max_tokens):
+        response = self.client.chat.completions.create(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": prompt}
+            ],
+            max_tokens=max_tokens,
+            temperature=self.temperature
+        )
+        return response.choices[0].message.content.strip()
+
+    def summarize_batch(self, texts):
+        if len(texts) == 1:
+            return [self._complete(PROMPT.format(text=texts[0]), self.max_tokens)]
+
+        numbered = "\n\n".join(f"{i + 1}. {text}" for i, text in enumerate(texts))
+        reply = self._complete(BATCH_PROMPT.format(count=len(texts), texts=numbered), self.max_tokens * len(texts))
+        try:
+            summaries = json.loads(reply[reply.index("["):reply.rindex("]") + 1])
+        except ValueError:
+            summaries = None
+        if not isinstance(summaries, list) or len(summaries) != len(texts):
+            # The model did not keep to the format; fall back to one request per text
+            logger.warning("Batch reply was not a JSON array of %d summaries, retrying one by one", len(texts))
+            return [self._complete(PROMPT.format(text=text), self.max_tokens) for text in texts]
+        return [str(summary).strip() for summary in summaries]
+
+
+class StubClient:
+    """Deterministic local stand-in: the first two sentences of each text."""
+
+    name = "stub:first-sentences"
+
+    def __init__(self, sentences=2, delay=0.0):
+        self.sentences = sentences
+        self.delay = delay
+
+    def summarize_batch(self, texts):
+        if self.delay:
+            time.sleep(self.delay)
+        summaries = []
+        for text in texts:
+            text = re.sub(r'\s*\[\s*\d+\s*\]', '', text)
+            parts = re.split(r'(?<=[.!?])\s+', text.strip())
+            summaries.append(" ".join(parts[:self.sentences]))
+        return summaries
+
+
+CLIENTS = {"openai": OpenAIClient, "stub": StubClient}
+
+
+class SummaryCache:
+    """Summaries on disk, keyed by sha256 of (client name, prompt, paragraph)."""
+
+    def __init__(self, path=DEFAULT_CACHE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self.dirty = False
+        try:
+            with open(path) as f:
+                self.entries = json.load(f)
+        except (OSError, ValueError):
+            self.entries = {}
+
+    @staticmethod
+    def key(client_name, paragraph):
+        payload = "\x1f".join([client_name, SYSTEM_PROMPT, PROMPT, paragraph])
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        return self.entries.get(key)
+
+    def put_many(self, items):
+        with self._lock:
+            self.entries.update(items)
+            self.dirty = self.dirty or bool(items)
+
+    def save(self):
+        if not self.dirty:
+            return
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with self._lock:
+            with open(tmp_path, "w") as f:
+                json.dump(self.entries, f)
+            os.replace(tmp_path, self.path)
+            self.dirty = False
+
+
+class Summarizer:
+    def __init__(self, client, cache=None, batch_size=8, max_workers=4, retries=4, backoff=2.0, max_backoff=60.0):
+        self.client = client
+        self.cache = cache if cache is not None else SummaryCache()
+        self.batch_size = batch_size
+        self.max_workers = max_workers
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.stats = {"cached": 0, "summarized": 0, "skipped": 0, "failed": 0}
+
+    def backoff_delay(self, attempt):
+        return random.uniform(0, min(self.max_backoff, self.backoff * (2 ** attempt)))
+
+    def seed(self, paragraphs, summaries):
+        """Adopt existing summaries (e.g. from Final_output.csv) as produced by this client."""
+        items = {
+            self.cache.key(self.client.name, paragraph): summary
+            for paragraph, summary in zip(paragraphs, summaries)
+            if isinstance(paragraph, str) and isinstance(summary, str)
+            and not paragraph.startswith("[") and not summary.startswith("[")
+        }
+        self.cache.put_many(items)
+        return len(items)
+
+    def _summarize_with_retry(self, texts):
+        for attempt in range(self.retries):
+            try:
+                summaries = self.client.summarize_batch(texts)
+                if len(summaries) != len(texts):
+                    raise ValueError(f"client returned {len(summaries)} summaries for {len(texts)} texts")
+                return summaries, None
+            except Exception as e:
+                logger.warning(f"Summary batch attempt {attempt + 1} failed: {e}")
+                if attempt < self.retries - 1:
+                    time.sleep(self.backoff_delay(attempt))
+                else:
+                    return None, e
+
+    def summarize(self, paragraphs, previous=None):
+        """Summaries for paragraphs (in order), calling the client only for uncached ones.
+
+        Rows whose batch fails get their entry of previous (the summaries they had), or None.
+        """
+        paragraphs = list(paragraphs)
+        previous = list(previous) if previous is not None else [None] * len(paragraphs)
+        summaries = [None] * len(paragraphs)
+        pending = {}
+        for i, paragraph in enumerate(paragraphs):
+            if not isinstance(paragraph, str) or paragraph.startswith("["):  # scrape error
+                summaries[i] = SKIPPED
+                self.stats["skipped"] += 1
+                continue
+            key = self.cache.key(self.client.name, paragraph)
+            cached = self.cache.get(key)
+            if cached is not None:
+                summaries[i] = cached
+                self.stats["cached"] += 1
+            else:
+                # Identical paragraphs share one request
+                pending.setdefault(key, (paragraph, []))[1].append(i)
+
+        keys = list(pending)
+        batches = [keys[start:start + self.batch_size] for start in range(0, len(keys), self.batch_size)]
+
+        def run(batch):
+            return batch, self._summarize_with_retry([pending[key][0] for key in batch])
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            for batch, (results, error) in tqdm(pool.map(run, batches), total=len(batches), desc="Summaries"):
+                if results is None:
+                    logger.error(f"Summary batch of {len(batch)} failed, keeping the previous summaries: {error}")
+                    for key in batch:
+                        for i in pending[key][1]:
+                            kept = previous[i]
+                            # Error markers of older runs are not summaries worth keeping
+                            summaries[i] = kept if isinstance(kept, str) and not kept.startswith("[") else None
+                    self.stats["failed"] += len(batch)
+                    continue
+                self.cache.put_many(dict(zip(batch, results)))
+                for key, summary in zip(batch, results):
+                    for i in pending[key][1]:
+                        summaries[i] = summary
+                self.stats["summarized"] += len(batch)
+
+        self.cache.save()
+        return summaries
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarize the scraped country paragraphs incrementally.")
+    parser.add_argument("--input", default=os.path.join(BASE_DIR, "Final_output.csv"))
+    parser.add_argument("--out", help="output CSV (default: overwrite --input)")
+    parser.add_argument("--client", choices=sorted(CLIENTS), default="openai")
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--cache", default=DEFAULT_CACHE_PATH)
+    parser.add_argument("--scrape", action="store_true", help="re-scrape scraped_paragraph from the Links column first")
+    parser.add_argument("--no-seed", action="store_true", help="do not adopt the summaries already in --input")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    df = pd.read_csv(args.input, float_precision="round_trip")
+    summarizer = Summarizer(CLIENTS[args.client](), SummaryCache(args.cache),
+                            batch_size=args.batch_size, max_workers=args.workers)
+    if not args.no_seed and "summary" in df.columns:
+        summarizer.seed(df["scraped_paragraph"], df["summary"])
+
+    if args.scrape:
+        from http_cache import ResponseCache
+        from scraper import EconomicIntelligenceScraper
+
+        bot = EconomicIntelligenceScraper(cache=ResponseCache())
+        df["scraped_paragraph"] = bot.scrape_paragraphs(df["Links"])
+
+    df["summary"] = summarizer.summarize(df["scraped_paragraph"], df["summary"] if "summary" in df.columns else None)
+    out = args.out or args.input
+    df.to_csv(out, index=False)
+    logger.info("Summaries %s, saved %d rows to %s", summarizer.stats, len(df), out)
+
+
+if __name__ == "__main__":
+    main()
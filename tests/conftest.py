@@ -0,0 +1,59 @@
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+# The modules live flat at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class StubServer:
+    """Local HTTP server answering each path from a script of (status, headers, body) responses.
+
+    The last response of a script repeats. Every request is logged as (time, path, headers).
+    """
+
+    def __init__(self):
+        self.routes = {}
+        self.requests = []
+        self._lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                with stub._lock:
+                    stub.requests.append((time.monotonic(), self.path, dict(self.headers)))
+                    script = stub.routes.get(self.path, [(404, {}, b"")])
+                    status, headers, body = script.pop(0) if len(script) > 1 else script[0]
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def route(self, path, *responses):
+        self.routes[path] = list(responses)
+        return f"{self.url}{path}"
+
+    def hits(self, path):
+        return [entry for entry in self.requests if entry[1] == path]
+
+
+@pytest.fixture
+def stub_server():
+    stub = StubServer()
+    thread = threading.Thread(target=stub.server.serve_forever, daemon=True)
+    thread.start()
+    yield stub
+    stub.server.shutdown()
+    stub.server.server_close()
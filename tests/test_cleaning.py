@@ -0,0 +1,132 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+import cleaning
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+import bench_cleaning  # noqa: E402
+
+RAW_FIXTURE = os.path.join(ROOT, "tests", "fixtures", "raw_scrape.csv")
+FINAL = os.path.join(ROOT, "Final_output.csv")
+
+# Cells the notebook cleaners special-case: footnotes, units, ranges, n/a, unicode minus, blanks
+EDGE_CASES = {
+    "GDP_per_capita": [
+        "$89,105 (nominal; 2025)[3]",
+        "US$2,878 (nominal; 2025) US$12,132 (PPP; 2025)",
+        "$ , data unavailable",
+        "n/a",
+        "",
+    ],
+    "GDP_growth_rate": [
+        "5.2% (2024)[3]",
+        "3–4% (2024)",
+        "−0.2% (2025)",
+        "–1.3% (2024)",
+        "-0.6% (FY2024)",
+        "1.1% (2023) 2.4% (2024) 2.6% (2024)",
+        "0.9% (2025f)[12]",
+        "2.5%\xa0(2024)",
+        "4.0 % in 2023",
+        "N/A",
+        "",
+    ],
+    "Exports": [
+        "$3.232 trillion (2024)[5]",
+        "US$ 1,400.5 billion (2023)",
+        "$824.9 billion (2024 est.)",
+        "$750 million (2023)",
+        "€12,5 billion",
+        "£1.2.3 billion",
+        "$20–25 billion (2024)",
+        "$ billion",
+        "n/a",
+        "",
+    ],
+    "Government_debt": [
+        "$35.294 trillion (2024)[5] 122.3% of GDP",
+        "US$1.2 trillion (2024) 60.1% of GDP",
+        "¥1,457 trillion (2024) 236% of GDP",
+        "1.1 quadrillion",
+        "PLN 1.7 trillion",
+        "â‚¹320,782 billion (2024)",
+        "54.2% of GDP (2024)",
+        "$900 million",
+        "n/a",
+        "",
+    ],
+    "Currency": [
+        "United States dollar ($) (USD)",
+        "Euro (€) (EUR)[a]",
+        "Indian rupee (â‚¹) (INR)",
+        "Polish zÅ‚oty (PLN)",
+        "United States dollar (US Dollar Index) Except in some territories",
+        "$ (USD)",
+        "Currency 12 [2024]",
+        "n/a",
+        "",
+    ],
+}
+
+
+def edge_case_frame():
+    rows = max(len(values) for values in EDGE_CASES.values()) + 1
+    columns = {}
+    for column, values in EDGE_CASES.items():
+        # Pad with missing cells, as read_csv gives them for empty scraper fields
+        columns[column] = values + [np.nan] * (rows - len(values))
+    frame = pd.DataFrame(columns, dtype=object)
+    for column in ["Inflation_rate", "Unemployment_rate"]:
+        frame[column] = frame["GDP_growth_rate"]
+    frame["Imports"] = frame["Exports"]
+    return frame
+
+
+def test_vectorized_cleaners_match_the_notebook_on_edge_cases():
+    raw = edge_case_frame()
+
+    expected = bench_cleaning.notebook_clean(raw)
+    actual = bench_cleaning.vectorized_clean(raw)
+
+    assert bench_cleaning.mismatches(expected, actual) == {column: 0 for column in expected.columns}
+
+
+def test_edge_cases_clean_to_the_expected_values():
+    raw = edge_case_frame()
+
+    rates = cleaning.rates_with_fallback(raw["GDP_growth_rate"])
+    assert rates.iloc[:3].tolist() == [5.2, -4.0, 0.2]
+    assert rates.iloc[3] == -1.3 and np.isnan(rates.iloc[9])
+    exports = cleaning.financial_values(raw["Exports"])
+    assert exports.iloc[:5].tolist() == [3232.0, 1.401, 824.9, 0.75, 12.5]
+    debt = cleaning.government_debt(raw["Government_debt"])
+    assert debt.iloc[0].tolist() == [122.3, 35294.0]
+    assert debt.iloc[3, 1] == 1_100_000.0
+    assert cleaning.currencies(raw["Currency"]).iloc[[0, 3, 7, 8, 9]].tolist() == [
+        "United States dollar (USD)", "Polish złoty (PLN)", "n/a", "", ""]
+
+
+def test_golden_check_on_the_raw_fixture():
+    raw = pd.read_csv(RAW_FIXTURE)
+
+    report = cleaning.golden_check(raw, FINAL).set_index("column")
+
+    assert report["mismatches"].sum() == 0
+    assert (report["compared"] > 0).all()
+    # The "—" row is dropped and countries missing from Final_output.csv are not compared
+    assert report.loc["clean_currency", "compared"] == 5
+
+
+def test_golden_check_reports_a_changed_value():
+    raw = pd.read_csv(RAW_FIXTURE)
+    raw.loc[raw["Country"] == "Germany", "Exports"] = "$1.67 trillion (2024)"
+
+    report = cleaning.golden_check(raw, FINAL).set_index("column")
+
+    assert report.loc["Exports_Cleaned_Billion", "mismatches"] == 1
+    assert report["mismatches"].sum() == 1
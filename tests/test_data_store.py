@@ -0,0 +1,58 @@
+import gc
+import os
+
+import pandas as pd
+
+import data_store
+from data_store import KEEP_VERSIONS, READERS_DIR, build_snapshot, load_dataset, version_dir
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def write_version(csv_path, gdp_scale):
+    """A small Final_output.csv whose content (and so version) changes with gdp_scale."""
+    df = pd.read_csv(os.path.join(ROOT, "Final_output.csv")).head(20)
+    df["gdp_total_usd_billion_cleaned"] *= gdp_scale
+    df.to_csv(csv_path, index=False)
+
+
+def test_a_version_held_by_a_dataset_survives_pruning(tmp_path):
+    csv_path, snapshot_dir = str(tmp_path / "Final_output.csv"), str(tmp_path / "snapshot")
+    write_version(csv_path, 1.0)
+    dataset_a = load_dataset(csv_path, snapshot_dir)
+    directory_a = dataset_a.directory
+
+    write_version(csv_path, 1.1)
+    build_snapshot(csv_path, snapshot_dir)
+    write_version(csv_path, 1.2)
+    manifest_c = build_snapshot(csv_path, snapshot_dir)
+    data_store._prune_versions(snapshot_dir, KEEP_VERSIONS)
+
+    # A is older than the KEEP_VERSIONS newest, but this process still reads it
+    assert os.path.isdir(directory_a)
+    assert len(os.listdir(os.path.join(directory_a, READERS_DIR))) == 1
+    assert dataset_a.explorer.frame is not None
+
+    del dataset_a
+    gc.collect()
+    data_store._prune_versions(snapshot_dir, KEEP_VERSIONS)
+
+    assert not os.path.exists(directory_a)
+    versions = sorted(name for name in os.listdir(snapshot_dir) if name.startswith("v-"))
+    assert len(versions) == KEEP_VERSIONS
+    assert os.path.isdir(version_dir(manifest_c, snapshot_dir))
+
+
+def test_leases_of_dead_processes_do_not_keep_a_version(tmp_path):
+    csv_path, snapshot_dir = str(tmp_path / "Final_output.csv"), str(tmp_path / "snapshot")
+    write_version(csv_path, 1.0)
+    directory_a = version_dir(build_snapshot(csv_path, snapshot_dir), snapshot_dir)
+    # No process has pid 2**22 + 1 (above Linux's pid_max)
+    os.makedirs(os.path.join(directory_a, READERS_DIR), exist_ok=True)
+    open(os.path.join(directory_a, READERS_DIR, f"{2 ** 22 + 1}-deadbeef"), "w").close()
+
+    for scale in (1.1, 1.2):
+        write_version(csv_path, scale)
+        build_snapshot(csv_path, snapshot_dir)
+
+    assert not os.path.exists(directory_a)
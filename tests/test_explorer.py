@@ -0,0 +1,103 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_store import load_dataset
+from explorer import DataExplorer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+COLUMNS = ["Country", "Region", "Trade_Openness", "cluster"]
+
+
+@pytest.fixture(scope="module")
+def frame(tmp_path_factory):
+    # The Arrow-backed frame the dashboard serves, with its ties, categories and missing values
+    snapshot_dir = str(tmp_path_factory.mktemp("snapshot"))
+    return load_dataset(os.path.join(ROOT, "Final_output.csv"), snapshot_dir).frame
+
+
+def pandas_page(frame, sort_by, ascending, page, page_size, columns=COLUMNS):
+    ordered = frame.sort_values(sort_by, ascending=ascending, kind="stable", na_position="last")
+    return ordered.iloc[page * page_size:(page + 1) * page_size][columns]
+
+
+@pytest.mark.parametrize("sort_by", ["gdp_total_usd_billion_cleaned", "Trade_Openness", "cluster"])
+@pytest.mark.parametrize("ascending", [True, False])
+def test_pages_match_pandas_sort_values(frame, sort_by, ascending):
+    explorer = DataExplorer(frame)
+
+    for page in range(4):
+        result = explorer.query(COLUMNS, sort_by=sort_by, ascending=ascending, page=page, page_size=50)
+        pd.testing.assert_frame_equal(result.frame, pandas_page(frame, sort_by, ascending, page, 50))
+
+
+def test_missing_values_sort_last_both_ways():
+    frame = pd.DataFrame({"Country": list("abcdef"), "x": [2.0, np.nan, 1.0, 2.0, np.nan, 0.5]})
+    explorer = DataExplorer(frame)
+
+    for ascending in (True, False):
+        result = explorer.query(["Country"], sort_by="x", ascending=ascending, page_size=10)
+        expected = pandas_page(frame, "x", ascending, 0, 10, ["Country"])
+        assert result.frame["Country"].tolist() == expected["Country"].tolist()
+
+
+@pytest.mark.parametrize("sort_by", ["Country", "Region", "clean_currency"])
+@pytest.mark.parametrize("ascending", [True, False])
+def test_text_and_categorical_columns_sort_like_pandas(frame, sort_by, ascending):
+    explorer = DataExplorer(frame)
+    columns = list(dict.fromkeys(["Country", sort_by]))
+
+    result = explorer.query(columns, sort_by=sort_by, ascending=ascending, page_size=len(frame))
+
+    expected = pandas_page(frame, sort_by, ascending, 0, len(frame), columns)
+    pd.testing.assert_frame_equal(result.frame, expected)
+    if sort_by == "clean_currency":
+        # The two countries without a currency come last in both directions
+        assert result.frame[sort_by].isna().iloc[-2:].all()
+
+
+@pytest.mark.parametrize("column, low, high", [("cluster", 1, 2), ("GDP_total_Year", 2024, 2024),
+                                               ("Is_Eurozone", 1, 1), ("cluster", 5, 9)])
+def test_range_filters_on_integer_columns(frame, column, low, high):
+    explorer = DataExplorer(frame)
+
+    positions = explorer.select(ranges={column: (low, high)})
+
+    expected = np.flatnonzero(frame[column].between(low, high).to_numpy())
+    np.testing.assert_array_equal(positions, expected)
+    assert explorer.bounds(column) == (float(frame[column].min()), float(frame[column].max()))
+
+
+def test_range_and_category_filters_combine(frame):
+    explorer = DataExplorer(frame)
+    region = frame["Region"].cat.categories[0]
+
+    result = explorer.query(["Country"], categories={"Region": [region]}, ranges={"cluster": (0, 1)},
+                            sort_by="Country", page_size=500)
+
+    expected = frame[(frame["Region"] == region) & frame["cluster"].between(0, 1)].sort_values("Country")
+    assert result.frame["Country"].tolist() == expected["Country"].tolist()
+
+
+def test_the_last_page_is_partial(frame):
+    explorer = DataExplorer(frame)
+    total = len(frame)
+    last = total // 50
+
+    result = explorer.query(COLUMNS, sort_by="Country", page=last, page_size=50)
+
+    assert (result.total, result.pages, result.page) == (total, last + 1, last)
+    assert len(result.frame) == total - last * 50
+    assert (result.first_row, result.last_row) == (last * 50 + 1, total)
+    pd.testing.assert_frame_equal(result.frame, pandas_page(frame, "Country", True, last, 50))
+    # Past the end, the last page is served
+    assert explorer.query(COLUMNS, page=last + 3, page_size=50).page == last
+
+
+def test_no_matches_is_one_empty_page(frame):
+    result = DataExplorer(frame).query(COLUMNS, search="no such country")
+
+    assert (result.total, result.pages, result.first_row, result.last_row) == (0, 1, 0, 0)
+    assert result.frame.empty and list(result.frame.columns) == COLUMNS
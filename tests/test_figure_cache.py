@@ -0,0 +1,35 @@
+import plotly.graph_objects as go
+import plotly.io as pio
+
+from figure_cache import FigureCache
+from metrics import REGISTRY
+
+
+def test_hits_return_the_built_figure_without_parsing_it(monkeypatch):
+    cache = FigureCache(max_entries=4)
+    builds = []
+
+    def build():
+        builds.append(1)
+        return go.Figure(go.Bar(x=["a", "b"], y=[1, 2]))
+
+    first = cache.get_or_build("Global Overview", "bars", "v1", build, year=2024)
+    monkeypatch.setattr(pio, "from_json", lambda *args, **kwargs: 1 / 0)
+    run = REGISTRY.start_run("Global Overview")
+    second = cache.get_or_build("Global Overview", "bars", "v1", build, year=2024)
+    REGISTRY.finish_run()
+
+    assert second is first and len(builds) == 1
+    # The payload of a hit is still what st.plotly_chart sends for the figure
+    assert run.payload_bytes == len(pio.to_json(first, validate=False))
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+
+def test_new_versions_and_parameters_build_new_figures():
+    cache = FigureCache(max_entries=2)
+
+    figures = [cache.get_or_build("Trade Analysis", "bars", version, go.Figure, country=country)
+               for version, country in [("v1", "Chile"), ("v1", "Kenya"), ("v2", "Chile")]]
+
+    assert len({id(figure) for figure in figures}) == 3
+    assert cache.stats()["entries"] == 2 and cache.stats()["evictions"] == 1
@@ -0,0 +1,76 @@
+import requests
+
+from http_cache import ResponseCache
+from scraper import EconomicIntelligenceScraper
+
+HTML = {"Content-Type": "text/html; charset=utf-8"}
+
+
+def test_fresh_entry_is_served_without_a_request(stub_server, tmp_path):
+    url = stub_server.route("/page", (200, HTML, b"<p>one</p>"))
+    cache = ResponseCache(str(tmp_path), max_age=3600)
+    session = requests.Session()
+
+    first = cache.get(session, url)
+    second = cache.get(session, url)
+
+    assert not first.from_cache and second.from_cache
+    assert second.text == "<p>one</p>"
+    assert len(stub_server.hits("/page")) == 1
+    assert cache.stats["downloads"] == 1 and cache.stats["fresh_hits"] == 1
+
+
+def test_304_revalidation_keeps_body_and_updates_validators(stub_server, tmp_path):
+    url = stub_server.route(
+        "/page",
+        (200, {**HTML, "ETag": '"v1"', "Last-Modified": "Mon, 01 Jan 2024 00:00:00 GMT"}, b"<p>body</p>"),
+        (304, {"ETag": '"v2"', "Last-Modified": "Tue, 02 Jan 2024 00:00:00 GMT"}, b""),
+        (304, {}, b""),
+    )
+    cache = ResponseCache(str(tmp_path), max_age=0)
+    session = requests.Session()
+
+    cache.get(session, url)
+    revalidated = cache.get(session, url)
+    cache.get(session, url)
+
+    assert revalidated.from_cache and revalidated.status_code == 200
+    assert revalidated.text == "<p>body</p>"
+    sent = [headers for _, _, headers in stub_server.hits("/page")]
+    assert "If-None-Match" not in sent[0]
+    assert sent[1]["If-None-Match"] == '"v1"'
+    # The third request must carry the validators the 304 handed out
+    assert sent[2]["If-None-Match"] == '"v2"'
+    assert sent[2]["If-Modified-Since"] == "Tue, 02 Jan 2024 00:00:00 GMT"
+    meta, body = cache.load(url)
+    assert meta["etag"] == '"v2"' and body == b"<p>body</p>"
+    assert cache.stats["revalidated"] == 2
+
+
+def test_cache_only_miss_never_touches_the_network(stub_server, tmp_path):
+    url = stub_server.route("/missing", (200, HTML, b"<p>x</p>"))
+    cache = ResponseCache(str(tmp_path), mode="cache-only")
+
+    assert cache.get(requests.Session(), url) is None
+    assert cache.stats["offline_misses"] == 1
+
+    bot = EconomicIntelligenceScraper(requests_per_second=0, backoff=0.0, cache=cache)
+    assert bot.get_page(url) is None
+    assert bot.metrics.snapshot()["failures"] == 1
+    assert stub_server.hits("/missing") == []
+
+
+def test_get_page_reads_a_stale_entry_once(stub_server, tmp_path, monkeypatch):
+    url = stub_server.route("/page", (200, {**HTML, "ETag": '"v1"'}, b"<p>body</p>"), (304, {}, b""))
+    cache = ResponseCache(str(tmp_path), max_age=0)
+    bot = EconomicIntelligenceScraper(requests_per_second=0, backoff=0.0, cache=cache)
+    bot.get_page(url)
+
+    loads = []
+    load = cache.load
+    monkeypatch.setattr(cache, "load", lambda u: loads.append(u) or load(u))
+    response = bot.get_page(url)
+
+    assert response.from_cache and response.text == "<p>body</p>"
+    assert loads == [url]
+    assert bot.metrics.snapshot()["cache_hits"] == 1
@@ -0,0 +1,102 @@
+import json
+import os
+import subprocess
+import sys
+import textwrap
+
+import pandas as pd
+
+from panel_store import MANIFEST_FILE, PanelStore
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def year_frame(year, rows):
+    """Panel rows for one year from {country: (GDP, inflation)}."""
+    return pd.DataFrame({
+        "Country": list(rows),
+        "GDP_total_Year": year,
+        "gdp_total_usd_billion_cleaned": [gdp for gdp, _ in rows.values()],
+        "Inflation_rate_cleaned": [inflation for _, inflation in rows.values()],
+    })
+
+
+def test_appending_the_same_version_twice_is_a_no_op(tmp_path):
+    panel = PanelStore(str(tmp_path))
+    frame = pd.concat([year_frame(2023, {"Chile": (300.0, 4.0)}), year_frame(2024, {"Chile": (340.0, 3.5)})])
+
+    assert panel.append(frame, "aaa") == [2023, 2024]
+    manifest = (tmp_path / MANIFEST_FILE).read_text()
+    files = sorted(path.name for path in tmp_path.rglob("*.arrow"))
+
+    assert panel.append(frame, "aaa") == []
+    assert (tmp_path / MANIFEST_FILE).read_text() == manifest
+    assert sorted(path.name for path in tmp_path.rglob("*.arrow")) == files
+    assert [len(entry["vintages"]) for entry in json.loads(manifest)["years"].values()] == [1, 1]
+
+
+def test_country_lookup_across_partitions(tmp_path):
+    panel = PanelStore(str(tmp_path))
+    # Different row orders per year, so each partition has its own index
+    panel.append(year_frame(2022, {"Kenya": (110.0, 7.6), "Chile": (300.0, 11.6), "Brazil": (1950.0, 9.3)}), "v22")
+    panel.append(year_frame(2023, {"Brazil": (2170.0, 4.6), "Kenya": (107.0, 7.7)}), "v23")
+    panel.append(year_frame(2024, {"Chile": (330.0, 3.9), "Brazil": (2180.0, 4.4), "Kenya": (120.0, 4.5)}), "v24")
+    # A newer vintage of 2024 is served instead of the first one
+    panel.append(year_frame(2024, {"Kenya": (131.7, 4.5), "Chile": (343.8, 3.9), "Brazil": (2126.0, 4.4)}), "v24b")
+
+    assert panel.history("Chile", ["gdp_total_usd_billion_cleaned"]) == {
+        2022: {"gdp_total_usd_billion_cleaned": 300.0},
+        2024: {"gdp_total_usd_billion_cleaned": 343.8},
+    }
+    assert panel.row(2023, "Kenya") == {"gdp_total_usd_billion_cleaned": 107.0, "Inflation_rate_cleaned": 7.7}
+    assert panel.row(2022, "Brazil", None)["Country"] == "Brazil"
+    assert panel.row(2023, "Chile") is None
+    assert panel.row(2024, "Atlantis") is None
+
+
+def test_deltas_for_a_country_missing_from_the_previous_year(tmp_path):
+    panel = PanelStore(str(tmp_path))
+    panel.append(year_frame(2023, {"Brazil": (2170.0, 4.6)}), "v23")
+    panel.append(year_frame(2024, {"Kenya": (131.7, 4.5), "Brazil": (2126.0, 4.4)}), "v24")
+
+    changes, previous_year = panel.deltas(2024, "Brazil")
+    assert previous_year == 2023
+    assert changes["gdp_total_usd_billion_cleaned"] == 2126.0 - 2170.0
+    assert changes["Inflation_rate_cleaned"] == 4.4 - 4.6
+
+    changes, previous_year = panel.deltas(2024, "Kenya")
+    assert previous_year == 2023
+    assert all(value is None for value in changes.values())
+    assert panel.deltas(2023, "Brazil") == (None, None)
+
+    # Backfilling Kenya's previous year recomputes the deltas of the year after it
+    panel.append(year_frame(2023, {"Brazil": (2170.0, 4.6), "Kenya": (107.0, 7.7)}), "v23b")
+    assert panel.deltas(2024, "Kenya")[0]["gdp_total_usd_billion_cleaned"] == 131.7 - 107.0
+
+
+def test_year_selector_with_a_single_year(tmp_path):
+    # data_store and panel_store read EID_SNAPSHOT_DIR on import, so the app runs in its own process
+    script = textwrap.dedent("""
+        import json
+        from streamlit.testing.v1 import AppTest
+
+        at = AppTest.from_file("app.py", default_timeout=120)
+        at.run()
+        country = {"sliders": [s.key for s in at.select_slider],
+                   "deltas": sum("class='metric-delta" in m.value for m in at.markdown)}
+        at.sidebar.selectbox[0].select("Global Overview").run()
+        overview = {"sliders": [s.key for s in at.select_slider], "deltas": [m.delta for m in at.metric]}
+        print(json.dumps({"exceptions": [e.value for e in at.exception], "country": country, "overview": overview}))
+    """)
+    env = {**os.environ, "EID_SNAPSHOT_DIR": str(tmp_path / "snapshot")}
+    result = subprocess.run([sys.executable, "-c", script], cwd=ROOT, env=env, capture_output=True, text=True,
+                            timeout=300)
+    assert result.returncode == 0, result.stderr
+    report = json.loads(result.stdout.strip().splitlines()[-1])
+
+    # Final_output.csv holds one year: no slider, the dataset's year and no year-over-year deltas
+    assert report["exceptions"] == []
+    assert report["country"] == {"sliders": [], "deltas": 0}
+    assert report["overview"]["sliders"] == []
+    assert not any(report["overview"]["deltas"])
+    assert PanelStore(str(tmp_path / "snapshot" / "panel")).years() == [2024]
@@ -0,0 +1,68 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from scenarios import GridSpec, scenario_frame
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def base_row(country="Germany"):
+    df = pd.read_csv(os.path.join(ROOT, "Final_output.csv"))
+    df["Trade Balance"] = df["Exports_Cleaned_Billion"] - df["Imports_Cleaned_Billion"]
+    df["Total Trade"] = df["Exports_Cleaned_Billion"] + df["Imports_Cleaned_Billion"]
+    return df.set_index("Country").loc[country]
+
+
+def sweep_from_base(base, column, factor, steps=3):
+    return GridSpec((column, base[column], base[column] * factor, steps))
+
+
+def test_the_base_point_reproduces_the_base_row():
+    base = base_row()
+    for column in ["Trade_Openness", "Gov_Debt_Percent_GDP_Cleaned", "Inflation_rate_cleaned"]:
+        frame = scenario_frame(base, sweep_from_base(base, column, 2.0))
+        for col in frame.columns:
+            assert np.isclose(frame[col].iloc[0], base[col], rtol=1e-12), (column, col)
+
+
+def test_trade_columns_follow_trade_openness():
+    base = base_row()
+    frame = scenario_frame(base, sweep_from_base(base, "Trade_Openness", 2.0))
+    doubled = frame.iloc[-1]
+
+    for col in ["Exports_Cleaned_Billion", "Imports_Cleaned_Billion", "Trade_Balance", "Trade Balance", "Total Trade"]:
+        assert np.isclose(doubled[col], 2 * base[col]), col
+    assert np.isclose(doubled["Import_Export_Ratio"], base["Import_Export_Ratio"])
+    assert np.isclose(doubled["Exports_Cleaned_Billion_log"], np.log1p(2 * base["Exports_Cleaned_Billion"]))
+    assert np.isclose(doubled["Imports_Cleaned_Billion_log"], np.log1p(2 * base["Imports_Cleaned_Billion"]))
+    # GDP and debt are not built from trade
+    for col in ["gdp_total_usd_billion_cleaned_log", "Gov_Debt_Absolute_Billion_Cleaned", "Debt_to_Income"]:
+        assert doubled[col] == base[col], col
+
+
+def test_debt_columns_follow_debt_percent():
+    base = base_row()
+    frame = scenario_frame(base, sweep_from_base(base, "Gov_Debt_Percent_GDP_Cleaned", 0.5))
+    halved = frame.iloc[-1]
+
+    assert np.isclose(halved["Gov_Debt_Absolute_Billion_Cleaned"], base["Gov_Debt_Absolute_Billion_Cleaned"] / 2)
+    assert np.isclose(halved["Gov_Debt_Absolute_Billion_Cleaned_log"],
+                      np.log1p(base["Gov_Debt_Absolute_Billion_Cleaned"] / 2))
+    assert np.isclose(halved["Debt_to_Income"], base["Debt_to_Income"] / 2)
+    assert halved["Exports_Cleaned_Billion"] == base["Exports_Cleaned_Billion"]
+
+
+def test_a_zero_base_uses_the_notebook_formulas():
+    base = base_row().copy()
+    base["Trade_Openness"] = base["Gov_Debt_Percent_GDP_Cleaned"] = 0.0
+    spec = GridSpec(("Trade_Openness", 0, 50, 2), ("Gov_Debt_Percent_GDP_Cleaned", 0, 60, 2))
+    point = scenario_frame(base, spec).iloc[-1]
+    gdp = base["gdp_total_usd_billion_cleaned"]
+
+    assert np.isclose(point["Total Trade"], 0.5 * gdp)
+    assert np.isclose(point["Exports_Cleaned_Billion"], point["Imports_Cleaned_Billion"])
+    assert point["Trade_Balance"] == 0 and point["Import_Export_Ratio"] == 1
+    assert np.isclose(point["Gov_Debt_Absolute_Billion_Cleaned"], 0.6 * gdp)
+    assert np.isclose(point["Debt_to_Income"], 60 / base["GDP_per_capita_ppp_cleaned"])
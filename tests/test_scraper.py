@@ -0,0 +1,44 @@
+from scraper import EconomicIntelligenceScraper
+
+HTML = {"Content-Type": "text/html; charset=utf-8"}
+
+
+def make_scraper(**kwargs):
+    options = {"max_workers": 4, "requests_per_second": 0, "retries": 3, "backoff": 0.0}
+    options.update(kwargs)
+    return EconomicIntelligenceScraper(**options)
+
+
+def test_get_page_retries_429_and_5xx(stub_server):
+    url = stub_server.route("/flaky", (429, {}, b""), (503, {}, b""), (200, HTML, b"<p>ok</p>"))
+    bot = make_scraper()
+
+    response = bot.get_page(url)
+
+    assert response.status_code == 200
+    assert response.text == "<p>ok</p>"
+    assert len(stub_server.hits("/flaky")) == 3
+    metrics = bot.metrics.snapshot()
+    assert (metrics["requests"], metrics["retries"], metrics["failures"], metrics["pages"]) == (3, 2, 0, 1)
+
+
+def test_get_page_gives_up_after_retries(stub_server):
+    url = stub_server.route("/down", (500, {}, b""))
+    bot = make_scraper(retries=2)
+
+    assert bot.get_page(url) is None
+    assert len(stub_server.hits("/down")) == 2
+    metrics = bot.metrics.snapshot()
+    assert (metrics["retries"], metrics["failures"], metrics["pages"]) == (1, 1, 0)
+
+
+def test_requests_to_one_host_are_spaced(stub_server):
+    urls = [stub_server.route(f"/page{i}", (200, HTML, b"<p>x</p>")) for i in range(5)]
+    bot = make_scraper(requests_per_second=20)
+
+    responses = bot.map_concurrent(bot.get_page, urls, "test")
+
+    assert all(response.status_code == 200 for response in responses)
+    starts = sorted(when for when, _, _ in stub_server.requests)
+    # Five starts at most 20 per second span at least four 50 ms intervals, however many workers run
+    assert starts[-1] - starts[0] >= 4 * 0.05 * 0.9
@@ -0,0 +1,123 @@
+import json
+import sys
+
+import pandas as pd
+
+import summarizer
+from summarizer import BATCH_PROMPT, SKIPPED, OpenAIClient, StubClient, SummaryCache, Summarizer
+
+PARAGRAPHS = [
+    "Albania is a country in Southeast Europe. It borders Greece. Its capital is Tirana.",
+    "Brazil is the largest country in South America. It is a federal republic. Its capital is Brasilia.",
+    "Chile is a long, narrow country. It lies along the Pacific. Its capital is Santiago.",
+]
+
+
+class RecordingClient(StubClient):
+    """StubClient that logs every batch it is asked to summarize."""
+
+    def __init__(self):
+        super().__init__()
+        self.batches = []
+
+    def summarize_batch(self, texts):
+        self.batches.append(list(texts))
+        return super().summarize_batch(texts)
+
+
+class FailingClient:
+    name = StubClient.name
+
+    def __init__(self):
+        self.calls = 0
+
+    def summarize_batch(self, texts):
+        self.calls += 1
+        raise RuntimeError("rate limited")
+
+
+def make_summarizer(client, cache_path, **kwargs):
+    return Summarizer(client, SummaryCache(str(cache_path)), backoff=0.0, max_workers=1, **kwargs)
+
+
+def test_only_changed_paragraphs_are_resummarized(tmp_path):
+    cache_path = tmp_path / "summaries.json"
+    first = RecordingClient()
+    make_summarizer(first, cache_path).summarize(PARAGRAPHS)
+    assert sum(len(batch) for batch in first.batches) == 3
+
+    changed = PARAGRAPHS[:2] + ["Chile is a long, narrow country. Its capital is Santiago."]
+    second = RecordingClient()
+    run = make_summarizer(second, cache_path)
+    summaries = run.summarize(changed)
+
+    # A new process with the same cache file only sends the edited paragraph
+    assert second.batches == [[changed[2]]]
+    assert run.stats == {"cached": 2, "summarized": 1, "skipped": 0, "failed": 0}
+    assert summaries[2] == "Chile is a long, narrow country. Its capital is Santiago."
+
+
+def test_paragraphs_are_batched_and_deduplicated(tmp_path):
+    client = RecordingClient()
+    paragraphs = PARAGRAPHS + [PARAGRAPHS[0], "[Network Error] Failed to fetch x", None]
+    summaries = make_summarizer(client, tmp_path / "summaries.json", batch_size=2).summarize(paragraphs)
+
+    assert [len(batch) for batch in client.batches] == [2, 1]
+    assert summaries[0] == summaries[3] == "Albania is a country in Southeast Europe. It borders Greece."
+    assert summaries[4:] == [SKIPPED, SKIPPED]
+
+
+def test_batch_prompt_numbers_the_texts_and_parses_the_reply():
+    prompts = []
+
+    class Completions:
+        def create(self, model, messages, max_tokens, temperature):
+            prompts.append((messages[1]["content"], max_tokens))
+            reply = json.dumps([f"summary {i}" for i in range(3)])
+            message = type("Message", (), {"content": f"Here you go:\n{reply}"})
+            return type("Response", (), {"choices": [type("Choice", (), {"message": message})]})
+
+    client = OpenAIClient.__new__(OpenAIClient)
+    client.client = type("Client", (), {"chat": type("Chat", (), {"completions": Completions()})})
+    client.model, client.max_tokens, client.temperature = "test-model", 100, 0.3
+
+    assert client.summarize_batch(PARAGRAPHS) == ["summary 0", "summary 1", "summary 2"]
+    numbered = "\n\n".join(f"{i + 1}. {text}" for i, text in enumerate(PARAGRAPHS))
+    assert prompts == [(BATCH_PROMPT.format(count=3, texts=numbered), 300)]
+
+
+def test_failed_batches_keep_the_previous_summary_and_are_retried(tmp_path):
+    cache_path = tmp_path / "summaries.json"
+    client = FailingClient()
+    run = make_summarizer(client, cache_path, retries=2)
+    previous = ["Old Albania summary.", "[AI Error] from an older run", None]
+
+    summaries = run.summarize(PARAGRAPHS, previous)
+
+    assert client.calls == 2
+    assert summaries == ["Old Albania summary.", None, None]
+    assert run.stats["failed"] == 3
+    assert not cache_path.exists()
+
+    # Nothing was cached, so the next run sends every paragraph again
+    retry = RecordingClient()
+    make_summarizer(retry, cache_path).summarize(PARAGRAPHS)
+    assert sum(len(batch) for batch in retry.batches) == 3
+
+
+def test_main_does_not_write_errors_into_the_input(tmp_path, monkeypatch):
+    csv_path = tmp_path / "Final_output.csv"
+    pd.DataFrame({
+        "Country": ["Albania", "Brazil"],
+        "scraped_paragraph": PARAGRAPHS[:2],
+        "summary": ["Old Albania summary.", "Old Brazil summary."],
+    }).to_csv(csv_path, index=False)
+    monkeypatch.setitem(summarizer.CLIENTS, "stub", FailingClient)
+    monkeypatch.setattr(Summarizer, "backoff_delay", lambda self, attempt: 0.0)
+    monkeypatch.setattr(sys, "argv", ["summarizer.py", "--input", str(csv_path), "--client", "stub",
+                                      "--no-seed", "--cache", str(tmp_path / "summaries.json")])
+
+    summarizer.main()
+
+    assert pd.read_csv(csv_path)["summary"].tolist() == ["Old Albania summary.", "Old Brazil summary."]
+
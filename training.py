@@ -0,0 +1,264 @@
+"""
+Training for the GDP per capita (PPP) regressor.
+
+Replaces the notebook's training cells (LinearRegression, a default
+RandomForestRegressor and a 500-round XGBRegressor, each fit on one split). Every
+candidate is tuned with cross-validation on the notebook's train split
+(train_test_split(test_size=0.2, random_state=42)) and scored on its test split:
+- linear: plain least squares, cross-validated for comparison
+- rf: GridSearchCV over forest size and shape, folds fitted on all cores. When
+  the registry already has a forest for the same features and only the data
+  changed, that forest's hyperparameters are reused and new trees are grown on
+  the new data with warm_start instead of searching again, with the tuned
+  configuration cross-validated on the new data for its cv_mae. Once the forest
+  would pass RF_MAX_TREES it is searched and fitted from scratch instead.
+- xgb: each (params, fold) pair fitted in parallel with early stopping on the
+  fold's validation part, then refit with the mean best round count.
+
+Each candidate records fit and predict timings. All are published to the model
+registry; the best one that passes validation is promoted and becomes the model
+the dashboard serves.
+
+Usage:
+    python training.py                                  # train on Final_output.csv
+    python training.py --data build/model_data.csv --jobs 8
+"""
+import argparse
+import itertools
+import logging
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from model_registry import DEFAULT_REGISTRY_DIR, ModelRegistry
+from model_serving import GDP_FEATURES, GDP_TARGET, feature_matrix
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+MODEL_NAME = "gdp_ppp"
+
+RF_GRID = {
+    "model__n_estimators": [100, 300],
+    "model__max_depth": [None, 8],
+    "model__min_samples_leaf": [1, 2],
+    "model__max_features": [1.0, "sqrt"],
+}
+XGB_GRID = {
+    "max_depth": [3, 4, 6],
+    "learning_rate": [0.05, 0.1],
+    "subsample": [0.8],
+    "colsample_bytree": [0.8],
+}
+XGB_MAX_ROUNDS = 500
+XGB_EARLY_STOPPING = 30
+RF_WARM_START_TREES = 50
+RF_MAX_TREES = 500
+
+# A model is only served if it explains at least this much test variance
+MIN_TEST_R2 = 0.5
+
+
+def data_hash(X, y):
+    import hashlib
+
+    digest = hashlib.sha256(np.ascontiguousarray(X).tobytes())
+    digest.update(np.ascontiguousarray(y).tobytes())
+    return digest.hexdigest()
+
+
+def scaled(estimator):
+    """The notebook scales features before fitting; keep the scaler inside the artifact."""
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import StandardScaler
+
+    return Pipeline([("scaler", StandardScaler()), ("model", estimator)])
+
+
+def evaluate(model, X_test, y_test):
+    from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+
+    start = time.perf_counter()
+    predicted = model.predict(X_test)
+    predict_seconds = time.perf_counter() - start
+    metrics = {
+        "mae": float(mean_absolute_error(y_test, predicted)),
+        "rmse": float(np.sqrt(mean_squared_error(y_test, predicted))),
+        "r2": float(r2_score(y_test, predicted)),
+    }
+    return metrics, predict_seconds
+
+
+def _cv():
+    from sklearn.model_selection import KFold
+
+    return KFold(n_splits=5, shuffle=True, random_state=42)
+
+
+def train_linear(X_train, y_train, jobs, previous):
+    from sklearn.linear_model import LinearRegression
+    from sklearn.model_selection import cross_val_score
+
+    model = scaled(LinearRegression())
+    cv_mae = -cross_val_score(model, X_train, y_train, cv=_cv(), scoring="neg_mean_absolute_error", n_jobs=jobs).mean()
+    return model.fit(X_train, y_train), {}, float(cv_mae), False
+
+
+def train_rf(X_train, y_train, jobs, previous):
+    from sklearn.ensemble import RandomForestRegressor
+    from sklearn.model_selection import GridSearchCV, cross_val_score
+
+    if previous is not None and previous.named_steps["model"].n_estimators + RF_WARM_START_TREES > RF_MAX_TREES:
+        logger.info("rf: forest would exceed %d trees, searching and fitting from scratch", RF_MAX_TREES)
+        previous = None
+    if previous is not None:
+        # Same features, new data: keep the tuned shape and grow extra trees on the new data.
+        # The existing trees split on the old scaler's units, so the scaler is kept as is.
+        forest = previous.named_steps["model"]
+        forest.set_params(warm_start=True, n_estimators=forest.n_estimators + RF_WARM_START_TREES, n_jobs=jobs)
+        forest.fit(previous.named_steps["scaler"].transform(X_train), y_train)
+        params = {name: value for name, value in forest.get_params().items() if f"model__{name}" in RF_GRID}
+        params["n_estimators"] = forest.n_estimators
+        # The tuned configuration, cross-validated on the new data, so cv_mae stays comparable across candidates
+        cv_mae = -cross_val_score(scaled(RandomForestRegressor(random_state=42, **params)), X_train, y_train,
+                                  cv=_cv(), scoring="neg_mean_absolute_error", n_jobs=jobs).mean()
+        return previous, params, float(cv_mae), True
+
+    search = GridSearchCV(
+        scaled(RandomForestRegressor(random_state=42)),
+        RF_GRID,
+        cv=_cv(),
+        scoring="neg_mean_absolute_error",
+        n_jobs=jobs,
+    ).fit(X_train, y_train)
+    params = {name.split("__", 1)[1]: value for name, value in search.best_params_.items()}
+    return search.best_estimator_, params, float(-search.best_score_), False
+
+
+def _xgb_fold(params, X_train, y_train, train_idx, valid_idx):
+    from sklearn.metrics import mean_absolute_error
+    from xgboost import XGBRegressor
+
+    model = XGBRegressor(n_estimators=XGB_MAX_ROUNDS, early_stopping_rounds=XGB_EARLY_STOPPING,
+                         random_state=42, n_jobs=1, **params)
+    model.fit(X_train[train_idx], y_train[train_idx],
+              eval_set=[(X_train[valid_idx], y_train[valid_idx])], verbose=False)
+    mae = mean_absolute_error(y_train[valid_idx], model.predict(X_train[valid_idx]))
+    return mae, model.best_iteration + 1
+
+
+def train_xgb(X_train, y_train, jobs, previous):
+    from joblib import Parallel, delayed
+    from xgboost import XGBRegressor
+
+    combos = [dict(zip(XGB_GRID, values)) for values in itertools.product(*XGB_GRID.values())]
+    folds = list(_cv().split(X_train))
+    scores = Parallel(n_jobs=jobs)(
+        delayed(_xgb_fold)(params, X_train, y_train, train_idx, valid_idx)
+        for params in combos for train_idx, valid_idx in folds
+    )
+    by_combo = [scores[i:i + len(folds)] for i in range(0, len(scores), len(folds))]
+    best = min(range(len(combos)), key=lambda i: np.mean([mae for mae, _ in by_combo[i]]))
+    rounds = int(np.mean([rounds for _, rounds in by_combo[best]]))
+    params = {**combos[best], "n_estimators": rounds}
+
+    model = XGBRegressor(random_state=42, n_jobs=jobs, **params)
+    return model.fit(X_train, y_train), params, float(np.mean([mae for mae, _ in by_combo[best]])), False
+
+
+CANDIDATES = {"linear": train_linear, "rf": train_rf, "xgb": train_xgb}
+
+
+def _library_versions():
+    import sklearn
+    import xgboost
+
+    return {"sklearn": sklearn.__version__, "xgboost": xgboost.__version__}
+
+
+def train_all(frame, registry, jobs=-1, candidates=tuple(CANDIDATES), min_r2=MIN_TEST_R2):
+    """Fit, evaluate and publish each candidate; promote the best validated one. Returns the entries."""
+    from sklearn.model_selection import train_test_split
+
+    X = feature_matrix(frame, GDP_FEATURES)
+    y = frame[GDP_TARGET].to_numpy(dtype="float64", na_value=np.nan)
+    complete = ~(np.isnan(X).any(axis=1) | np.isnan(y))
+    X, y = X[complete], y[complete]
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+    data_sha = data_hash(X, y)
+
+    results = []
+    for algorithm in candidates:
+        known = registry.find(MODEL_NAME, algorithm=algorithm, features=GDP_FEATURES)
+        if known and known[0]["data_sha256"] == data_sha:
+            logger.info("%s: already trained on this data (%s), skipping", algorithm, known[0]["sha256"][:12])
+            results.append((known[0], None))
+            continue
+        previous = registry.load(known[0]) if known and algorithm == "rf" else None
+
+        start = time.perf_counter()
+        model, params, cv_mae, warm_started = CANDIDATES[algorithm](X_train, y_train, jobs, previous)
+        fit_seconds = time.perf_counter() - start
+        metrics, predict_seconds = evaluate(model, X_test, y_test)
+        logger.info("%s: test MAE %.0f, R2 %.3f, fit %.1fs%s", algorithm, metrics["mae"], metrics["r2"],
+                    fit_seconds, " (warm start)" if warm_started else "")
+        metadata = {
+            "algorithm": algorithm,
+            "params": params,
+            "features": GDP_FEATURES,
+            "target": GDP_TARGET,
+            "data_sha256": data_sha,
+            "rows": {"train": len(X_train), "test": len(X_test)},
+            "metrics": {**metrics, "cv_mae": cv_mae},
+            "timings": {"fit_seconds": fit_seconds, "predict_seconds": predict_seconds},
+            "warm_started": warm_started,
+            "versions": _library_versions(),
+        }
+        results.append((metadata, model))
+
+    validated = [meta for meta, _ in results if meta["metrics"]["r2"] >= min_r2]
+    winner = min(validated, key=lambda meta: meta["metrics"]["mae"]) if validated else None
+    if winner is None:
+        logger.warning("No candidate reached test R2 %.2f; the served model is unchanged", min_r2)
+    current = registry.latest(MODEL_NAME)
+
+    entries = []
+    for metadata, model in results:
+        is_winner = metadata is winner
+        if model is None:
+            # Trained in an earlier run; re-publish only if it now wins and is not already served
+            if not is_winner or (current is not None and current["sha256"] == metadata["sha256"]):
+                entries.append(metadata)
+                continue
+            model = registry.load(metadata)
+            metadata = {key: value for key, value in metadata.items()
+                        if key not in ("name", "sha256", "created_at", "validated", "promoted")}
+        entries.append(registry.publish(MODEL_NAME, model, metadata,
+                                        validated=metadata["metrics"]["r2"] >= min_r2, promoted=is_winner))
+    return entries
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tune, evaluate and publish the GDP per capita (PPP) models.")
+    parser.add_argument("--data", default=os.path.join(BASE_DIR, "Final_output.csv"))
+    parser.add_argument("--registry", default=DEFAULT_REGISTRY_DIR)
+    parser.add_argument("--jobs", type=int, default=-1, help="parallel jobs for the searches (-1: all cores)")
+    parser.add_argument("--candidates", nargs="+", choices=sorted(CANDIDATES), default=list(CANDIDATES))
+    parser.add_argument("--min-r2", type=float, default=MIN_TEST_R2)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    frame = pd.read_csv(args.data, float_precision="round_trip")
+    start = time.perf_counter()
+    entries = train_all(frame, ModelRegistry(args.registry), jobs=args.jobs,
+                        candidates=args.candidates, min_r2=args.min_r2)
+    for entry in entries:
+        logger.info("%-6s %s  MAE %.0f  R2 %.3f%s", entry["algorithm"], entry.get("sha256", "")[:12],
+                    entry["metrics"]["mae"], entry["metrics"]["r2"], "  [served]" if entry.get("promoted") else "")
+    logger.info("Training finished in %.1fs", time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    main()